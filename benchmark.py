@@ -0,0 +1,503 @@
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+
+import numpy as np
+
+from engine import HeadlessCanvas, StrokeEngine
+from renderer import ViewLayer
+from shared_board import BoardSession, SharedBoard
+from update_scheduler import UpdateScheduler
+from stroke import Stroke
+from viewport import Viewport
+
+
+# 필기 엔진 벤치마크
+# 합성 노트(획 1천~10만 개, 길이는 로그 정규 분포)를 UI 없이 StrokeEngine + HeadlessCanvas로 불러온 뒤
+# 조작마다 (엔진 호출 + flush로 캔버스에 보낼 도형 준비까지) 지연 시간을 재어
+# p50/p99/평균 지연, 초당 처리량, 조작당 전송량을 JSON으로 저장함 (다른 버전의 결과 파일과 비교하여 성능 회귀 확인)
+#
+#   python benchmark.py --sizes 1000,10000,100000 --output benchmark.json
+
+VIEW_WIDTH = 1280
+VIEW_HEIGHT = 800
+AREA_PER_STROKE = 100.0 * 100.0 # 획 하나당 문서 면적 (획 수가 늘어도 화면에 보이는 획의 밀도는 같게 유지)
+STEP = 3.0 # 합성 획의 점 간격(px)
+MEDIAN_POINTS = 40 # 합성 획 점 개수의 중앙값
+MAX_POINTS = 2000
+COLORS = ["black", "red", "green", "blue", "purple"]
+WIDTHS = [2.0, 3.0, 5.0]
+LASSO_RADIUS = 150.0 # 올가미 선택 벤치마크의 선택 영역 반지름 (화면 px)
+LASSO_POINTS = 64 # 올가미 경로의 점 개수
+PRESSURE_MAX_WIDTH = 10.0 # 압력 감지 획 벤치마크의 최대 두께
+POINTER_INTERVAL = 0.004 # 프레임 단위 업데이트 벤치마크의 포인터 이벤트 간격(초, 250Hz 펜)
+UPDATE_RATE_HZ = 60 # 프레임 단위 업데이트 벤치마크의 캔버스 업데이트 주기 (앱과 같음)
+BOARD_CLIENTS = 24 # 공유 화이트보드 벤치마크의 세션 수
+BOARD_STROKE_POINTS = 60 # 공유 화이트보드 벤치마크에서 세션마다 획 하나에 그리는 점 개수
+
+
+# 합성 노트 생성: 방향이 조금씩 바뀌는 무작위 걸음으로 만든 획 count개
+def make_notebook(count, rng):
+    side = (count * AREA_PER_STROKE) ** 0.5
+    lengths = np.clip(rng.lognormal(np.log(MEDIAN_POINTS), 0.8, count).astype(int), 2, MAX_POINTS)
+    total = int(lengths.sum())
+    # 모든 획의 점을 한 번에 만든 뒤 획마다 잘라 씀
+    angles = np.cumsum(rng.normal(0.0, 0.3, total))
+    steps = np.column_stack((np.cos(angles), np.sin(angles))) * STEP
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    steps[starts] = rng.uniform(-side / 2, side / 2, (count, 2)) # 획마다 첫 점은 시작 위치
+    coords = np.cumsum(steps, axis=0)
+    # 누적 합이 이전 획의 끝에서 이어지지 않도록 획마다 앞 획들까지의 합을 뺌
+    coords -= np.repeat(coords[starts - 1] * (starts > 0)[:, None], lengths, axis=0)
+
+    strokes = []
+    for i, (start, length) in enumerate(zip(starts.tolist(), lengths.tolist())):
+        points = coords[start:start + length]
+        strokes.append(Stroke.from_buffer(COLORS[i % len(COLORS)], WIDTHS[i % len(WIDTHS)], points))
+    return strokes, total
+
+
+# 측정값(나노초) 목록을 통계로 정리
+def summarize(samples_ns, bytes_sent):
+    samples = np.array(samples_ns, dtype=np.float64) / 1e6
+    total = samples.sum()
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+        "max_ms": round(float(samples.max()), 4),
+        "ops_per_sec": round(len(samples) / total * 1000, 1) if total else None,
+        "bytes_per_op": round(bytes_sent / len(samples), 1),
+    }
+
+
+class Bench:
+    def __init__(self, engine, canvas, rng, samples):
+        self.engine = engine
+        self.canvas = canvas
+        self.rng = rng
+        self.samples = samples
+        self.heavy_samples = max(10, samples // 10) # 보기 영역 전체를 다시 그리는 조작의 측정 횟수
+
+    # fn(i)과 그 뒤의 flush를 samples번 실행하며 한 번씩 시간 측정
+    # 조작당 전송량과 함께 캔버스 업데이트 한 번(canvas.update() 또는 page.update(*도형))당 전송량도 기록
+    def measure(self, fn, count=None):
+        engine = self.engine
+        times = []
+        bytes_before = self.canvas.bytes_sent
+        updates_before = self.canvas.updates
+        for i in range(count or self.samples):
+            start = time.perf_counter_ns()
+            fn(i)
+            engine.flush()
+            times.append(time.perf_counter_ns() - start)
+        bytes_sent = self.canvas.bytes_sent - bytes_before
+        updates = self.canvas.updates - updates_before
+        result = summarize(times, bytes_sent)
+        result["bytes_per_update"] = round(bytes_sent / updates, 1) if updates else 0.0
+        return result
+
+    # 보기 영역 안에 있는 획 위의 점 count개 (선택, 드래그 대상)
+    def targets(self, count):
+        x0, y0, x1, y1 = self.engine.viewport.world_rect()
+        candidates = []
+        for stroke in self.engine.index.query_rect(x0, y0, x1, y1):
+            points = stroke.points
+            inside = (points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+            candidates.extend(points[inside].tolist())
+        picks = self.rng.integers(0, len(candidates), count)
+        return [tuple(candidates[k]) for k in picks.tolist()]
+
+    def add_point(self):
+        engine = self.engine
+        x, y = engine.viewport.to_world(VIEW_WIDTH / 2, VIEW_HEIGHT / 2)
+        engine.begin_stroke(x, y, "black", 3.0)
+        engine.flush()
+        angles = np.cumsum(self.rng.normal(0.0, 0.3, self.samples))
+        path = (np.column_stack((np.cos(angles), np.sin(angles))) * STEP).cumsum(axis=0) + (x, y)
+        path = path.tolist()
+        result = self.measure(lambda i: engine.extend_stroke(*path[i]))
+        engine.end_stroke()
+        engine.undo() # 문서를 원래대로 돌려 다음 측정에 영향이 없도록 함
+        engine.flush()
+        return result
+
+    # 앱처럼 UpdateScheduler로 프레임마다 모아서 보내며 그리기 (포인터 이벤트는 POINTER_INTERVAL 간격)
+    # 측정 시간은 핸들러 몫(점 추가 + 업데이트 요청)이고, flush 한 번에 합쳐진 이벤트 수도 함께 보고함
+    def add_point_60hz(self):
+        engine = self.engine
+        scheduler = UpdateScheduler(engine.flush, UPDATE_RATE_HZ)
+        x, y = engine.viewport.to_world(VIEW_WIDTH / 2, VIEW_HEIGHT / 2)
+        with scheduler.lock:
+            engine.begin_stroke(x, y, "black", 3.0)
+            scheduler.flush_now()
+        angles = np.cumsum(self.rng.normal(0.0, 0.3, self.samples))
+        path = (np.column_stack((np.cos(angles), np.sin(angles))) * STEP).cumsum(axis=0) + (x, y)
+        path = path.tolist()
+        times = []
+        bytes_before = self.canvas.bytes_sent
+        updates_before = self.canvas.updates
+        next_event = time.perf_counter()
+        for i in range(self.samples):
+            next_event += POINTER_INTERVAL
+            delay = next_event - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            start = time.perf_counter_ns()
+            with scheduler.lock:
+                engine.extend_stroke(*path[i])
+                scheduler.request()
+            times.append(time.perf_counter_ns() - start)
+        scheduler.flush_now()
+        scheduler.close()
+        bytes_sent = self.canvas.bytes_sent - bytes_before
+        updates = self.canvas.updates - updates_before
+        result = summarize(times, bytes_sent)
+        result["bytes_per_update"] = round(bytes_sent / updates, 1) if updates else 0.0
+        result["flush"] = scheduler.stats.summary()
+        engine.end_stroke()
+        engine.undo()
+        engine.flush()
+        return result
+
+    # 압력 감지 획 그리기: 샘플마다 두께가 바뀌어도 새 선분만 해당 두께 구간의 Path에 덧붙는지 확인
+    def add_pressure_point(self):
+        engine = self.engine
+        x, y = engine.viewport.to_world(VIEW_WIDTH / 2, VIEW_HEIGHT / 2)
+        engine.begin_stroke(x, y, "black", PRESSURE_MAX_WIDTH, variable_width=True)
+        engine.flush()
+        angles = np.cumsum(self.rng.normal(0.0, 0.3, self.samples))
+        path = (np.column_stack((np.cos(angles), np.sin(angles))) * STEP).cumsum(axis=0) + (x, y)
+        path = path.tolist()
+        # 두께는 천천히 오르내림 (압력 감지 필터를 거친 샘플처럼)
+        widths = (1.0 + (PRESSURE_MAX_WIDTH - 1.0) * (0.5 + 0.5 * np.sin(np.arange(self.samples) / 20))).tolist()
+        result = self.measure(lambda i: engine.extend_stroke(*path[i], widths[i]))
+        engine.end_stroke()
+        engine.undo()
+        engine.flush()
+        return result
+
+    def select(self):
+        engine = self.engine
+        targets = self.targets(self.samples)
+        result = self.measure(lambda i: engine.select_at(*targets[i % len(targets)]))
+        engine.deselect()
+        engine.flush()
+        return result
+
+    def erase_drag(self):
+        engine = self.engine
+        # 보기 영역을 가로지르는 지우개 드래그 한 번
+        xs = np.linspace(0, VIEW_WIDTH, self.samples)
+        path = [engine.viewport.to_world(x, VIEW_HEIGHT / 2) for x in xs.tolist()]
+        result = self.measure(lambda i: engine.erase_at(*path[i]))
+        engine.checkpoint()
+        engine.undo()
+        engine.flush()
+        return result
+
+    def translate(self):
+        engine = self.engine
+        x, y = self.targets(1)[0]
+        engine.begin_drag(x, y)
+        engine.flush()
+        angles = np.linspace(0, 2 * np.pi, self.samples)
+        path = (np.column_stack((np.cos(angles) - 1, np.sin(angles))) * 100 + (x, y)).tolist()
+        result = self.measure(lambda i: engine.drag_to(*path[i]))
+        engine.end_drag()
+        engine.undo()
+        engine.flush()
+        return result
+
+    # 화면 가운데 부근의 원을 올가미로 그려 선택 (경로 그리기 + 후보 검색과 포함 판정)
+    def lasso_select(self):
+        engine = self.engine
+        angles = np.linspace(0, 2 * np.pi, LASSO_POINTS)
+        circle = np.column_stack((np.cos(angles), np.sin(angles))) * LASSO_RADIUS
+        centers = self.rng.uniform((LASSO_RADIUS, LASSO_RADIUS), (VIEW_WIDTH - LASSO_RADIUS, VIEW_HEIGHT - LASSO_RADIUS), (self.samples, 2))
+
+        def lasso(i):
+            path = [engine.viewport.to_world(x, y) for x, y in (circle + centers[i]).tolist()]
+            engine.begin_lasso(*path[0])
+            for x, y in path[1:]:
+                engine.extend_lasso(x, y)
+            engine.end_lasso()
+
+        result = self.measure(lasso)
+        engine.deselect()
+        engine.flush()
+        return result
+
+    # 올가미로 선택한 획들을 함께 드래그 (드래그 이벤트 하나마다 측정)
+    def group_translate(self):
+        engine = self.engine
+        x0, y0 = engine.viewport.to_world(VIEW_WIDTH / 2 - LASSO_RADIUS, VIEW_HEIGHT / 2 - LASSO_RADIUS)
+        x1, y1 = engine.viewport.to_world(VIEW_WIDTH / 2 + LASSO_RADIUS, VIEW_HEIGHT / 2 + LASSO_RADIUS)
+        engine.begin_lasso(x0, y0, rectangle=True)
+        engine.extend_lasso(x1, y1)
+        selected = engine.end_lasso()
+        engine.flush()
+        x, y = selected[0].points[0].tolist() if selected else self.targets(1)[0]
+        engine.begin_drag(x, y)
+        angles = np.linspace(0, 2 * np.pi, self.samples)
+        path = (np.column_stack((np.cos(angles) - 1, np.sin(angles))) * 100 + (x, y)).tolist()
+        result = self.measure(lambda i: engine.drag_to(*path[i]))
+        engine.end_drag()
+        engine.undo()
+        engine.flush()
+        result["selected"] = len(selected)
+        return result
+
+    def scale(self):
+        engine = self.engine
+        engine.select_at(*self.targets(1)[0])
+        engine.flush()
+        result = self.measure(lambda i: engine.scale_selected(1.1 if i % 2 == 0 else 1 / 1.1))
+        engine.deselect()
+        engine.flush()
+        return result
+
+    # 화면 이동 드래그 도중 (캔버스 래퍼의 변환만 바뀜), 원을 그리며 제자리로 돌아온 뒤 드래그 종료
+    def pan(self):
+        engine = self.engine
+        angles = np.linspace(0, 2 * np.pi, self.samples + 1)
+        moves = np.diff(np.column_stack((np.cos(angles), np.sin(angles))) * 300, axis=0).tolist()
+        result = self.measure(lambda i: engine.pan_view(*moves[i]), len(moves))
+        engine.settle_view()
+        engine.flush()
+        return result
+
+    # 짧은 화면 이동 드래그 하나의 종료 (새로 보이는 획만 올리고 멀리 벗어난 획은 내림)
+    def pan_end(self):
+        engine = self.engine
+        angles = np.linspace(0, 2 * np.pi, self.heavy_samples + 1)
+        moves = np.diff(np.column_stack((np.cos(angles), np.sin(angles))) * 300, axis=0).tolist()
+
+        def pan(i):
+            engine.pan_view(*moves[i])
+            engine.settle_view()
+        return self.measure(pan, len(moves))
+
+    # 휠 확대/축소 도중 (캔버스 래퍼의 변환만 바뀜), 확대했다가 제자리로 축소한 뒤 확대/축소 확정
+    def zoom(self):
+        engine = self.engine
+        half = self.samples // 2
+        factors = [1.02] * half + [1 / 1.02] * half
+        result = self.measure(lambda i: engine.zoom_view(factors[i], VIEW_WIDTH / 2, VIEW_HEIGHT / 2), len(factors))
+        engine.settle_view()
+        engine.flush()
+        return result
+
+    # 멈춘 확대/축소의 확정 (올라간 도형을 새 배율로 다시 만듦)
+    def zoom_settle(self):
+        engine = self.engine
+        factors = [1.25, 1 / 1.25] * (self.heavy_samples // 2)
+
+        def zoom(i):
+            engine.zoom_view(factors[i], VIEW_WIDTH / 2, VIEW_HEIGHT / 2)
+            engine.settle_view()
+        return self.measure(zoom, len(factors))
+
+    def full_redraw(self):
+        return self.measure(lambda i: self.engine.redraw(), self.heavy_samples)
+
+
+# 공유 화이트보드 벤치마크용 pubsub (page.pubsub 대신)
+# 보낸 묶음은 대기열에 쌓아 두고 벤치마크가 프레임마다 측정하는 스레드에서 모든 세션에 전달함
+# (방송 타이머 스레드에서 세션의 엔진을 건드리지 않도록)
+class LocalPubSub:
+    def __init__(self, hub):
+        self.hub = hub
+
+    def subscribe_topic(self, topic, handler):
+        self.hub.handlers[self] = handler
+
+    def unsubscribe_topic(self, topic):
+        self.hub.handlers.pop(self, None)
+
+    def send_all_on_topic(self, topic, message):
+        with self.hub.lock:
+            self.hub.queue.append((topic, message))
+
+
+class LocalHub:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handlers = {}
+        self.queue = []
+
+    # 쌓인 묶음을 모든 세션에 전달하고 전달한 묶음 수 반환
+    def deliver(self):
+        with self.lock:
+            messages, self.queue = self.queue, []
+        for topic, message in messages:
+            for handler in list(self.handlers.values()):
+                handler(topic, message)
+        return len(messages)
+
+
+# 공유 화이트보드 벤치마크: clients개 세션이 합성 노트 하나를 함께 열고 모두 동시에 획을 그림
+# 한 프레임은 세션마다 점 하나 추가 + flush, 공유 문서의 방송, 받은 delta 적용 + flush이며
+# 프레임 지연과 세션당 전송량, 프레임당 delta 수를 잼 (세션 수가 늘 때 프레임 비용이 어떻게 커지는지 확인)
+def run_board(clients, count, seed, samples, quantum=0.0):
+    rng = np.random.default_rng(seed)
+    strokes, total_points = make_notebook(count, rng)
+    board = SharedBoard("benchmark")
+    hub = LocalHub()
+    sessions = []
+    start = time.perf_counter()
+    for i in range(clients):
+        canvas = HeadlessCanvas()
+        session = BoardSession(board, LocalPubSub(hub), threading.RLock())
+        viewport = Viewport(VIEW_WIDTH, VIEW_HEIGHT)
+        viewport.pan(VIEW_WIDTH / 2, VIEW_HEIGHT / 2)
+        engine = StrokeEngine(canvas, viewport, board=session, post_workers=0, quantum=quantum, layer=ViewLayer())
+        session.join(engine)
+        if i == 0:
+            engine.load(strokes) # 첫 세션이 노트를 불러오면 나머지 세션은 OP_RESET으로 받음
+            engine.flush()
+            board.flush()
+        sessions.append((engine, canvas))
+    hub.deliver()
+    for engine, canvas in sessions:
+        engine.flush()
+    setup_ms = (time.perf_counter() - start) * 1000
+
+    positions = [tuple(point) for point in rng.uniform(-300, 300, (clients, 2)).tolist()]
+    angles = rng.uniform(0, 2 * np.pi, clients)
+    times = []
+    messages = 0
+    received = sum(engine.board.received for engine, canvas in sessions)
+    bytes_before = sum(canvas.bytes_sent for engine, canvas in sessions)
+    for frame in range(samples):
+        frame_start = time.perf_counter_ns()
+        for i, (engine, canvas) in enumerate(sessions):
+            x, y = positions[i]
+            if frame % BOARD_STROKE_POINTS == 0:
+                if engine.current_stroke is not None:
+                    engine.end_stroke()
+                engine.begin_stroke(x, y, COLORS[i % len(COLORS)], WIDTHS[i % len(WIDTHS)])
+            else:
+                angles[i] += rng.normal(0.0, 0.3)
+                x += np.cos(angles[i]) * STEP
+                y += np.sin(angles[i]) * STEP
+                positions[i] = (x, y)
+                engine.extend_stroke(x, y)
+            engine.flush()
+        board.flush()
+        messages += hub.deliver()
+        for engine, canvas in sessions:
+            engine.flush()
+        times.append(time.perf_counter_ns() - frame_start)
+    bytes_sent = sum(canvas.bytes_sent for engine, canvas in sessions) - bytes_before
+    received = sum(engine.board.received for engine, canvas in sessions) - received
+    board.close()
+
+    result = summarize(times, bytes_sent)
+    result.update({
+        "clients": clients,
+        "strokes": count,
+        "points": total_points,
+        "setup_ms": round(setup_ms, 1),
+        "bytes_per_client_frame": round(bytes_sent / (clients * samples), 1),
+        "deltas_per_client_frame": round(received / (clients * samples), 2),
+        "broadcasts_per_frame": round(messages / samples, 2),
+        "consistent": len({len(engine.strokes) for engine, canvas in sessions}) == 1,
+    })
+    return result
+
+
+OPERATIONS = ["add_point", "add_point_60hz", "add_pressure_point", "select", "lasso_select", "erase_drag", "translate", "group_translate", "scale",
+              "pan", "pan_end", "zoom", "zoom_settle", "full_redraw"]
+
+
+def run_size(count, seed, samples, quantum=0.0):
+    rng = np.random.default_rng(seed)
+    strokes, total_points = make_notebook(count, rng)
+
+    canvas = HeadlessCanvas()
+    # 문서 중앙이 화면 중앙에 오도록 보기 영역 배치
+    viewport = Viewport(VIEW_WIDTH, VIEW_HEIGHT)
+    viewport.pan(VIEW_WIDTH / 2, VIEW_HEIGHT / 2)
+    # 측정마다 같은 결과가 나오도록 끝난 획의 후처리는 작업자 스레드 없이 그 자리에서 실행
+    engine = StrokeEngine(canvas, viewport, post_workers=0, quantum=quantum, layer=ViewLayer())
+    start = time.perf_counter()
+    engine.load(strokes)
+    engine.flush()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    bench = Bench(engine, canvas, rng, samples)
+    result = {
+        "strokes": count,
+        "points": total_points,
+        "load_ms": round(load_ms, 1),
+        "visible_strokes": len(engine.culler.visible),
+        "shapes": engine.renderer.shape_count,
+        "operations": {},
+    }
+    for name in OPERATIONS:
+        result["operations"][name] = getattr(bench, name)()
+    result["simplify"] = engine.simplifier.stats.summary() # 측정 중 그린 획들의 단순화 결과
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="필기 엔진 벤치마크")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="합성 노트의 획 수 (쉼표로 구분)")
+    parser.add_argument("--samples", type=int, default=200, help="조작마다 측정할 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json", help="결과 JSON 파일")
+    parser.add_argument("--quantize", type=float, default=0.0, help="캔버스로 보내는 화면 좌표의 격자 간격 (px, 0이면 반올림하지 않음)")
+    parser.add_argument("--board-clients", type=int, default=BOARD_CLIENTS,
+                        help="공유 화이트보드 벤치마크의 세션 수 (0이면 실행하지 않음, 노트는 --sizes의 첫 크기)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "samples": args.samples,
+            "view": [VIEW_WIDTH, VIEW_HEIGHT],
+            "quantum": args.quantize,
+        },
+        "results": [],
+    }
+    sizes = [int(size) for size in args.sizes.split(",")]
+    for count in sizes:
+        result = run_size(count, args.seed, args.samples, args.quantize)
+        report["results"].append(result)
+        print(f"획 {count}개 (점 {result['points']}개, 보이는 획 {result['visible_strokes']}개, "
+              f"도형 {result['shapes']}개, 불러오기 {result['load_ms']:.0f} ms)")
+        for name, stats in result["operations"].items():
+            print(f"  {name:<18} p50 {stats['p50_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms  "
+                  f"{stats['ops_per_sec']:10.1f} ops/s  {stats['bytes_per_op']:10.0f} B/op  "
+                  f"{stats['bytes_per_update']:10.0f} B/update")
+            if "flush" in stats:
+                flush = stats["flush"]
+                print(f"  {'':<18} flush {flush['flushes']}회, flush당 이벤트 평균 {flush['average_batch']:.1f} 최대 {flush['max_batch']}")
+        simplify = result["simplify"]
+        print(f"  단순화: 획 {simplify['strokes']}개, 입력 {simplify['input_points']}점 중 "
+              f"거리 필터 {simplify['removed_radial']}점, RDP {simplify['removed_rdp']}점 제거")
+
+    if args.board_clients:
+        board = run_board(args.board_clients, sizes[0], args.seed, args.samples, args.quantize)
+        report["board"] = board
+        print(f"공유 화이트보드 세션 {board['clients']}개 (획 {board['strokes']}개, 준비 {board['setup_ms']:.0f} ms)")
+        print(f"  frame              p50 {board['p50_ms']:8.3f} ms  p99 {board['p99_ms']:8.3f} ms  "
+              f"{board['bytes_per_client_frame']:10.0f} B/client/frame  "
+              f"delta {board['deltas_per_client_frame']:.1f}/client/frame  일치 {board['consistent']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과를 {args.output}에 저장했습니다")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import numpy as np
+
+
+# 끝난 획의 꺾은선을 오차 범위 안에서 3차 베지어 곡선들로 근사 (Philip J. Schneider, "An Algorithm for
+# Automatically Fitting Digitized Curves", Graphics Gems, 1990)
+# 결과는 (3 * 곡선 수 + 1, 2) 형태의 제어점 배열: [p0, c1, c2, p1, c1, c2, p2, ...]
+
+MAX_REPARAMETERIZE_ITERATIONS = 4
+# 오차는 점에서만 측정되므로, 단순화로 듬성듬성해진 점 사이에서 곡선이 벗어나지 않도록 이 간격(화면 px)으로 점을 채움
+# 월드 좌표로 근사할 때는 근사 시점의 보기 배율로 나눈 간격을 넘김 (확대해서 그린 획은 더 촘촘하게)
+DENSIFY_SPACING = 3.0
+
+
+def _normalize(v):
+    length = float(np.hypot(v[0], v[1]))
+    return v / length if length > 0 else v
+
+
+# 각 선분을 spacing 이하 간격으로 나누어 점을 보간
+def _densify(points, spacing):
+    seg = points[1:] - points[:-1]
+    counts = np.maximum(np.ceil(np.hypot(*seg.T) / spacing).astype(np.intp), 1)
+    if (counts == 1).all():
+        return points
+    starts = np.repeat(points[:-1], counts, axis=0)
+    steps = np.repeat(seg / counts[:, None], counts, axis=0)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.vstack((starts + steps * offsets[:, None], points[-1:]))
+
+
+# 곡선 파라미터 u에서의 베지어 곡선 위치
+def _bezier(bez, u):
+    mu = 1.0 - u
+    return (
+        (mu * mu * mu)[:, None] * bez[0]
+        + (3 * mu * mu * u)[:, None] * bez[1]
+        + (3 * mu * u * u)[:, None] * bez[2]
+        + (u * u * u)[:, None] * bez[3]
+    )
+
+
+# 점 사이 거리 비율로 초기 파라미터 계산
+def _chord_length_parameterize(points):
+    d = np.hypot(*(points[1:] - points[:-1]).T)
+    u = np.concatenate(([0.0], np.cumsum(d)))
+    return u / u[-1] if u[-1] > 0 else np.linspace(0.0, 1.0, len(points))
+
+
+# 양 끝 접선 방향을 고정하고 최소제곱으로 두 내부 제어점을 계산
+def _generate_bezier(points, u, left_tangent, right_tangent):
+    p0 = points[0]
+    p3 = points[-1]
+    mu = 1.0 - u
+    b0 = mu * mu * mu
+    b1 = 3 * mu * mu * u
+    b2 = 3 * mu * u * u
+    b3 = u * u * u
+
+    a1 = b1[:, None] * left_tangent
+    a2 = b2[:, None] * right_tangent
+    c00 = float((a1 * a1).sum())
+    c01 = float((a1 * a2).sum())
+    c11 = float((a2 * a2).sum())
+    tmp = points - ((b0 + b1)[:, None] * p0 + (b2 + b3)[:, None] * p3)
+    x0 = float((a1 * tmp).sum())
+    x1 = float((a2 * tmp).sum())
+
+    det = c00 * c11 - c01 * c01
+    alpha_l = (x0 * c11 - x1 * c01) / det if det != 0 else 0.0
+    alpha_r = (c00 * x1 - c01 * x0) / det if det != 0 else 0.0
+
+    # 해가 퇴화하면 (음수 또는 0에 가까운 길이) 양 끝 거리의 1/3을 쓰는 휴리스틱 사용
+    seg_length = float(np.hypot(*(p3 - p0)))
+    epsilon = 1e-6 * seg_length
+    if alpha_l < epsilon or alpha_r < epsilon:
+        alpha_l = alpha_r = seg_length / 3.0
+    return np.array([p0, p0 + left_tangent * alpha_l, p3 + right_tangent * alpha_r, p3])
+
+
+# 뉴턴-랩슨 한 단계로 각 점에 더 가까운 곡선 파라미터를 다시 구함
+def _reparameterize(bez, points, u):
+    mu = 1.0 - u
+    d1 = 3 * (bez[1:] - bez[:-1]) # 1차 도함수의 제어점
+    d2 = 2 * (d1[1:] - d1[:-1]) # 2차 도함수의 제어점
+    q = _bezier(bez, u) - points
+    q1 = (mu * mu)[:, None] * d1[0] + (2 * mu * u)[:, None] * d1[1] + (u * u)[:, None] * d1[2]
+    q2 = mu[:, None] * d2[0] + u[:, None] * d2[1]
+    numerator = (q * q1).sum(axis=1)
+    denominator = (q1 * q1).sum(axis=1) + (q * q2).sum(axis=1)
+    step = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+    return np.clip(u - step, 0.0, 1.0)
+
+
+# 점들과 곡선 사이의 최대 오차(제곱)와 그 위치
+def _max_error(points, bez, u):
+    d = _bezier(bez, u) - points
+    dist_sq = (d * d).sum(axis=1)
+    split = int(dist_sq.argmax())
+    if split == 0 or split == len(points) - 1:
+        split = len(points) // 2
+    return float(dist_sq.max()), split
+
+
+# 한 구간의 점들을 하나의 곡선으로 근사해 보고, 오차 안에 들어오면 곡선을 반환 (실패하면 None과 나눌 위치)
+def _fit_one(points, left_tangent, right_tangent, error_sq):
+    if len(points) == 2:
+        dist = float(np.hypot(*(points[1] - points[0]))) / 3.0
+        return np.array([
+            points[0], points[0] + left_tangent * dist, points[1] + right_tangent * dist, points[1],
+        ]), None
+
+    u = _chord_length_parameterize(points)
+    bez = _generate_bezier(points, u, left_tangent, right_tangent)
+    err, split = _max_error(points, bez, u)
+    if err < error_sq:
+        return bez, None
+
+    # 오차가 크지 않으면 파라미터를 다듬어 다시 시도
+    if err < error_sq * 16:
+        for _ in range(MAX_REPARAMETERIZE_ITERATIONS):
+            u = _reparameterize(bez, points, u)
+            bez = _generate_bezier(points, u, left_tangent, right_tangent)
+            err, split = _max_error(points, bez, u)
+            if err < error_sq:
+                return bez, None
+    return None, split
+
+
+# 점 배열을 max_error 이내의 3차 베지어 곡선들로 근사하여 제어점 배열 반환
+# max_error와 spacing(점을 채울 간격)은 points와 같은 좌표 단위
+def fit_cubic_beziers(points, max_error, spacing=DENSIFY_SPACING):
+    points = np.asarray(points, dtype=np.float64)
+    if len(points):
+        # 연속으로 같은 점은 접선을 정의할 수 없으므로 제거
+        distinct = np.ones(len(points), dtype=bool)
+        distinct[1:] = (points[1:] != points[:-1]).any(axis=1)
+        points = points[distinct]
+    if len(points) < 2:
+        return None
+    points = _densify(points, spacing)
+
+    error_sq = max_error * max_error
+    segments = []
+    # 재귀 대신 스택 사용 (왼쪽 구간이 먼저 나오도록 오른쪽 구간을 먼저 넣음)
+    stack = [(0, len(points) - 1, _normalize(points[1] - points[0]), _normalize(points[-2] - points[-1]))]
+    while stack:
+        first, last, left_tangent, right_tangent = stack.pop()
+        bez, split = _fit_one(points[first:last + 1], left_tangent, right_tangent, error_sq)
+        if bez is not None:
+            segments.append(bez)
+            continue
+        # 오차가 가장 큰 점에서 나누어 양쪽을 따로 근사
+        split += first
+        center_tangent = _normalize(points[split - 1] - points[split + 1])
+        if not center_tangent.any():
+            center_tangent = _normalize(points[split - 1] - points[split])
+        stack.append((split, last, -center_tangent, right_tangent))
+        stack.append((first, split, left_tangent, center_tangent))
+
+    controls = [segments[0][0]]
+    for bez in segments:
+        controls.extend(bez[1:])
+    return np.array(controls)
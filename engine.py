@@ -0,0 +1,534 @@
+from curve_fit import DENSIFY_SPACING
+from history import AddStroke, History, RemoveStroke, ScaleStrokes, TranslateStrokes
+from page_store import PageStore
+from postprocess import StrokePipeline
+from renderer import CanvasRenderer
+from selection import strokes_in_polygon
+from simplify import StrokeSimplifier
+from spatial_index import StrokeIndex
+from stroke import Stroke, bake_transforms
+from viewport import Viewport, ViewportCuller
+
+
+# UI 없이 동작하는 필기 엔진
+# 문서(획 목록, 공간 인덱스, 보기 영역)와 그리기/선택/지우기/이동/크기 조정/실행 취소 같은 조작,
+# 캔버스에 보낼 도형을 준비하는 렌더 계층을 함께 묶음
+# 좌표는 모두 월드 좌표이며 (화면 좌표는 viewport.to_world로 바꿔서 전달), 화면 반영은 flush()를 호출할 때 일어남
+# main.py는 Flet 이벤트를 이 엔진 호출로 옮기는 얇은 계층이고, benchmark.py는 HeadlessCanvas로 엔진만 실행함
+class StrokeEngine:
+    HIT_TOLERANCE = 5 # 선택/지우기 충돌 검사 허용 오차 (화면 px)
+    VIEW_MARGIN = 200.0 # 보기 영역 바깥으로 이 거리(px) 안에 있는 획까지 미리 캔버스에 올림
+    VIEW_KEEP_MARGIN = 400.0 # 보기 영역 바깥으로 이 거리(px)보다 멀어진 획만 캔버스에서 내림
+    # 획 단순화 설정 (화면 px, 0이면 해당 단계를 끔)
+    SIMPLIFY_MIN_DISTANCE = 1.0 # 그리는 도중 직전 점과 이 거리 미만인 샘플은 저장하지 않음
+    SIMPLIFY_TOLERANCE = 0.5 # 그리기 종료 시 RDP 단순화 허용 오차
+    CURVE_FIT_ERROR = 1.0 # 끝난 획을 베지어 곡선으로 근사할 때 허용 오차, 0이면 곡선 근사를 하지 않음
+    HISTORY_MAX_BYTES = 32 * 1024 * 1024 # 실행 취소 기록이 붙잡아 둘 수 있는 최대 메모리 (삭제된 획의 점 포함)
+    HISTORY_MAX_STEPS = 1000 # 실행 취소할 수 있는 최대 단계 수
+    PAGE_BUDGET_BYTES = 256 * 1024 * 1024 # 메모리에 둘 획 점 데이터의 최대 크기 (넘으면 보기 영역에서 먼 획부터 디스크로 내보냄)
+    POST_WORKERS = 2 # 끝난 획의 단순화/곡선 근사를 실행할 작업자 스레드 수
+    COORDINATE_QUANTUM = 0.0 # 캔버스로 보내는 화면 좌표를 반올림할 격자 간격(px), 0이면 반올림하지 않음
+    # 올가미/사각형 선택 설정
+    LASSO_COLOR = "blue400" # 선택 영역 경로 색상
+    LASSO_WIDTH = 1.5 # 선택 영역 경로 두께 (화면 px)
+    LASSO_MIN_INSIDE = 0.5 # 점의 이 비율 이상이 선택 영역 안에 있는 획을 선택
+
+    # canvas: 도형을 올릴 캔버스 (StrokeCanvas 또는 HeadlessCanvas)
+    # journal: 변경 사항을 기록할 자동 저장 저널 (None이면 기록하지 않음)
+    # board: 변경 사항을 다른 세션에 보낼 공유 문서 연결 (shared_board.BoardSession, None이면 혼자 쓰는 문서)
+    # page_budget: 메모리에 둘 획 점 데이터의 최대 크기(바이트, None이면 PAGE_BUDGET_BYTES)
+    # post_workers: 끝난 획의 후처리 작업자 스레드 수 (None이면 POST_WORKERS, 0이면 그리기 종료 때 바로 처리)
+    # quantum: 캔버스로 보내는 화면 좌표의 격자 간격(px, None이면 COORDINATE_QUANTUM), 문서의 점은 그대로 둠
+    # layer: 캔버스를 감싸 보기 영역 변환을 받는 renderer.ViewLayer (None이면 보기 영역이 바뀔 때마다 도형을 다시 만듦)
+    def __init__(self, canvas, viewport=None, journal=None, board=None, page_budget=None, post_workers=None,
+                 quantum=None, layer=None):
+        self.strokes = [] # 문서의 모든 획 (그려진 순서)
+        self.index = StrokeIndex() # 선택/지우기 충돌 검사를 위한 획 공간 인덱스
+        self.viewport = viewport if viewport is not None else Viewport()
+        # 캔버스의 도형을 만든 기준 보기 영역 (이동/확대 제스처 중에는 그대로 두고 layer의 변환으로 현재 보기 영역을 보여줌)
+        self.render_view = Viewport(self.viewport.width, self.viewport.height)
+        self._sync_render_view()
+        self.journal = journal
+        self.board = board
+        # 변경된 획만 캔버스에 반영하는 렌더 계층
+        self.renderer = CanvasRenderer(canvas, self.render_view, self.COORDINATE_QUANTUM if quantum is None else quantum, layer)
+        self.culler = ViewportCuller(self.index, self.renderer, self.viewport, self.VIEW_MARGIN, self.VIEW_KEEP_MARGIN)
+        self.simplifier = StrokeSimplifier(self.SIMPLIFY_MIN_DISTANCE, self.SIMPLIFY_TOLERANCE)
+        self.history = History(self, self.HISTORY_MAX_BYTES, self.HISTORY_MAX_STEPS) # 엔진이 명령을 적용하는 editor
+        # 오래 쓰이지 않은 획의 점 데이터를 디스크로 내보내는 페이지 저장소 (보기 영역 근처의 획은 내보내지 않음)
+        self.pages = PageStore(self.PAGE_BUDGET_BYTES if page_budget is None else page_budget)
+        # 끝난 획의 단순화/곡선 근사를 핸들러 밖에서 실행하는 후처리 파이프라인 (결과는 flush에서 적용)
+        self.pipeline = StrokePipeline(self.POST_WORKERS if post_workers is None else post_workers)
+        self.current_stroke = None # 지금 그리고 있는 획
+        self.selection = {} # 선택된 획 (선택된 순서를 유지하는 집합으로 사용)
+        # 선택된 획들을 드래그할 때 직전 포인터 위치 (드래그 중이 아니면 None)
+        self._drag_x = None
+        self._drag_y = None
+        # 그리고 있는 선택 영역 경로 (문서에는 들어가지 않고 캔버스에만 올라감, 없으면 None)
+        self.lasso = None
+        self._lasso_rectangle = False
+        self._lasso_x = None # 사각형 선택의 시작 모서리
+        self._lasso_y = None
+
+    # ---- 문서 (History의 editor 메서드 포함) ----
+
+    # 획을 문서에 추가 (목록, 공간 인덱스, 캔버스를 함께 갱신)
+    # live: 지금 그리는 중인 획이면 True (그리기가 끝날 때까지 단독 도형으로 그려짐)
+    # 캔버스에는 보기 영역 근처에 있는 획만 올라감
+    def add_stroke(self, stroke, live=False):
+        self.strokes.append(stroke)
+        self.index.insert(stroke)
+        self.culler.track(stroke, live=live)
+        self.pages.touch(stroke)
+
+    # 획을 문서에서 제거하고 제거 전 목록에서의 위치 반환
+    # erased: 지우개로 지운 경우 True (저널에 기록되는 작업 종류만 다름)
+    def remove_stroke(self, stroke, erased=False):
+        if stroke.owner_index is None:
+            return None # 다른 세션에서 이미 지운 획 (공유 문서에서 실행 취소할 때)
+        self.pipeline.cancel(stroke) # 후처리 결과가 오기 전에 지워진 획이면 결과를 버림
+        if self.journal is not None:
+            self.journal.log_remove(stroke, erased)
+        if self.board is not None:
+            self.board.remove(stroke, erased)
+        if stroke in self.selection:
+            del self.selection[stroke]
+            stroke.is_selected = False
+        index = self.strokes.index(stroke)
+        del self.strokes[index]
+        self.index.remove(stroke)
+        self.culler.untrack(stroke)
+        self.pages.discard(stroke)
+        return index
+
+    # 실행 취소로 되살아나는 획을 목록의 원래 위치에 다시 넣음
+    def insert_stroke(self, stroke, index):
+        stroke.is_selected = False
+        self.strokes.insert(index, stroke)
+        self.index.insert(stroke) # 기존 z-순서를 그대로 사용
+        self.culler.track(stroke)
+        self.pages.touch(stroke)
+        if self.journal is not None:
+            self.journal.log_add(stroke)
+        if self.board is not None:
+            self.board.add(stroke)
+
+    # 이동/크기 조정할 수 있는 획 (다른 세션에서 지웠거나 아직 그리는 중인 획은 제외)
+    def _movable(self, strokes):
+        board = self.board
+        return [stroke for stroke in strokes
+                if stroke.owner_index is not None and (board is None or not board.is_drawing(stroke))]
+
+    # 획들을 함께 이동 (드래그, 실행 취소 공통), 옮긴 획 목록 반환
+    # 획마다 누적 변환만 바꾸므로 점 개수와 무관하며, 점 버퍼에는 드래그가 끝날 때 한 번에 반영됨
+    def translate_strokes(self, strokes, dx, dy):
+        strokes = self._movable(strokes)
+        for stroke in strokes:
+            self._cancel_processing(stroke)
+            stroke.translate(dx, dy)
+            self.renderer.invalidate(stroke, rebuild=True)
+            self.culler.update(stroke)
+        if self.journal is not None:
+            self.journal.log_translate(strokes, dx, dy)
+        if self.board is not None:
+            self.board.translate(strokes, dx, dy)
+        return strokes
+
+    # 획들을 (center_x, center_y) 기준으로 함께 크기 조정 (버튼, 실행 취소 공통), 크기를 바꾼 획 목록 반환
+    def scale_strokes(self, strokes, factor, center_x, center_y):
+        strokes = self._movable(strokes)
+        for stroke in strokes:
+            self._cancel_processing(stroke)
+            stroke.scale(factor, center_x, center_y)
+            self.renderer.invalidate(stroke, rebuild=True)
+            self.culler.update(stroke)
+        if self.journal is not None:
+            self.journal.log_scale(strokes, factor, center_x, center_y)
+        if self.board is not None:
+            self.board.scale(strokes, factor, center_x, center_y)
+        return strokes
+
+    # 문서의 모든 획 제거
+    def clear(self):
+        self.pipeline.cancel_all()
+        self.strokes.clear()
+        self.index.clear()
+        self.culler.clear()
+        self.renderer.clear()
+        self.pages.clear()
+        self.current_stroke = None
+        self.selection.clear()
+        self._drag_x = None
+        self._drag_y = None
+        self.lasso = None
+
+    # 문서를 strokes로 교체 (노트 불러오기, 복구 등). 이전 문서로는 실행 취소할 수 없음
+    def load(self, strokes):
+        self.clear()
+        for stroke in strokes:
+            self.add_stroke(stroke)
+        if self.journal is not None:
+            self.journal.reset(strokes)
+        if self.board is not None:
+            self.board.reset(strokes)
+        self.history.clear()
+
+    # ---- 충돌 검사와 선택 ----
+
+    # 월드 좌표 (x, y)에 걸리는 획을 가장 위에 그려진 획부터 반환
+    def hit_strokes(self, x, y):
+        tolerance = self.HIT_TOLERANCE / self.viewport.zoom # 화면에서 같은 거리가 되도록 배율로 나눔
+        for stroke in self.index.query_point(x, y, tolerance):
+            if stroke.is_hit(x, y, tolerance):
+                self.pages.touch(stroke)
+                yield stroke
+
+    # 획의 선택 상태를 바꾸고 다음 flush 때 스타일만 다시 보내도록 표시
+    def set_selected(self, stroke, selected):
+        stroke.is_selected = selected
+        self.renderer.invalidate(stroke, restyle=True)
+
+    # 선택 해제. 선택된 획이 있었으면 True
+    def deselect(self):
+        if not self.selection:
+            return False
+        for stroke in self.selection:
+            self.set_selected(stroke, False)
+        self.selection.clear()
+        return True
+
+    # 선택을 strokes로 교체 (바뀐 획만 다시 보냄)
+    def select_strokes(self, strokes):
+        selection = dict.fromkeys(strokes)
+        for stroke in self.selection:
+            if stroke not in selection:
+                self.set_selected(stroke, False)
+        for stroke in selection:
+            if stroke not in self.selection:
+                self.set_selected(stroke, True)
+        self.selection = selection
+
+    # (x, y)에 걸리는 가장 위의 획 하나를 선택하고 반환 (없으면 선택 해제 후 None)
+    # keep: 걸린 획이 이미 선택되어 있으면 선택을 그대로 둠 (선택된 획들을 함께 드래그할 때)
+    def select_at(self, x, y, keep=False):
+        stroke = next(self.hit_strokes(x, y), None)
+        if stroke is None:
+            self.deselect()
+        elif not (keep and stroke in self.selection):
+            self.select_strokes((stroke,))
+        return stroke
+
+    # 선택 영역 그리기 시작 (rectangle이면 (x, y)를 한 모서리로 하는 사각형, 아니면 자유 곡선 올가미)
+    def begin_lasso(self, x, y, rectangle=False):
+        self.cancel_lasso()
+        lasso = Stroke(self.LASSO_COLOR, self.LASSO_WIDTH / self.viewport.zoom)
+        lasso.add_point(x, y)
+        self.lasso = lasso
+        self._lasso_rectangle = rectangle
+        self._lasso_x = x
+        self._lasso_y = y
+        self.renderer.add(lasso, live=True)
+        return lasso
+
+    # 선택 영역을 포인터 위치까지 넓힘
+    def extend_lasso(self, x, y):
+        lasso = self.lasso
+        if lasso is None:
+            return False
+        if self._lasso_rectangle:
+            x0, y0 = self._lasso_x, self._lasso_y
+            lasso.set_points([(x0, y0), (x, y0), (x, y), (x0, y), (x0, y0)])
+            self.renderer.invalidate(lasso, rebuild=True)
+        else:
+            lasso.add_point(x, y)
+            self.renderer.invalidate(lasso) # 덧붙여진 Path 요소만 전송
+        return True
+
+    # 선택 영역 경로를 캔버스에서 내림
+    def cancel_lasso(self):
+        if self.lasso is not None:
+            self.renderer.remove(self.lasso)
+            self.lasso = None
+
+    # 선택 영역 확정: 경계 상자가 겹치는 획을 공간 인덱스에서 찾은 뒤
+    # 점들이 선택 영역 다각형 안에 있는지 한 번에 판정하여 선택. 선택된 획 목록 반환
+    def end_lasso(self):
+        lasso = self.lasso
+        if lasso is None:
+            return []
+        self.cancel_lasso()
+        candidates = self.index.query_rect(lasso.min_x, lasso.min_y, lasso.max_x, lasso.max_y)
+        selected = strokes_in_polygon(candidates, lasso.points, self.LASSO_MIN_INSIDE, 1.0 / self.viewport.zoom)
+        selected.sort(key=lambda stroke: stroke.z_order)
+        self.select_strokes(selected)
+        return selected
+
+    # ---- 그리기 ----
+
+    # 새 획 시작 (단순화/곡선 근사 기준은 화면 px이므로 현재 배율로 월드 좌표 단위로 환산)
+    # variable_width: 점마다 두께를 저장하는 획(압력 감지)이면 True, width는 첫 점의 두께
+    def begin_stroke(self, x, y, color, width, variable_width=False):
+        stroke = Stroke(color, width, variable_width)
+        stroke.add_point(x, y)
+        self.simplifier.min_distance = self.SIMPLIFY_MIN_DISTANCE / self.viewport.zoom
+        self.simplifier.tolerance = self.SIMPLIFY_TOLERANCE / self.viewport.zoom
+        self.simplifier.begin(stroke, x, y)
+        self.add_stroke(stroke, live=True)
+        self.current_stroke = stroke
+        if self.board is not None:
+            self.board.begin(stroke)
+        return stroke
+
+    # 그리는 중인 획에 샘플 추가. 직전 점과 너무 가까워 버려졌으면 False
+    # width: 샘플의 두께 (점마다 두께를 저장하는 획에서만 사용)
+    def extend_stroke(self, x, y, width=None):
+        stroke = self.current_stroke
+        if stroke is None or not self.simplifier.accept(x, y, width):
+            return False
+        stroke.add_point(x, y, width)
+        self.renderer.invalidate(stroke) # 덧붙여진 Path 요소만 전송 (점마다 두께가 있으면 해당 두께 구간의 Path에만)
+        return True
+
+    # 그리기 종료: 마지막 샘플을 반영하고 실행 취소 한 단계로 기록한 뒤, RDP 단순화와 곡선 근사를 후처리 파이프라인에 맡김
+    # 획은 후처리 결과가 적용될 때(apply_processed) 확정됨. 그 전까지는 그린 점 그대로 단독 도형으로 보임
+    def end_stroke(self):
+        stroke = self.current_stroke
+        if stroke is None:
+            return None
+        self.current_stroke = None
+        if self.simplifier.finish():
+            self.renderer.invalidate(stroke)
+        stroke.trim() # 남는 버퍼 용량 반환
+        self.history.record(AddStroke(stroke, len(self.strokes) - 1)) # 그리는 중인 획은 항상 목록의 마지막
+        self.history.checkpoint()
+        if self.journal is not None:
+            self.journal.log_add(stroke) # 후처리 전에 앱이 죽어도 그린 점 그대로 복구되도록 먼저 기록
+        zoom = self.viewport.zoom
+        self.pipeline.submit(stroke, self.simplifier.tolerance, self.CURVE_FIT_ERROR / zoom, DENSIFY_SPACING / zoom)
+        if not self.pipeline.workers:
+            self.apply_processed()
+        return stroke
+
+    # 끝난 후처리 결과를 획에 한 번에 적용하고 획을 확정 (flush 때마다 호출)
+    # 획의 점, 제어점, 점 두께를 함께 교체하므로 렌더링이나 충돌 검사가 반쯤 적용된 상태를 보는 일이 없음
+    def apply_processed(self):
+        for stroke, result in self.pipeline.take_ready():
+            if stroke.owner_index is None:
+                continue # 결과가 오기 전에 문서에서 빠진 획 (저널, 공유 문서, 캔버스에 다시 올리지 않음)
+            if result is not None:
+                points, curves, widths, removed = result
+                self.simplifier.stats.removed_rdp += removed
+                if removed or curves is not None:
+                    stroke.set_points(points, curves, widths)
+                    self.renderer.invalidate(stroke, rebuild=True)
+                    if self.journal is not None:
+                        self.journal.log_points(stroke) # 단순화/곡선 근사된 점으로 교체
+            self._commit_stroke(stroke)
+
+    # 다 그린 획을 확정: 묶음 도형으로 합치고 다른 세션에 완성된 점을 보냄 (저널에는 end_stroke와 apply_processed가 기록)
+    def _commit_stroke(self, stroke):
+        self.pages.touch(stroke) # 다 그린 획의 크기로 메모리 사용량을 다시 셈
+        self.renderer.commit(stroke) # 확정된 획은 같은 Paint의 묶음 도형으로 합침
+        if self.board is not None:
+            self.board.finish(stroke) # 단순화/곡선 근사가 끝난 점을 다른 세션에 보냄
+
+    # 후처리 중인 획을 바꾸기 전에 작업을 취소하고 그린 점 그대로 확정 (결과가 바뀐 점과 맞지 않으므로)
+    def _cancel_processing(self, stroke):
+        if self.pipeline.cancel(stroke):
+            self._commit_stroke(stroke)
+
+    # 다른 세션에서 그리는 중인 획에 받은 점들을 덧붙임 (덧붙여진 Path 요소만 전송)
+    # widths: 점마다의 두께 (두께가 일정한 획이면 None)
+    def append_points(self, stroke, points, widths=None):
+        if widths is None:
+            for x, y in points.tolist():
+                stroke.add_point(x, y)
+        else:
+            for (x, y), width in zip(points.tolist(), widths.tolist()):
+                stroke.add_point(x, y, width)
+        self.renderer.invalidate(stroke)
+
+    # 다른 세션에서 끝난 획을 확정 (단순화/곡선 근사 결과로 점을 교체하고 묶음 도형으로 합침)
+    def finish_remote_stroke(self, stroke, points, curves, widths=None):
+        stroke.set_points(points, curves, widths)
+        self.pages.touch(stroke)
+        self.renderer.invalidate(stroke, rebuild=True)
+        self.renderer.commit(stroke)
+        self.culler.update(stroke) # 보기 영역 밖의 획이면 캔버스에서 내림
+
+    # ---- 지우기 ----
+
+    # (x, y)에 걸리는 획들을 지우고 지운 획 목록 반환 (single이면 가장 위의 획 하나만)
+    # 한 번의 지우개 드래그가 끝나면 checkpoint()를 호출해야 한 단계로 되돌릴 수 있음
+    def erase_at(self, x, y, single=False):
+        hits = list(self.hit_strokes(x, y))
+        if single:
+            hits = hits[:1]
+        for stroke in hits:
+            self.history.record(RemoveStroke(stroke, self.remove_stroke(stroke, erased=True)))
+        return hits
+
+    # 지금까지의 변경을 실행 취소 한 단계로 묶음 (제스처가 끝날 때 호출)
+    def checkpoint(self):
+        self.history.checkpoint()
+
+    # ---- 선택된 획 조작 ----
+
+    # (x, y)의 획에서 드래그 시작. 이미 선택된 획이면 선택된 획들을 함께, 아니면 그 획만 선택하여 옮김
+    # 걸리는 획이 없으면 선택을 해제하고 None 반환 (선택 영역 그리기로 이어짐)
+    def begin_drag(self, x, y):
+        stroke = self.select_at(x, y, keep=True)
+        if stroke is not None:
+            self._drag_x = x
+            self._drag_y = y
+        return stroke
+
+    # 선택된 획들을 포인터 위치까지 이동. 드래그 중이 아니면 False
+    def drag_to(self, x, y):
+        if not self.selection or self._drag_x is None:
+            return False
+        dx = x - self._drag_x
+        dy = y - self._drag_y
+        moved = self.translate_strokes(self.selection, dx, dy)
+        if moved:
+            self.history.record(TranslateStrokes(moved, dx, dy)) # 같은 드래그의 이동은 하나로 합쳐짐
+        self._drag_x = x
+        self._drag_y = y
+        return True
+
+    # 드래그 종료: 드래그 동안 누적된 이동을 선택된 모든 획의 점 버퍼에 한 번의 배열 연산으로 반영
+    def end_drag(self):
+        dragging = self._drag_x is not None
+        self._drag_x = None
+        self._drag_y = None
+        if not self.selection or not dragging:
+            return False
+        bake_transforms(self.selection)
+        for stroke in self.selection:
+            self.culler.update(stroke) # 보기 영역 밖으로 옮겨졌으면 캔버스에서 내림
+            self.pages.touch(stroke) # 디스크로 내보냈던 획도 변환을 적용하면 메모리로 올라옴
+        self.history.checkpoint()
+        return True
+
+    # 선택된 획들을 전체 경계 상자의 중심 기준으로 함께 크기 조정
+    def scale_selected(self, factor):
+        strokes = [stroke for stroke in self.selection if stroke.point_count]
+        if not strokes:
+            return False
+        center_x = (min(stroke.min_x for stroke in strokes) + max(stroke.max_x for stroke in strokes)) / 2
+        center_y = (min(stroke.min_y for stroke in strokes) + max(stroke.max_y for stroke in strokes)) / 2
+        strokes = self.scale_strokes(strokes, factor, center_x, center_y)
+        if not strokes:
+            return False
+        self.history.record(ScaleStrokes(strokes, factor, center_x, center_y))
+        self.history.checkpoint()
+        return True
+
+    # 선택된 획들 삭제 (한 단계로 되돌림)
+    def delete_selected(self):
+        if not self.selection:
+            return False
+        for stroke in list(self.selection):
+            self.history.record(RemoveStroke(stroke, self.remove_stroke(stroke)))
+        self.history.checkpoint()
+        return True
+
+    # ---- 실행 취소 ----
+
+    # 선택을 해제한 뒤 한 단계를 되돌리거나 다시 실행. 바뀐 것이 있으면 True
+    def undo(self):
+        self.deselect()
+        return self.history.undo()
+
+    def redo(self):
+        self.deselect()
+        return self.history.redo()
+
+    # ---- 보기 영역과 렌더링 ----
+
+    # 보기 영역을 화면 좌표 기준으로 이동 (제스처가 끝나면 settle_view 호출)
+    def pan_view(self, dx, dy):
+        self.viewport.pan(dx, dy)
+        self._view_moved()
+
+    # 화면 좌표 (x, y)를 기준으로 확대/축소 (연속된 확대/축소가 멈추면 settle_view 호출)
+    def zoom_view(self, factor, x, y):
+        self.viewport.zoom_at(factor, x, y)
+        self._view_moved()
+
+    # 제스처 도중에는 도형을 다시 만들거나 컬링하지 않고 캔버스 래퍼의 변환만 바꿈
+    # 변환을 받을 래퍼가 없으면 바로 확정함
+    def _view_moved(self):
+        if self.renderer.layer is None:
+            self.settle_view()
+        else:
+            self.renderer.set_transform(*self.render_view.transform_to(self.viewport))
+
+    # 보기 영역 이동/확대가 끝났을 때 호출: 새로 보이는 획만 캔버스에 올리고 멀리 벗어난 획은 내림
+    # 배율이 바뀌었으면 올라간 도형을 현재 배율로 다시 만들고 (두께, 단순화 정도가 배율에 따라 다르므로) 변환을 없앰
+    # 이동만 했으면 도형은 그대로 두고 래퍼의 이동 변환을 유지함 (viewport를 직접 바꾼 뒤에도 호출)
+    def settle_view(self):
+        self.render_view.resize(self.viewport.width, self.viewport.height)
+        self.culler.refresh()
+        if self.render_view.zoom != self.viewport.zoom or self.renderer.layer is None:
+            self._sync_render_view()
+            self.renderer.invalidate_view()
+        self.renderer.set_transform(*self.render_view.transform_to(self.viewport))
+
+    def _sync_render_view(self):
+        view = self.render_view
+        view.zoom, view.offset_x, view.offset_y = self.viewport.zoom, self.viewport.offset_x, self.viewport.offset_y
+
+    # 캔버스 크기 변경 (배율이 그대로이면 이미 올라간 도형은 다시 만들지 않음)
+    def resize_view(self, width, height):
+        self.viewport.resize(width, height)
+        self.settle_view()
+
+    # 캔버스에 올라간 모든 도형을 현재 보기 영역 기준으로 다시 만들도록 표시
+    def redraw(self):
+        self.renderer.invalidate_view()
+
+    # 쌓인 변경 사항을 캔버스에 반영 (끝난 후처리 결과를 먼저 적용하고, 공유 문서이면 그리는 중인 획에 쌓인 점도 다른 세션에 보냄)
+    # 획 점 데이터가 메모리 예산을 넘었으면 캔버스에 올라가 있지 않은 획부터 디스크로 내보냄
+    def flush(self):
+        self.apply_processed()
+        if self.board is not None:
+            self.board.flush()
+        self.renderer.flush()
+        self.pages.evict(self.culler.visible)
+
+    # 남은 후처리 결과를 적용한 뒤 작업자를 멈추고 페이지 파일을 닫음 (세션 종료 때, 저널을 닫기 전에 호출)
+    def close(self):
+        self.pipeline.wait()
+        self.apply_processed()
+        self.pipeline.close()
+        self.pages.close()
+
+
+# 클라이언트 없이 렌더 계층을 실행하기 위한 캔버스 (벤치마크, 테스트용)
+# CanvasRenderer가 쓰는 shapes, update(), page.update(*controls)만 흉내 내며,
+# 실제 캔버스라면 전송되었을 속성(바뀐 속성만)을 직렬화하여 크기를 셈
+class HeadlessCanvas:
+    def __init__(self):
+        self.shapes = []
+        self.page = self # canvas.page.update(*controls)도 이 객체로 처리
+        self.updates = 0 # update 호출 수
+        self.bytes_sent = 0 # 직렬화된 속성 크기의 합
+
+    # 인자가 없으면 캔버스 전체(canvas.update()), 있으면 주어진 도형만(page.update(*controls)) 전송한 것으로 처리
+    def update(self, *controls):
+        for control in controls or self.shapes:
+            self.bytes_sent += self._serialize(control)
+        self.updates += 1
+
+    # Control이 update 명령을 만들 때처럼 before_update 후 바뀐 속성만 직렬화하고 전송된 것으로 표시
+    @staticmethod
+    def _serialize(control):
+        control.before_update()
+        attrs = control._Control__attrs
+        size = 0
+        for name, (value, dirty) in list(attrs.items()):
+            if dirty and value is not None:
+                size += len(name) + len(str(value))
+                attrs[name] = (value, False)
+        return size
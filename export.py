@@ -0,0 +1,516 @@
+import argparse
+import math
+import multiprocessing
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from notebook_io import NotebookFormatError, load_notebook
+
+
+# 노트 내보내기 (SVG, PNG)
+# 월드 좌표 1단위를 CSS px 하나(1/96 인치)로 보고, 모든 획의 경계 상자에 여백을 더한 영역을 한 페이지로 내보냄
+# SVG는 획마다 <path> 하나를 만들어 바로 파일에 쓰므로 문서 전체의 문자열을 메모리에 만들지 않음
+# PNG는 페이지를 TILE_SIZE 타일로 나누어 프로세스 풀(띄울 수 없는 런타임에서는 스레드 풀)에서 래스터화하고, 위에서부터 타일 한 줄(띠)씩 이어 붙여
+# 압축하면서 파일에 씀. 작업자는 획 점을 받지 않고 내보내기 시작 때 임시 디렉터리에 쓴 좌표 파일을 메모리 맵으로 읽으며,
+# 타일마다 획 경계 상자로 그 타일에 걸리는 획만 골라 그림. 동시에 메모리에 있는 띠 수가 제한되므로
+# 페이지 크기나 해상도와 관계없이 메모리 사용량은 (띠 크기 x PREFETCH_BANDS) 정도로 유지됨
+#
+#   python export.py notebook.fnb notebook.svg
+#   python export.py notebook.fnb notebook.png --dpi 300 --workers 8
+
+CSS_DPI = 96.0 # 월드 좌표 1단위 = 1 CSS px
+EXPORT_MARGIN = 20.0 # 획 경계 상자 바깥 여백 (월드 좌표 단위)
+TILE_SIZE = 256 # PNG 타일 한 변의 크기 (px)
+PREFETCH_BANDS = 2 # 압축 중인 띠 외에 미리 렌더링을 맡겨 둘 띠 수의 최소값
+BACKGROUND = (255, 255, 255) # PNG 배경색
+SEGMENT_SPLIT = 16.0 # 래스터화할 때 이보다 긴 선분(px)은 나누어 그림 (선분마다 같은 크기의 작은 영역만 계산하도록)
+WIDTH_STEP = 0.5 # SVG에서 점마다 두께가 있는 획의 두께 구간 (캔버스의 WidthBucketPaths.WIDTH_STEP과 같음)
+
+# Flet 색상 이름(ft.Colors 값)의 RGB 값: Material 팔레트 (Flutter colors.dart)
+# 색상마다 50, 100, ..., 900 단계와 강조색 100, 200, 400, 700 단계이며, 단계 없는 이름은 500, 강조색은 200 단계
+# 테마에 따라 정해지는 이름(primary 등)이나 표에 없는 이름은 ValueError
+SHADES = (50, 100, 200, 300, 400, 500, 600, 700, 800, 900)
+ACCENT_SHADES = (100, 200, 400, 700)
+SWATCHES = {
+    "red": ("ffebee ffcdd2 ef9a9a e57373 ef5350 f44336 e53935 d32f2f c62828 b71c1c", "ff8a80 ff5252 ff1744 d50000"),
+    "pink": ("fce4ec f8bbd0 f48fb1 f06292 ec407a e91e63 d81b60 c2185b ad1457 880e4f", "ff80ab ff4081 f50057 c51162"),
+    "purple": ("f3e5f5 e1bee7 ce93d8 ba68c8 ab47bc 9c27b0 8e24aa 7b1fa2 6a1b9a 4a148c", "ea80fc e040fb d500f9 aa00ff"),
+    "deeppurple": ("ede7f6 d1c4e9 b39ddb 9575cd 7e57c2 673ab7 5e35b1 512da8 4527a0 311b92", "b388ff 7c4dff 651fff 6200ea"),
+    "indigo": ("e8eaf6 c5cae9 9fa8da 7986cb 5c6bc0 3f51b5 3949ab 303f9f 283593 1a237e", "8c9eff 536dfe 3d5afe 304ffe"),
+    "blue": ("e3f2fd bbdefb 90caf9 64b5f6 42a5f5 2196f3 1e88e5 1976d2 1565c0 0d47a1", "82b1ff 448aff 2979ff 2962ff"),
+    "lightblue": ("e1f5fe b3e5fc 81d4fa 4fc3f7 29b6f6 03a9f4 039be5 0288d1 0277bd 01579b", "80d8ff 40c4ff 00b0ff 0091ea"),
+    "cyan": ("e0f7fa b2ebf2 80deea 4dd0e1 26c6da 00bcd4 00acc1 0097a7 00838f 006064", "84ffff 18ffff 00e5ff 00b8d4"),
+    "teal": ("e0f2f1 b2dfdb 80cbc4 4db6ac 26a69a 009688 00897b 00796b 00695c 004d40", "a7ffeb 64ffda 1de9b6 00bfa5"),
+    "green": ("e8f5e9 c8e6c9 a5d6a7 81c784 66bb6a 4caf50 43a047 388e3c 2e7d32 1b5e20", "b9f6ca 69f0ae 00e676 00c853"),
+    "lightgreen": ("f1f8e9 dcedc8 c5e1a5 aed581 9ccc65 8bc34a 7cb342 689f38 558b2f 33691e", "ccff90 b2ff59 76ff03 64dd17"),
+    "lime": ("f9fbe7 f0f4c3 e6ee9c dce775 d4e157 cddc39 c0ca33 afb42b 9e9d24 827717", "f4ff81 eeff41 c6ff00 aeea00"),
+    "yellow": ("fffde7 fff9c4 fff59d fff176 ffee58 ffeb3b fdd835 fbc02d f9a825 f57f17", "ffff8d ffff00 ffea00 ffd600"),
+    "amber": ("fff8e1 ffecb3 ffe082 ffd54f ffca28 ffc107 ffb300 ffa000 ff8f00 ff6f00", "ffe57f ffd740 ffc400 ffab00"),
+    "orange": ("fff3e0 ffe0b2 ffcc80 ffb74d ffa726 ff9800 fb8c00 f57c00 ef6c00 e65100", "ffd180 ffab40 ff9100 ff6d00"),
+    "deeporange": ("fbe9e7 ffccbc ffab91 ff8a65 ff7043 ff5722 f4511e e64a19 d84315 bf360c", "ff9e80 ff6e40 ff3d00 dd2c00"),
+    "brown": ("efebe9 d7ccc8 bcaaa4 a1887f 8d6e63 795548 6d4c41 5d4037 4e342e 3e2723", None),
+    "grey": ("fafafa f5f5f5 eeeeee e0e0e0 bdbdbd 9e9e9e 757575 616161 424242 212121", None),
+    "bluegrey": ("eceff1 cfd8dc b0bec5 90a4ae 78909c 607d8b 546e7a 455a64 37474f 263238", None),
+}
+# 반투명 검정/흰색 (불투명도, 0~255). 겹침을 표현하지 않으므로 배경색 위에 합성한 색으로 내보냄
+TRANSLUCENT = {
+    "black12": (0, 0x1f), "black26": (0, 0x42), "black38": (0, 0x61), "black45": (0, 0x73),
+    "black54": (0, 0x8a), "black87": (0, 0xdd),
+    "white10": (0xff, 0x1a), "white12": (0xff, 0x1f), "white24": (0xff, 0x3d), "white30": (0xff, 0x4d),
+    "white38": (0xff, 0x62), "white54": (0xff, 0x8a), "white60": (0xff, 0x99), "white70": (0xff, 0xb3),
+}
+
+
+def _hex_rgb(value):
+    value = int(value, 16)
+    return (value >> 16) & 0xff, (value >> 8) & 0xff, value & 0xff
+
+
+def _palette():
+    colors = {"black": (0x00, 0x00, 0x00), "white": (0xff, 0xff, 0xff)}
+    for name, (shades, accents) in SWATCHES.items():
+        for shade, value in zip(SHADES, shades.split()):
+            colors[f"{name}{shade}"] = _hex_rgb(value)
+        colors[name] = colors[f"{name}500"]
+        if accents is not None:
+            for shade, value in zip(ACCENT_SHADES, accents.split()):
+                colors[f"{name}accent{shade}"] = _hex_rgb(value)
+            colors[f"{name}accent"] = colors[f"{name}accent200"]
+    for name, (value, alpha) in TRANSLUCENT.items():
+        colors[name] = tuple((value * alpha + channel * (255 - alpha) + 127) // 255 for channel in BACKGROUND)
+    return colors
+
+
+COLOR_VALUES = _palette()
+
+# 작업자에게 넘기는 획 표 (좌표는 임시 디렉터리의 coords/widths 파일에 있음)
+RASTER_DTYPE = np.dtype([
+    ("min_x", "<f4"), # 두께의 절반만큼 넓힌 경계 상자 (월드 좌표)
+    ("min_y", "<f4"),
+    ("max_x", "<f4"),
+    ("max_y", "<f4"),
+    ("offset", "<u8"), # 좌표 파일에서 첫 점의 위치 (점 단위)
+    ("count", "<u4"), # 점 개수
+    ("width", "<f4"), # 두께 (점마다 두께가 있으면 widths 파일 사용)
+    ("variable", "u1"), # 점마다 두께가 있는 획이면 1
+    ("color", "u1", 3),
+])
+
+
+# 색상 값(Flet 색상 이름, ft.Colors, "#rrggbb", "#aarrggbb")의 (r, g, b), 알 수 없는 색상이면 ValueError
+def color_rgb(color):
+    name = str(getattr(color, "value", color)).lower()
+    if name.startswith("#") and len(name) in (7, 9):
+        return _hex_rgb(name[-6:])
+    try:
+        return COLOR_VALUES[name]
+    except KeyError:
+        raise ValueError(f"내보낼 수 없는 색상: {name}") from None
+
+
+def _svg_color(color):
+    return "#%02x%02x%02x" % color_rgb(color)
+
+
+# 내보낼 페이지 영역 (min_x, min_y, max_x, max_y): 획 두께를 포함한 경계 상자에 margin을 더함 (획이 없으면 None)
+def page_bounds(strokes, margin=EXPORT_MARGIN):
+    bounds = None
+    for stroke in strokes:
+        if not stroke.point_count:
+            continue
+        half = stroke.width / 2 # 점마다 두께가 있는 획의 width는 가장 두꺼운 점의 두께
+        box = (stroke.min_x - half, stroke.min_y - half, stroke.max_x + half, stroke.max_y + half)
+        if bounds is None:
+            bounds = box
+        else:
+            bounds = (min(bounds[0], box[0]), min(bounds[1], box[1]), max(bounds[2], box[2]), max(bounds[3], box[3]))
+    if bounds is None:
+        return None
+    return bounds[0] - margin, bounds[1] - margin, bounds[2] + margin, bounds[3] + margin
+
+
+def _format_coords(coords):
+    return " ".join("%.2f %.2f" % (x, y) for x, y in coords)
+
+
+# 점마다 두께가 있는 획의 선분 두께 (양 끝점 두께의 평균, 캔버스의 두께 구간 Path와 같은 기준)
+def _segment_widths(widths):
+    if len(widths) > 1:
+        return (widths[:-1] + widths[1:]) / 2
+    return widths
+
+
+# 획 하나를 SVG <path> 요소들로 (곡선 근사가 있으면 C, 없으면 L)
+# 점마다 두께가 있는 획은 선분 두께를 WIDTH_STEP 단위로 반올림하여 같은 두께가 이어지는 구간마다 <path> 하나
+def svg_stroke_paths(stroke, width_step=WIDTH_STEP):
+    color = _svg_color(stroke.color)
+    widths = stroke.widths
+    if widths is None:
+        curves = stroke.curves
+        if curves is not None:
+            coords = curves.tolist()
+            d = "M%.2f %.2f C" % tuple(coords[0]) + _format_coords(coords[1:])
+        else:
+            coords = stroke.points.tolist()
+            if len(coords) == 1:
+                coords.append(coords[0]) # 점 하나짜리 획은 길이 0인 선분의 둥근 끝 모양으로 그려짐
+            d = "M%.2f %.2f L" % tuple(coords[0]) + _format_coords(coords[1:])
+        return ['<path d="%s" stroke="%s" stroke-width="%g"/>\n' % (d, color, stroke.width)]
+
+    coords = stroke.points.tolist()
+    if len(coords) == 1:
+        coords.append(coords[0])
+        widths = np.repeat(widths, 2)
+    buckets = np.maximum(np.rint(_segment_widths(np.asarray(widths, dtype=np.float64)) / width_step), 1).astype(np.int64)
+    # 두께 구간이 바뀌는 선분 위치로 나눔
+    starts = np.flatnonzero(np.diff(buckets)) + 1
+    elements = []
+    for start, end in zip([0, *starts.tolist()], [*starts.tolist(), len(buckets)]):
+        run = coords[start:end + 1]
+        d = "M%.2f %.2f L" % tuple(run[0]) + _format_coords(run[1:])
+        elements.append('<path d="%s" stroke="%s" stroke-width="%g"/>\n' % (d, color, buckets[start] * width_step))
+    return elements
+
+
+# 획 목록을 SVG 파일로 저장 (획마다 바로 파일에 씀)
+# 임시 파일에 쓴 뒤 교체하므로 저장 중에 실패해도 기존 파일은 그대로 남음. 내보낸 획 수 반환
+def write_svg(path, strokes, margin=EXPORT_MARGIN):
+    bounds = page_bounds(strokes, margin)
+    if bounds is None:
+        raise ValueError("내보낼 획이 없음")
+    min_x, min_y, max_x, max_y = bounds
+    count = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<svg xmlns="http://www.w3.org/2000/svg" width="%.2f" height="%.2f" viewBox="%.2f %.2f %.2f %.2f">\n'
+                % (max_x - min_x, max_y - min_y, min_x, min_y, max_x - min_x, max_y - min_y))
+        f.write('<rect x="%.2f" y="%.2f" width="%.2f" height="%.2f" fill="%s"/>\n'
+                % (min_x, min_y, max_x - min_x, max_y - min_y, "#%02x%02x%02x" % BACKGROUND))
+        f.write('<g fill="none" stroke-linecap="round" stroke-linejoin="round">\n')
+        for stroke in strokes:
+            if stroke.point_count:
+                f.writelines(svg_stroke_paths(stroke))
+                count += 1
+        f.write("</g>\n</svg>\n")
+    os.replace(tmp_path, path)
+    return count
+
+
+# ---- PNG ----
+
+# PNG 파일을 한 줄씩 압축하며 쓰는 기록기 (8비트 RGB, 필터 없음)
+class PngWriter:
+    CHUNK_SIZE = 256 * 1024 # IDAT 청크 하나의 최대 크기
+
+    def __init__(self, f, width, height, level=6):
+        self._file = f
+        self._compressor = zlib.compressobj(level)
+        self._buffer = bytearray()
+        self.rows = 0
+        f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _emit(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.CHUNK_SIZE:
+            self._chunk(b"IDAT", bytes(self._buffer[:self.CHUNK_SIZE]))
+            del self._buffer[:self.CHUNK_SIZE]
+
+    # (줄 수, 너비, 3) uint8 배열의 줄들을 덧붙임
+    def write_rows(self, rows):
+        filtered = np.zeros((rows.shape[0], rows.shape[1] * 3 + 1), dtype=np.uint8) # 줄마다 앞에 필터 종류 0
+        filtered[:, 1:] = rows.reshape(rows.shape[0], -1)
+        self._emit(self._compressor.compress(filtered.tobytes()))
+        self.rows += rows.shape[0]
+
+    def close(self):
+        self._emit(self._compressor.flush())
+        if self._buffer:
+            self._chunk(b"IDAT", bytes(self._buffer))
+            self._buffer.clear()
+        self._chunk(b"IEND", b"")
+
+
+# 타일 하나를 그리는 작업자 쪽 렌더러 (작업자 프로세스마다 하나, 좌표 파일은 메모리 맵으로 읽음)
+class TileRenderer:
+    def __init__(self, directory, origin_x, origin_y, scale):
+        self.table = np.load(os.path.join(directory, "strokes.npy"))
+        point_count = int(self.table["offset"][-1]) + int(self.table["count"][-1]) if len(self.table) else 0
+        self.coords = np.memmap(os.path.join(directory, "coords"), dtype="<f4", mode="r", shape=(max(point_count, 1), 2))
+        self.widths = np.memmap(os.path.join(directory, "widths"), dtype="<f4", mode="r", shape=(max(point_count, 1),))
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.scale = scale
+
+    # 페이지 픽셀 좌표 (x, y)에서 시작하는 width x height 타일의 (height, width, 3) uint8 배열
+    def render(self, x, y, width, height):
+        image = np.empty((height, width, 3), dtype=np.float32)
+        image[:] = BACKGROUND
+        scale = self.scale
+        # 타일의 월드 좌표 영역과 경계 상자가 겹치는 획만 그림 (가장자리 안티앨리어싱 1px 포함)
+        pad = 1.0 / scale
+        left = self.origin_x + x / scale - pad
+        top = self.origin_y + y / scale - pad
+        right = self.origin_x + (x + width) / scale + pad
+        bottom = self.origin_y + (y + height) / scale + pad
+        table = self.table
+        hits = np.flatnonzero(
+            (table["max_x"] >= left) & (table["min_x"] <= right) & (table["max_y"] >= top) & (table["min_y"] <= bottom)
+        )
+        for row in table[hits].tolist():
+            min_x, min_y, max_x, max_y, offset, count, stroke_width, variable, color = row
+            points = (np.asarray(self.coords[offset:offset + count], dtype=np.float64)
+                      - (self.origin_x + x / scale, self.origin_y + y / scale)) * scale
+            if variable:
+                radii = _segment_widths(np.asarray(self.widths[offset:offset + count], dtype=np.float64)) * (scale / 2)
+            else:
+                radii = np.full(max(count - 1, 1), stroke_width * scale / 2)
+            _draw_stroke(image, points, radii, color)
+        return np.rint(image).astype(np.uint8)
+
+
+# 작업자 프로세스를 새 인터프리터로 띄울 수 있는지 여부
+# flet build로 묶은 앱(Flet이 FLET_PLATFORM을 설정함, flet.utils.is_embedded 참고)이나 얼린(frozen) 실행 파일에서는
+# sys.executable이 파이썬이 아니라 앱 실행 파일이고, 모바일/웹 런타임은 프로세스를 만들 수 없으므로 spawn이 동작하지 않음
+def can_spawn_workers():
+    return (not getattr(sys, "frozen", False) and os.getenv("FLET_PLATFORM") is None
+            and sys.platform not in ("ios", "android", "emscripten", "wasi"))
+
+
+# 작업자 프로세스의 렌더러 (initializer에서 만들어짐)
+_tile_renderer = None
+
+
+def _init_worker(directory, origin_x, origin_y, scale):
+    global _tile_renderer
+    _tile_renderer = TileRenderer(directory, origin_x, origin_y, scale)
+
+
+def _render_tile(x, y, width, height):
+    return _tile_renderer.render(x, y, width, height)
+
+
+# 타일 좌표(px)의 점들로 이루어진 획 하나를 image에 그림 (둥근 끝/이음 모양, 가장자리 1px 안티앨리어싱)
+# radii: 선분마다의 반지름(px). 획 하나의 덮임 정도는 선분들의 최대값으로 합친 뒤 한 번만 합성하므로
+# 선분이 겹치는 이음 부분이 진해지지 않음
+def _draw_stroke(image, points, radii, color):
+    height, width = image.shape[:2]
+    if len(points) == 1:
+        points = np.repeat(points, 2, axis=0)
+    a = points[:-1]
+    b = points[1:]
+    # 타일과 겹치지 않는 선분 제외
+    reach = radii + 1.0
+    low = np.minimum(a, b) - reach[:, None]
+    high = np.maximum(a, b) + reach[:, None]
+    inside = (high[:, 0] >= 0) & (low[:, 0] <= width) & (high[:, 1] >= 0) & (low[:, 1] <= height)
+    if not inside.any():
+        return
+    a, b, radii = a[inside], b[inside], radii[inside]
+
+    # 긴 선분은 SEGMENT_SPLIT 이하로 나누어 모든 선분을 같은 크기의 작은 정사각 영역에서 계산
+    lengths = np.hypot(*(b - a).T)
+    pieces = np.maximum(np.ceil(lengths / SEGMENT_SPLIT), 1).astype(np.int64)
+    if pieces.max() > 1:
+        index = np.repeat(np.arange(len(a)), pieces)
+        step = (np.arange(len(index)) - np.repeat(np.cumsum(pieces) - pieces, pieces)) / pieces[index]
+        direction = b - a
+        start = a[index] + direction[index] * step[:, None]
+        b = start + direction[index] / pieces[index][:, None]
+        a = start
+        radii = radii[index]
+
+    # 선분마다 왼쪽 위 픽셀과 size x size 격자의 픽셀 중심 (size는 가장 긴 선분과 가장 굵은 두께에 맞춤)
+    dx = b[:, 0] - a[:, 0]
+    dy = b[:, 1] - a[:, 1]
+    size = int(math.ceil(np.maximum(np.abs(dx), np.abs(dy)).max() + 2 * radii.max() + 3))
+    origin = np.floor(np.minimum(a, b) - radii[:, None] - 1).astype(np.int64)
+    grid = np.arange(size)
+    px = origin[:, 0, None, None] + grid[None, None, :]
+    py = origin[:, 1, None, None] + grid[None, :, None]
+    # 픽셀 중심에서 선분까지의 거리 (격자 계산은 float32로)
+    length_sq = dx * dx + dy * dy
+    inverse = np.divide(1.0, length_sq, out=np.zeros_like(length_sq), where=length_sq > 0)
+    dx = dx.astype(np.float32)[:, None, None]
+    dy = dy.astype(np.float32)[:, None, None]
+    rx = (origin[:, 0] + 0.5 - a[:, 0]).astype(np.float32)[:, None, None] + grid.astype(np.float32)[None, None, :]
+    ry = (origin[:, 1] + 0.5 - a[:, 1]).astype(np.float32)[:, None, None] + grid.astype(np.float32)[None, :, None]
+    t = rx * dx + ry * dy
+    t *= inverse.astype(np.float32)[:, None, None]
+    np.clip(t, 0.0, 1.0, out=t)
+    ex = rx - t * dx
+    ey = ry - t * dy
+    ex *= ex
+    ey *= ey
+    ex += ey
+    coverage = (radii.astype(np.float32)[:, None, None] + 0.5) - np.sqrt(ex, out=ex)
+    np.clip(coverage, 0.0, 1.0, out=coverage)
+
+    # 타일 안의 덮인 픽셀만 획의 영역(경계 상자)에 최대값으로 모음
+    px = np.broadcast_to(px, coverage.shape)
+    py = np.broadcast_to(py, coverage.shape)
+    keep = (coverage > 0) & (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    if not keep.any():
+        return
+    px = px[keep]
+    py = py[keep]
+    x0, y0 = int(px.min()), int(py.min())
+    x1, y1 = int(px.max()) + 1, int(py.max()) + 1
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=np.float32)
+    np.maximum.at(mask, (py - y0, px - x0), coverage[keep])
+
+    region = image[y0:y1, x0:x1]
+    region += (np.asarray(color, dtype=np.float32) - region) * mask[:, :, None]
+
+
+# PNG로 내보낼 획들의 스냅숏 (좌표를 임시 디렉터리에 쓴 뒤에는 문서가 바뀌어도 영향이 없음)
+# 스냅숏은 핸들러에서 만들고 시간이 걸리는 write()는 다른 스레드에서 실행할 수 있음
+class RasterExport:
+    # dpi: 출력 해상도 (CSS_DPI이면 월드 좌표 1단위가 1 px), margin: 획 경계 상자 바깥 여백 (월드 좌표 단위)
+    def __init__(self, strokes, dpi=CSS_DPI, margin=EXPORT_MARGIN, tile_size=TILE_SIZE):
+        bounds = page_bounds(strokes, margin)
+        if bounds is None:
+            raise ValueError("내보낼 획이 없음")
+        self.origin_x, self.origin_y = bounds[0], bounds[1]
+        self.scale = dpi / CSS_DPI
+        self.width = max(int(math.ceil((bounds[2] - bounds[0]) * self.scale)), 1)
+        self.height = max(int(math.ceil((bounds[3] - bounds[1]) * self.scale)), 1)
+        self.tile_size = tile_size
+        self.stroke_count = 0
+        self._directory = tempfile.mkdtemp(prefix="export-")
+        try:
+            self._write_geometry(strokes)
+        except BaseException:
+            self.close()
+            raise
+
+    # 획 표와 좌표/두께 파일을 씀 (획마다 바로 파일에 쓰므로 모든 점을 한 배열로 모으지 않음)
+    def _write_geometry(self, strokes):
+        rows = []
+        offset = 0
+        with open(os.path.join(self._directory, "coords"), "wb") as coords_file, \
+                open(os.path.join(self._directory, "widths"), "wb") as widths_file:
+            for stroke in strokes:
+                count = stroke.point_count
+                if not count:
+                    continue
+                widths = stroke.widths
+                half = stroke.width / 2
+                rows.append((stroke.min_x - half, stroke.min_y - half, stroke.max_x + half, stroke.max_y + half,
+                             offset, count, stroke.width, widths is not None, color_rgb(stroke.color)))
+                coords_file.write(np.asarray(stroke.points, dtype="<f4").tobytes())
+                if widths is None:
+                    widths_file.write(np.full(count, np.nan, dtype="<f4").tobytes())
+                else:
+                    widths_file.write(np.asarray(widths, dtype="<f4").tobytes())
+                offset += count
+        np.save(os.path.join(self._directory, "strokes.npy"), np.array(rows, dtype=RASTER_DTYPE))
+        self.stroke_count = len(rows)
+
+    # 타일 줄(띠)마다 타일 (x, y, 너비, 높이) 목록
+    def _bands(self):
+        size = self.tile_size
+        for y in range(0, self.height, size):
+            yield [(x, y, min(size, self.width - x), min(size, self.height - y)) for x in range(0, self.width, size)]
+
+    # PNG 파일로 렌더링하여 저장. workers: 작업자 수 (None이면 CPU 수, 0이면 이 스레드에서 렌더링)
+    # 작업자는 프로세스이며, 프로세스를 띄울 수 없는 런타임(can_spawn_workers)에서는 같은 수의 스레드로 렌더링함
+    # 임시 파일에 쓴 뒤 교체하므로 실패해도 기존 파일은 그대로 남음
+    def write(self, path, workers=None):
+        args = (self._directory, self.origin_x, self.origin_y, self.scale)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            png = PngWriter(f, self.width, self.height)
+            if workers == 0:
+                renderer = TileRenderer(*args)
+                for tiles in self._bands():
+                    png.write_rows(np.concatenate([renderer.render(*tile) for tile in tiles], axis=1))
+            elif can_spawn_workers():
+                # 앱의 스레드들을 복제하지 않도록 새 인터프리터로 작업자를 시작 (main.py의 __main__ 보호 필요)
+                context = multiprocessing.get_context("spawn")
+                workers = workers or os.cpu_count() or 1
+                with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=args) as pool:
+                    self._render_parallel(pool, _render_tile, workers, png)
+            else:
+                # 렌더러는 읽기만 하므로 스레드들이 함께 씀 (타일 합성의 numpy 연산 동안은 GIL이 풀림)
+                renderer = TileRenderer(*args)
+                workers = workers or os.cpu_count() or 1
+                with ThreadPoolExecutor(workers, thread_name_prefix="png-tile") as pool:
+                    self._render_parallel(pool, renderer.render, workers, png)
+            png.close()
+        os.replace(tmp_path, path)
+
+    # 띠 단위로 타일을 맡기고 위에서부터 순서대로 이어 붙여 압축 (맡겨 둔 띠 수를 제한하여 메모리 사용량을 묶어 둠)
+    # render: 작업자에서 타일 하나를 그리는 함수
+    def _render_parallel(self, pool, render, workers, png):
+        tiles_per_band = -(-self.width // self.tile_size)
+        # 작업자마다 두 개 정도의 타일이 대기하도록 미리 맡길 띠 수
+        ahead = max(PREFETCH_BANDS, -(-2 * workers // tiles_per_band))
+        pending = deque()
+        bands = self._bands()
+        for tiles in bands:
+            pending.append([pool.submit(render, *tile) for tile in tiles])
+            if len(pending) > ahead:
+                png.write_rows(np.concatenate([future.result() for future in pending.popleft()], axis=1))
+        while pending:
+            png.write_rows(np.concatenate([future.result() for future in pending.popleft()], axis=1))
+
+    def close(self):
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+# 획 목록을 dpi 해상도의 PNG 파일로 저장. 내보낸 획 수 반환
+def write_png(path, strokes, dpi=CSS_DPI, margin=EXPORT_MARGIN, workers=None, tile_size=TILE_SIZE):
+    export = RasterExport(strokes, dpi, margin, tile_size)
+    try:
+        export.write(path, workers)
+    finally:
+        export.close()
+    return export.stroke_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="노트 파일을 SVG 또는 PNG로 내보내기")
+    parser.add_argument("notebook", help="노트 파일 (.fnb)")
+    parser.add_argument("output", help="출력 파일 (.svg 또는 .png)")
+    parser.add_argument("--dpi", type=float, default=CSS_DPI, help="PNG 해상도 (기본 96: 월드 좌표 1단위 = 1 px)")
+    parser.add_argument("--workers", type=int, help="PNG 래스터화 작업자 프로세스 수 (기본: CPU 수, 0: 작업자 없이)")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE, help="PNG 타일 크기 (px)")
+    args = parser.parse_args(argv)
+
+    try:
+        strokes = load_notebook(args.notebook)
+    except (OSError, NotebookFormatError) as ex:
+        print(f"불러오기 실패: {ex}", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    try:
+        if args.output.lower().endswith(".svg"):
+            count = write_svg(args.output, strokes)
+        else:
+            count = write_png(args.output, strokes, args.dpi, workers=args.workers, tile_size=args.tile_size)
+    except (OSError, ValueError) as ex:
+        print(f"내보내기 실패: {ex}", file=sys.stderr)
+        return 1
+    print(f"획 {count}개를 {args.output}에 내보냄 ({time.perf_counter() - start:.2f}초, {os.path.getsize(args.output)} B)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import struct
+import time
+
+from notebook_io import load_notebook, save_notebook
+
+
+# 제스처 기록 파일(.fgt) 형식 (모든 값은 little-endian)
+#   헤더: 매직(4) 버전(u16) 시작 모드(u16) 보기 영역 zoom, offset_x, offset_y, width, height (f64)
+#   이벤트: 종류(u8) 직전 이벤트와의 간격(u32, 마이크로초) x, y, value (f32), 이벤트 하나에 17바이트
+# 기록을 시작할 때의 문서는 기록 파일 옆에 <기록 파일>.fnb (notebook_io 형식)로 저장되어
+# 재생할 때 같은 문서, 같은 보기 영역에서 같은 이벤트를 다시 보낼 수 있음 (replay.py)
+MAGIC = b"FGT1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHddddd")
+EVENT = struct.Struct("<BIfff")
+MAX_INTERVAL_US = 0xFFFFFFFF
+
+# 이벤트 종류 (x, y는 캔버스 화면 좌표)
+PAN_START = 1
+PAN_UPDATE = 2
+PAN_END = 3
+TAP_DOWN = 4
+MODE = 5 # value: MODES에서의 위치
+ZOOM = 6 # x, y: 확대/축소 기준점, value: 배율
+RESIZE = 7 # x, y: 캔버스 너비, 높이
+
+EVENT_NAMES = {
+    PAN_START: "pan_start",
+    PAN_UPDATE: "pan_update",
+    PAN_END: "pan_end",
+    TAP_DOWN: "tap_down",
+    MODE: "mode",
+    ZOOM: "zoom",
+    RESIZE: "resize",
+}
+MODES = ("draw", "select", "erase", "pan")
+
+
+class GestureFormatError(ValueError):
+    pass
+
+
+# 기록된 제스처 하나
+class GestureTrace:
+    def __init__(self, mode, view, events, snapshot_path):
+        self.mode = mode # 기록을 시작할 때의 모드
+        self.view = view # (zoom, offset_x, offset_y, width, height)
+        self.events = events # (종류, 기록 시작부터의 시간(초), x, y, value) 목록
+        self.snapshot_path = snapshot_path
+
+    @property
+    def duration(self):
+        return self.events[-1][1] if self.events else 0.0
+
+    # 기록을 시작할 때의 문서
+    def load_strokes(self):
+        return load_notebook(self.snapshot_path)
+
+
+# 핸들러가 받은 이벤트를 시간 간격과 함께 파일에 기록
+# 기록 중이 아닐 때 핸들러가 치르는 비용은 active 확인 한 번뿐임
+class GestureRecorder:
+    def __init__(self):
+        self._file = None
+        self._last = 0.0
+        self.path = None
+        self.events = 0
+
+    @property
+    def active(self):
+        return self._file is not None
+
+    # 현재 문서(strokes), 보기 영역, 모드를 기록하고 이벤트 기록 시작
+    def start(self, path, strokes, viewport, mode):
+        self.stop()
+        save_notebook(path + ".fnb", strokes)
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(
+            MAGIC, VERSION, MODES.index(mode),
+            viewport.zoom, viewport.offset_x, viewport.offset_y, viewport.width, viewport.height,
+        ))
+        self._last = time.perf_counter()
+        self.path = path
+        self.events = 0
+
+    def record(self, kind, x, y, value=0.0):
+        now = time.perf_counter()
+        interval = min(int((now - self._last) * 1e6), MAX_INTERVAL_US)
+        self._last = now
+        self._file.write(EVENT.pack(kind, interval, x, y, value))
+        self.events += 1
+
+    def stop(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_trace(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise GestureFormatError(f"제스처 기록 파일이 너무 짧음: {path}")
+    magic, version, mode, *view = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise GestureFormatError(f"제스처 기록 파일 형식이 아님: {path}")
+    if version != VERSION:
+        raise GestureFormatError(f"지원하지 않는 제스처 기록 파일 버전: {version}")
+
+    events = []
+    elapsed_us = 0
+    end = len(data) - (len(data) - HEADER.size) % EVENT.size # 쓰다가 끊긴 마지막 이벤트는 버림
+    for kind, interval, x, y, value in EVENT.iter_unpack(data[HEADER.size:end]):
+        elapsed_us += interval
+        events.append((kind, elapsed_us / 1e6, x, y, value))
+    return GestureTrace(MODES[mode], tuple(view), events, path + ".fnb")
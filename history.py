@@ -0,0 +1,181 @@
+from collections import deque
+
+
+# 실행 취소/다시 실행 기록
+# 문서를 복사하지 않고 변경 하나마다 되돌리는 데 필요한 최소 정보(명령)만 저장함
+# 명령들은 checkpoint()가 호출될 때까지 하나의 단계로 묶이고 (드래그 한 번, 지우개 한 번 등),
+# undo/redo는 한 단계의 명령 수에 비례하는 비용만 듦
+# 명령은 editor를 통해 문서를 바꾸며, editor는 다음 메서드를 가져야 함
+#   insert_stroke(stroke, index), remove_stroke(stroke),
+#   translate_strokes(strokes, dx, dy), scale_strokes(strokes, factor, center_x, center_y)
+
+COMMAND_OVERHEAD = 64 # 명령 객체 하나의 대략적인 크기(바이트)
+POINT_BYTES = 16 # 점 하나의 크기 (float64 x, y)
+REFERENCE_BYTES = 8 # 획 참조 하나의 크기
+
+
+# 획 추가 (index: 문서 획 목록에서의 위치)
+class AddStroke:
+    __slots__ = ("stroke", "index")
+
+    def __init__(self, stroke, index):
+        self.stroke = stroke
+        self.index = index
+
+    # 되돌린 뒤에도 획을 붙잡고 있으므로 점 크기까지 셈
+    @property
+    def nbytes(self):
+        return COMMAND_OVERHEAD + self.stroke.point_count * POINT_BYTES
+
+    def undo(self, editor):
+        editor.remove_stroke(self.stroke)
+
+    def redo(self, editor):
+        editor.insert_stroke(self.stroke, self.index)
+
+
+# 획 삭제 (index: 삭제되기 전 문서 획 목록에서의 위치)
+class RemoveStroke:
+    __slots__ = ("stroke", "index")
+
+    def __init__(self, stroke, index):
+        self.stroke = stroke
+        self.index = index
+
+    @property
+    def nbytes(self):
+        return COMMAND_OVERHEAD + self.stroke.point_count * POINT_BYTES
+
+    def undo(self, editor):
+        editor.insert_stroke(self.stroke, self.index)
+
+    def redo(self, editor):
+        editor.remove_stroke(self.stroke)
+
+
+# 선택된 획들을 함께 이동 (strokes: 획 튜플)
+class TranslateStrokes:
+    __slots__ = ("strokes", "dx", "dy")
+
+    def __init__(self, strokes, dx, dy):
+        self.strokes = tuple(strokes)
+        self.dx = dx
+        self.dy = dy
+
+    @property
+    def nbytes(self):
+        return COMMAND_OVERHEAD + len(self.strokes) * REFERENCE_BYTES
+
+    # 같은 획들의 연속된 이동은 하나로 합침 (드래그 중 이벤트마다 명령이 쌓이지 않도록)
+    def merge(self, other):
+        if isinstance(other, TranslateStrokes) and other.strokes == self.strokes:
+            self.dx += other.dx
+            self.dy += other.dy
+            return True
+        return False
+
+    def undo(self, editor):
+        editor.translate_strokes(self.strokes, -self.dx, -self.dy)
+
+    def redo(self, editor):
+        editor.translate_strokes(self.strokes, self.dx, self.dy)
+
+
+# 선택된 획들을 함께 크기 조정
+class ScaleStrokes:
+    __slots__ = ("strokes", "factor", "center_x", "center_y")
+
+    def __init__(self, strokes, factor, center_x, center_y):
+        self.strokes = tuple(strokes)
+        self.factor = factor
+        self.center_x = center_x
+        self.center_y = center_y
+
+    @property
+    def nbytes(self):
+        return COMMAND_OVERHEAD + len(self.strokes) * REFERENCE_BYTES
+
+    def undo(self, editor):
+        editor.scale_strokes(self.strokes, 1 / self.factor, self.center_x, self.center_y)
+
+    def redo(self, editor):
+        editor.scale_strokes(self.strokes, self.factor, self.center_x, self.center_y)
+
+
+# 명령 묶음 하나 (checkpoint 사이의 변경들)
+class HistoryStep:
+    __slots__ = ("commands", "nbytes")
+
+    def __init__(self, commands):
+        self.commands = commands
+        self.nbytes = sum(command.nbytes for command in commands)
+
+
+class History:
+    def __init__(self, editor, max_bytes=32 * 1024 * 1024, max_steps=1000):
+        self.editor = editor
+        self.max_bytes = max_bytes # 기록이 차지할 수 있는 최대 메모리 (넘으면 오래된 단계부터 버림)
+        self.max_steps = max_steps # 실행 취소할 수 있는 최대 단계 수
+        self._undo = deque()
+        self._redo = []
+        self._open = [] # 아직 checkpoint되지 않은 명령
+        self.nbytes = 0 # undo/redo 단계들이 차지하는 메모리 추정치
+
+    @property
+    def can_undo(self):
+        return bool(self._open or self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo) and not self._open
+
+    # 문서를 바꾼 직후 호출. 새 변경이 생기면 다시 실행할 기록은 버림
+    def record(self, command):
+        if self._redo:
+            self.nbytes -= sum(step.nbytes for step in self._redo)
+            self._redo.clear()
+        if self._open and hasattr(self._open[-1], "merge") and self._open[-1].merge(command):
+            return
+        self._open.append(command)
+
+    # 지금까지 기록된 명령들을 실행 취소 한 단계로 묶음 (제스처나 버튼 동작이 끝날 때 호출)
+    def checkpoint(self):
+        if not self._open:
+            return
+        step = HistoryStep(self._open)
+        self._open = []
+        self._undo.append(step)
+        self.nbytes += step.nbytes
+        self._evict()
+
+    # 한도를 넘으면 가장 오래된 단계부터 버림 (최근 단계 하나는 남김)
+    def _evict(self):
+        while len(self._undo) > 1 and (len(self._undo) > self.max_steps or self.nbytes > self.max_bytes):
+            self.nbytes -= self._undo.popleft().nbytes
+
+    # 마지막 단계를 되돌림. 되돌린 것이 없으면 False
+    def undo(self):
+        self.checkpoint()
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        for command in reversed(step.commands):
+            command.undo(self.editor)
+        self._redo.append(step)
+        return True
+
+    # 마지막으로 되돌린 단계를 다시 실행. 다시 실행한 것이 없으면 False
+    def redo(self):
+        if not self.can_redo:
+            return False
+        step = self._redo.pop()
+        for command in step.commands:
+            command.redo(self.editor)
+        self._undo.append(step)
+        return True
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._open = []
+        self.nbytes = 0
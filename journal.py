@@ -0,0 +1,309 @@
+import glob
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from notebook_io import NotebookFormatError, load_notebook_snapshot, save_notebook
+from stroke import Stroke
+
+
+# 문서 변경 사항을 파일 끝에 덧붙이기만 하는 작업 저널
+# 핸들러는 변경 하나를 작은 레코드로 만들어 큐에 넣기만 하고 (문서 크기와 무관한 비용),
+# 백그라운드 스레드가 레코드를 모아서 쓰고 FSYNC_INTERVAL마다 한 번만 fsync함
+#
+# 파일 구성 (base_path 기준)
+#   <base>.snapshot: 세대 번호 G와 획 ID가 기록된 노트 파일 (notebook_io 형식)
+#   <base>.<g>.journal: g세대 저널, 레코드마다 길이(u32) + CRC32(u32) + 내용
+# 복구할 때는 스냅숏을 읽고 G 이상인 저널을 세대 순서대로 재생함 (CRC가 맞지 않는 잘린 레코드에서 해당 저널은 멈춤)
+# 압축(compaction)은 저널 레코드가 COMPACT_RECORDS개 쌓이면 백그라운드 스레드가 수행함:
+# 새 세대 저널을 연 뒤 이전 스냅숏에 이전 저널들을 재생하여 새 스냅숏을 쓰고 이전 저널을 지움
+# (UI 스레드의 문서는 건드리지 않으므로 압축 중에도 핸들러는 멈추지 않음)
+# 압축이 실패하면 새 저널을 버리고 지금 저널에 계속 덧붙이며, 다음 COMPACT_RECORDS개 뒤에 다시 시도함
+
+OP_ADD = 1 # 획 추가: 두께(f32), 색상 길이(u16) + UTF-8
+OP_POINTS = 2 # 획의 점 교체: 점 개수(u32), 제어점 개수(u32), float32 좌표들 (점마다 두께가 있는 획이면 뒤에 float32 두께들)
+OP_ERASE = 5 # 지우개로 삭제
+OP_DELETE = 6 # 삭제 버튼으로 삭제
+OP_CLEAR = 7 # 모든 획 제거 (노트 불러오기 등)
+# 이동/크기 조정은 획 하나든 여러 개든 같은 레코드 (획 ID 자리에 획 수, 내용 뒤에 u32 획 ID 배열)
+OP_TRANSLATE = 8 # 이동: dx, dy (f64)
+OP_SCALE = 9 # 크기 조정: 배율, 중심 x, 중심 y (f64)
+
+RECORD_HEADER = struct.Struct("<II") # 내용 길이, CRC32
+OP_HEADER = struct.Struct("<BI") # 작업 종류, 획 ID
+ADD_BODY = struct.Struct("<fH")
+POINTS_BODY = struct.Struct("<II")
+TRANSLATE_BODY = struct.Struct("<dd")
+SCALE_BODY = struct.Struct("<ddd")
+
+
+def _record(op, stroke_id, body=b""):
+    payload = OP_HEADER.pack(op, stroke_id) + body
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+# 저널 데이터의 레코드들을 strokes({ID: 획}, 순서 유지)에 재생. 재생한 레코드 수 반환
+def replay_journal(data, strokes):
+    position = 0
+    count = 0
+    while position + RECORD_HEADER.size <= len(data):
+        length, crc = RECORD_HEADER.unpack_from(data, position)
+        payload = data[position + RECORD_HEADER.size:position + RECORD_HEADER.size + length]
+        if len(payload) < max(length, OP_HEADER.size) or zlib.crc32(payload) != crc:
+            break # 쓰다가 끊긴 레코드
+        position += RECORD_HEADER.size + length
+        count += 1
+
+        op, stroke_id = OP_HEADER.unpack_from(payload, 0)
+        body = payload[OP_HEADER.size:]
+        if op == OP_CLEAR:
+            strokes.clear()
+            continue
+        if op in (OP_TRANSLATE, OP_SCALE):
+            _replay_many(op, stroke_id, body, strokes)
+            continue
+        if op == OP_ADD:
+            width, color_length = ADD_BODY.unpack_from(body, 0)
+            color = body[ADD_BODY.size:ADD_BODY.size + color_length].decode("utf-8")
+            strokes[stroke_id] = Stroke(color, width)
+            continue
+        stroke = strokes.get(stroke_id)
+        if stroke is None:
+            continue
+        if op == OP_POINTS:
+            point_count, curve_count = POINTS_BODY.unpack_from(body, 0)
+            end = POINTS_BODY.size + (point_count + curve_count) * 8
+            coords = np.frombuffer(body, dtype="<f4", count=(point_count + curve_count) * 2,
+                                   offset=POINTS_BODY.size).reshape(-1, 2)
+            curves = coords[point_count:] if curve_count else None
+            widths = np.frombuffer(body, dtype="<f4", offset=end) if len(body) > end else None
+            stroke.set_points(coords[:point_count], curves, widths)
+        elif op in (OP_ERASE, OP_DELETE):
+            del strokes[stroke_id]
+    return count
+
+
+# 여러 획 작업 레코드 재생 (count: 획 수)
+def _replay_many(op, count, body, strokes):
+    if op == OP_TRANSLATE:
+        transform = TRANSLATE_BODY.unpack_from(body, 0)
+        ids = np.frombuffer(body, dtype="<u4", count=count, offset=TRANSLATE_BODY.size)
+        apply = Stroke.translate
+    else:
+        transform = SCALE_BODY.unpack_from(body, 0)
+        ids = np.frombuffer(body, dtype="<u4", count=count, offset=SCALE_BODY.size)
+        apply = Stroke.scale
+    for stroke_id in ids.tolist():
+        stroke = strokes.get(stroke_id)
+        if stroke is not None:
+            apply(stroke, *transform)
+
+
+class Journal:
+    FSYNC_INTERVAL = 0.5 # fsync 사이의 최소 간격(초)
+    COMPACT_RECORDS = 20000 # 이만큼 레코드가 쌓이면 스냅숏으로 압축
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.snapshot_path = base_path + ".snapshot"
+        self._ids = {} # 획 -> 획 ID
+        self._next_id = 0
+        self._generation = 0 # 지금 쓰고 있는 저널의 세대 번호
+        self._queue = queue.Queue()
+        self._thread = None
+        self.records_written = 0
+        self.error = None # 백그라운드 스레드에서 마지막으로 발생한 오류
+        self.on_error = None # 기록이나 압축이 실패할 때마다 백그라운드 스레드에서 오류를 넘겨 호출 (사용자에게 알림 등)
+
+    def _journal_path(self, generation):
+        return f"{self.base_path}.{generation}.journal"
+
+    # 남아 있는 저널 세대 번호들 (오름차순)
+    def _journal_generations(self):
+        generations = []
+        for path in glob.glob(glob.escape(self.base_path) + ".*.journal"):
+            number = path[len(self.base_path) + 1:-len(".journal")]
+            if number.isdigit():
+                generations.append(int(number))
+        return sorted(generations)
+
+    # 스냅숏에 저널들을 재생하여 {ID: 획} 반환 (generations: 재생할 세대 목록, None이면 스냅숏 이후 전부)
+    def _rebuild(self, generations=None):
+        strokes = {}
+        snapshot_generation = 0
+        if os.path.exists(self.snapshot_path):
+            loaded, ids, snapshot_generation = load_notebook_snapshot(self.snapshot_path)
+            strokes = dict(zip(ids if ids is not None else range(len(loaded)), loaded))
+        if generations is None:
+            generations = self._journal_generations()
+        for generation in generations:
+            if generation < snapshot_generation:
+                continue # 이미 스냅숏에 반영된 저널
+            with open(self._journal_path(generation), "rb") as f:
+                replay_journal(f.read(), strokes)
+        return strokes, snapshot_generation
+
+    # 시작할 때 한 번 호출: 스냅숏과 저널로부터 마지막 상태의 획 목록을 복구
+    # 이어지는 기록은 새 세대 저널에 쓰므로 끝이 잘린 저널 뒤에 덧붙이지 않음
+    def recover(self):
+        generations = self._journal_generations()
+        try:
+            strokes, snapshot_generation = self._rebuild(generations)
+        except (OSError, NotebookFormatError) as ex:
+            self.error = ex
+            strokes, snapshot_generation = {}, 0
+        self._ids = {stroke: stroke_id for stroke_id, stroke in strokes.items()}
+        self._next_id = max(strokes, default=-1) + 1
+        self._generation = max(generations + [snapshot_generation - 1]) + 1
+        return list(strokes.values())
+
+    # 백그라운드 기록 스레드 시작
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+            self._thread.start()
+
+    # 남은 레코드를 모두 쓰고 fsync한 뒤 스레드 종료
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    # 레코드를 쓰기 대기열에 넣기 (핸들러에서 호출)
+    def _log(self, op, stroke, body=b""):
+        stroke_id = self._ids.get(stroke)
+        if stroke_id is None:
+            return
+        self._queue.put(_record(op, stroke_id, body))
+
+    # 획의 현재 점과 곡선 (점마다의 두께) 레코드 내용
+    @staticmethod
+    def _points_body(stroke):
+        points = stroke.points
+        curves = stroke.curves
+        widths = stroke.widths
+        coords = points if curves is None else np.concatenate((points, curves))
+        curve_count = 0 if curves is None else len(curves)
+        body = POINTS_BODY.pack(len(points), curve_count) + coords.astype("<f4").tobytes()
+        if widths is not None:
+            body += widths.astype("<f4").tobytes()
+        return body
+
+    # 새 획 추가 (색상, 두께와 점 전체)
+    def log_add(self, stroke):
+        stroke_id = self._next_id
+        self._next_id += 1
+        self._ids[stroke] = stroke_id
+        color = getattr(stroke.color, "value", stroke.color).encode("utf-8")
+        self._log(OP_ADD, stroke, ADD_BODY.pack(stroke.width, len(color)) + color)
+        self._log(OP_POINTS, stroke, self._points_body(stroke))
+
+    # 획의 점 전체가 바뀜
+    def log_points(self, stroke):
+        self._log(OP_POINTS, stroke, self._points_body(stroke))
+
+    # 여러 획 작업은 레코드 하나로 기록
+    def _log_many(self, op, strokes, body):
+        ids = [self._ids[stroke] for stroke in strokes if stroke in self._ids]
+        if ids:
+            self._queue.put(_record(op, len(ids), body + np.array(ids, dtype="<u4").tobytes()))
+
+    # 획들을 함께 이동
+    def log_translate(self, strokes, dx, dy):
+        self._log_many(OP_TRANSLATE, strokes, TRANSLATE_BODY.pack(dx, dy))
+
+    # 획들을 함께 크기 조정
+    def log_scale(self, strokes, factor, center_x, center_y):
+        self._log_many(OP_SCALE, strokes, SCALE_BODY.pack(factor, center_x, center_y))
+
+    # 획 삭제 (erased: 지우개로 지웠으면 True, 삭제 버튼이면 False)
+    def log_remove(self, stroke, erased=False):
+        self._log(OP_ERASE if erased else OP_DELETE, stroke)
+        self._ids.pop(stroke, None)
+
+    # 문서 전체가 strokes로 바뀜 (노트 불러오기 등)
+    def reset(self, strokes):
+        self._ids.clear()
+        self._queue.put(_record(OP_CLEAR, 0))
+        for stroke in strokes:
+            self.log_add(stroke)
+
+    def _run(self):
+        f = open(self._journal_path(self._generation), "ab")
+        last_fsync = time.monotonic()
+        unsynced = False
+        pending_records = 0 # 마지막 압축 이후 쓴 레코드 수
+        closing = False
+        while not closing:
+            try:
+                item = self._queue.get(timeout=self.FSYNC_INTERVAL)
+            except queue.Empty:
+                item = b""
+            # 대기열에 쌓인 레코드를 한 번에 씀
+            chunks = []
+            while True:
+                if item is None:
+                    closing = True
+                elif item:
+                    chunks.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if chunks:
+                    f.write(b"".join(chunks))
+                    f.flush()
+                    unsynced = True
+                    pending_records += len(chunks)
+                    self.records_written += len(chunks)
+                now = time.monotonic()
+                if unsynced and (closing or not chunks or now - last_fsync >= self.FSYNC_INTERVAL):
+                    os.fsync(f.fileno())
+                    last_fsync = now
+                    unsynced = False
+                if pending_records >= self.COMPACT_RECORDS and not closing:
+                    pending_records = 0 # 실패해도 매번 다시 시도하지 않도록 먼저 초기화
+                    compacted = self._compact()
+                    f.close() # 새 저널로 넘어간 뒤에만 이전 저널을 닫음
+                    f = compacted
+            except (OSError, NotebookFormatError) as ex:
+                self._fail(ex)
+        f.close()
+
+    def _fail(self, error):
+        self.error = error
+        if self.on_error is not None:
+            self.on_error(error)
+
+    # 새 세대 저널을 열고 이전 스냅숏과 저널들을 새 스냅숏으로 합친 뒤 새 저널 파일 반환
+    # 실패하면 새 저널을 지우고 세대 번호를 되돌린 채 예외를 그대로 올림 (지금 저널은 계속 쓸 수 있음)
+    def _compact(self):
+        previous = [g for g in self._journal_generations() if g <= self._generation]
+        generation = self._generation + 1
+        path = self._journal_path(generation)
+        f = open(path, "ab")
+        try:
+            strokes, _ = self._rebuild(previous)
+            save_notebook(self.snapshot_path, list(strokes.values()), list(strokes), generation)
+        except BaseException:
+            f.close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            raise
+        self._generation = generation
+        # 새 스냅숏에 이미 반영되었으므로 지우지 못한 이전 저널은 복구할 때 건너뜀
+        for previous_generation in previous:
+            try:
+                os.remove(self._journal_path(previous_generation))
+            except OSError as ex:
+                self._fail(ex)
+        return f
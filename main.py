@@ -1,146 +1,64 @@
+import argparse
+import functools
+import threading
 import flet as ft
-from flet import Paint, StrokeCap, StrokeJoin
-from flet.canvas import Canvas, Path
-import math
+import flet.canvas as cv
 import time # 시간 측정을 위해 time 모듈 추가
-
-
-# 각 드로잉 획을 관리하기 위한 클래스
-class Stroke:
-    def __init__(self, color, width):
-        # 획을 구성하는 원본 (x, y) 좌표 목록
-        self.points = []
-        # Flet Canvas에 그려질 Path 객체
-        self.path = Path([], Paint(
-            stroke_width=width,
-            color=color,
-            style=ft.PaintingStyle.STROKE,
-            stroke_cap=StrokeCap.ROUND,
-            stroke_join=StrokeJoin.ROUND,
-        ))
-        # 현재 선택되었는지 여부
-        self.is_selected = False
-        # 획의 기본 색상과 두께 저장 (선택 시 하이라이트 등에 사용)
-        self.color = color
-        self.width = width # 이 width는 이제 '기본' 또는 '초기' 두께 역할을 할 수 있음
-        # 획의 경계 상자(bounding box)를 위한 최소/최대 좌표
-        self.min_x = float('inf')
-        self.max_x = float('-inf')
-        self.min_y = float('inf')
-        self.max_y = float('-inf')
-
-    # 획에 새로운 점 추가
-    def add_point(self, x, y):
-        self.points.append((x, y))
-        if not self.path.elements:
-            # 첫 점이면 PathMoveTo로 시작
-            self.path.elements.append(Path.MoveTo(x, y))
-        else:
-            # 이후 점이면 PathLineTo로 선 연결
-            self.path.elements.append(Path.LineTo(x, y))
-        
-        # 경계 상자 업데이트
-        self.min_x = min(self.min_x, x)
-        self.max_x = max(self.max_x, x)
-        self.min_y = min(self.min_y, y)
-        self.max_y = max(self.max_y, y)
-
-    # 특정 (x, y) 좌표가 획에 "충돌"하는지 (즉, 선택되었는지) 확인
-    # 간단한 경계 상자 충돌 테스트를 사용
-    def is_hit(self, x, y, tolerance=5):
-        if not self.points:
-            return False
-        
-        # 획의 두께와 선택을 위한 허용 오차를 고려하여 경계 상자 확장
-        # 현재 Path의 획 두께를 사용 (동적으로 변할 수 있기 때문)
-        effective_tolerance = tolerance + self.path.paint.stroke_width / 2 
-
-        return (self.min_x - effective_tolerance <= x <= self.max_x + effective_tolerance and
-                self.min_y - effective_tolerance <= y <= self.max_y + effective_tolerance)
-
-    # 획의 점 목록을 기반으로 Path 요소들을 다시 생성
-    # 획이 이동하거나 크기가 변경될 때 호출됨
-    def update_path_elements(self):
-        if not self.points:
-            self.path.elements = []
-            return
-
-        elements = []
-        # 첫 점은 PathMoveTo
-        elements.append(Path.MoveTo(self.points[0][0], self.points[0][1]))
-        # 나머지 점들은 PathLineTo
-        for i in range(1, len(self.points)):
-            elements.append(Path.LineTo(self.points[i][0], self.points[i][1]))
-        self.path.elements = elements
-
-        # 선택 상태에 따라 획의 색상과 두께 변경 (하이라이트 효과)
-        if self.is_selected:
-            self.path.paint.color = ft.Colors.BLUE_200 # 선택 시 강조 색상
-            self.path.paint.stroke_width = self.width + 2 # 선택 시 약간 두껍게 (기본 width를 기준으로)
-        else:
-            self.path.paint.color = self.color # 기본 색상
-            self.path.paint.stroke_width = self.width # 기본 두께
-
-    # 획을 이동시키는 함수
-    def translate(self, dx, dy):
-        for i in range(len(self.points)):
-            self.points[i] = (self.points[i][0] + dx, self.points[i][1] + dy)
-        # 경계 상자도 함께 이동
-        self.min_x += dx
-        self.max_x += dx
-        self.min_y += dy
-        self.max_y += dy
-        self.update_path_elements() # Path 요소 업데이트
-
-    # 획의 크기를 조정하는 함수
-    def scale(self, factor, center_x, center_y):
-        if not self.points:
-            return
-        
-        new_points = []
-        for x, y in self.points:
-            # 중심점을 기준으로 점들을 확대/축소
-            new_x = center_x + (x - center_x) * factor
-            new_y = center_y + (y - center_y) * factor
-            new_points.append((new_x, new_y))
-        
-        self.points = new_points
-        
-        # 크기 변경 후 경계 상자 다시 계산
-        self.min_x = float('inf')
-        self.max_x = float('-inf')
-        self.min_y = float('inf')
-        self.max_y = float('-inf')
-        for x, y in self.points:
-            self.min_x = min(self.min_x, x)
-            self.max_x = max(self.max_x, x)
-            self.min_y = min(self.min_y, y)
-            self.max_y = max(self.max_y, y)
-            
-        self.update_path_elements() # Path 요소 업데이트
-
-
-def main(page: ft.Page):
+import types
+
+from engine import StrokeEngine
+from export import RasterExport, write_svg
+from gestures import MODE, MODES, PAN_END, PAN_START, PAN_UPDATE, RESIZE, TAP_DOWN, ZOOM, GestureRecorder
+from perf_monitor import PerfMonitor
+from pressure import PressureFilter
+from journal import Journal
+from notebook_io import NotebookFormatError, load_notebook, save_notebook
+from renderer import StrokeCanvas, ViewLayer
+from shared_board import BoardSession, close_board, open_board
+from update_scheduler import UpdateScheduler
+from viewport import Viewport
+
+
+# update_rate_hz: 드래그 중 캔버스 업데이트를 모아서 보내는 주기 (0이면 이벤트마다 바로 전송하고,
+#   제스처 재생 결과가 항상 같도록 끝난 획의 후처리도 작업자 스레드 없이 그 자리에서 실행)
+# board: 공유 화이트보드 이름 (주어지면 같은 이름으로 접속한 세션들이 한 문서를 함께 편집함, None이면 혼자 쓰는 문서)
+# memory_budget: 메모리에 둘 획 점 데이터의 최대 크기(바이트, None이면 엔진 기본값), 넘으면 먼 획부터 디스크로 내보냄
+# quantum: 캔버스로 보내는 화면 좌표를 반올림할 격자 간격(px, 예: 0.25, None이면 엔진 기본값), 좌표 JSON이 짧아져 전송량이 줄어듦
+# 반환값: 제스처 재생(replay.py)이 앱과 같은 경로로 이벤트를 보낼 수 있도록 엔진과 핸들러를 묶은 객체
+def main(page: ft.Page, update_rate_hz=60, board=None, memory_budget=None, quantum=None):
     page.title = "Flet 프리핸드 노트 앱"
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     page.vertical_alignment = ft.MainAxisAlignment.START
     page.window_width = 800
     page.window_height = 600
 
-    all_strokes = [] # 캔버스에 그려진 모든 획들을 저장하는 리스트
-    current_stroke = None # 현재 그려지고 있는 획 (그리기 모드에서)
-    selected_stroke = None # 현재 선택된 획 (선택/조작 모드에서)
-    
-    current_mode_type = "draw" # "draw", "select", "erase"
+    current_mode_type = "draw" # "draw", "select", "erase", "pan"
+    is_rectangle_selection = False # 선택 모드에서 빈 곳을 드래그할 때 사각형으로 선택 (False면 올가미)
+    # 화면 이동 모드에서 보기 영역을 드래그할 때 직전 포인터 위치 (화면 좌표, 드래그 중이 아니면 None)
+    drag_last_x = None
+    drag_last_y = None
+
+    VIEW_ZOOM_STEP = 1.25 # 보기 확대/축소 버튼 한 번의 배율
+    # 휠/버튼 확대/축소가 이 시간(초) 동안 이어지지 않으면 멈춘 것으로 보고 도형을 새 배율로 다시 만듦
+    # (그 전까지는 캔버스 래퍼의 크기 변환으로만 보여줌, update_rate_hz가 0이면 바로 다시 만듦)
+    VIEW_SETTLE_DELAY = 0.2 if update_rate_hz else 0.0
+    view_settle_timer = None
+
+    NOTEBOOK_PATH = "notebook.fnb" # 노트 저장/불러오기 파일
+    EXPORT_SVG_PATH = "notebook.svg" # SVG 내보내기 파일
+    EXPORT_PNG_PATH = "notebook.png" # PNG 내보내기 파일
+    EXPORT_PNG_DPI = 300 # PNG 내보내기 해상도 (월드 좌표 1단위 = 1/96 인치)
+    # 변경 사항을 백그라운드에서 기록하는 자동 저장 저널 (autosave.snapshot, autosave.<세대>.journal)
+    # 앱이 비정상 종료되어도 다음 실행 때 마지막 상태로 복구됨
+    # 공유 화이트보드에서는 세션마다 저널을 두지 않고 공유 문서가 board-<이름> 저널 하나에 기록함
+    journal = Journal("autosave") if board is None else None
+    shared_board = open_board(board, f"board-{board}") if board is not None else None
 
     drawing_paint_color = ft.Colors.BLACK # 현재 그리기 색상
     drawing_stroke_width = 3.0 # 현재 그리기 획 고정 두께 (압력 감지 비활성 시)
 
     # 압력 감지 시뮬레이션을 위한 변수
     is_pressure_sensitive = False
-    last_pan_time = None
-    last_pan_x = None
-    last_pan_y = None
 
     # 압력 감지 시뮬레이션 관련 상수 및 획 두께 상한
     MIN_SPEED_THRESHOLD = 50.0  # 느린 움직임 (두꺼운 선)
@@ -148,166 +66,218 @@ def main(page: ft.Page):
     MIN_DISPLAY_WIDTH = 1.0     # 최소 획 두께
     MAX_STROKE_WIDTH_CAP = 20.0 # 슬라이더로 조절 가능한 최대 두께의 상한선
 
-    # 캔버스에 있는 모든 획들을 다시 그리고 UI를 업데이트하는 함수
+    # 압력 감지 시 샘플마다 두께를 정하는 필터 (최근 샘플들의 평균 속도 기준, 두께는 점마다 따로 저장됨)
+    pressure_filter = PressureFilter(MIN_SPEED_THRESHOLD, MAX_SPEED_THRESHOLD, MIN_DISPLAY_WIDTH)
+
+    update_scheduler = UpdateScheduler(lambda: flush_canvas(), update_rate_hz)
+
+    # 핸들러별 지연 시간 계측 (성능 정보 버튼으로 켜고 끔, 꺼져 있으면 호출마다 enabled 확인만 함)
+    # 켜져 있는 동안 1초마다 화면 왼쪽 위에 요약을 표시하고 perf.jsonl에 스냅숏을 한 줄씩 덧붙임
+    PERF_DUMP_PATH = "perf.jsonl"
+    perf_monitor = PerfMonitor(1.0, PERF_DUMP_PATH, update_scheduler.lock)
+    perf_monitor.gauge("shapes", lambda: engine.renderer.shape_count)
+    perf_monitor.gauge("strokes", lambda: len(engine.strokes))
+    perf_monitor.gauge("points", lambda: sum(stroke.point_count for stroke in engine.strokes))
+    perf_monitor.gauge("visible_strokes", lambda: len(engine.culler.visible))
+    perf_monitor.gauge("resident_bytes", lambda: engine.pages.resident_bytes)
+    perf_monitor.gauge("paged_bytes", lambda: engine.pages.paged_bytes)
+    perf_monitor.gauge("flush", lambda: update_scheduler.stats.summary()) # flush 한 번에 합쳐진 이벤트 수
+    perf_monitor.gauge("simplify", lambda: engine.simplifier.stats.summary()) # 단순화로 제거된 점 수
+
+    # 쌓인 변경 사항을 캔버스에 반영 (업데이트 스케줄러가 호출). 계측 중이면 업데이트당 전송량도 기록
+    @perf_monitor.timed("flush")
+    def flush_canvas():
+        renderer = engine.renderer
+        updates, serialized = renderer.updates, renderer.bytes_serialized
+        engine.flush()
+        if renderer.updates != updates:
+            perf_monitor.observe("update_bytes", renderer.bytes_serialized - serialized)
+
+    # 성능 문제를 재현하기 위한 제스처 녹화 (녹화 버튼으로 시작/중지, 재생은 replay.py)
+    GESTURE_TRACE_PATH = "gestures.fgt"
+    gesture_recorder = GestureRecorder()
+
+    # 녹화 중이면 핸들러가 받은 이벤트를 기록한 뒤 핸들러 실행
+    def recorded(kind, handler):
+        def wrapper(e):
+            if gesture_recorder.active:
+                gesture_recorder.record(kind, e.local_x, e.local_y)
+            return handler(e)
+        return wrapper
+
+    # 제스처나 버튼 동작 하나가 끝나면 그동안의 변경을 실행 취소 한 단계로 묶음
+    def checkpoint_history():
+        engine.checkpoint()
+        update_history_buttons()
+
+    # 변경된 획만 캔버스에 즉시 반영하는 함수
+    @perf_monitor.timed("update_canvas_shapes")
     def update_canvas_shapes():
-        canvas.shapes.clear() # 캔버스에서 모든 기존 획 제거
-        for stroke in all_strokes:
-            stroke.update_path_elements() # 각 획의 Path 요소와 선택 상태 업데이트
-            canvas.shapes.append(stroke.path) # 캔버스에 획 추가
-        canvas.update() # 캔버스 UI 업데이트 요청
+        update_scheduler.flush_now()
 
-    # 획을 선택하는 함수
+    # 드래그 도중의 변경 사항은 다음 프레임에 모아서 반영
+    def schedule_canvas_update():
+        update_scheduler.request()
+
+    # 획을 선택하는 함수 (월드 좌표)
+    @perf_monitor.timed("select_stroke")
     def select_stroke(event_x, event_y):
-        nonlocal selected_stroke
-        
-        # 현재 선택된 획이 있다면 선택 해제
-        if selected_stroke:
-            selected_stroke.is_selected = False
-            selected_stroke = None
-        
-        # 모든 획을 역순으로 순회하며 (가장 위에 그려진 획부터) 충돌 검사
-        for stroke in reversed(all_strokes):
-            if stroke.is_hit(event_x, event_y):
-                stroke.is_selected = True # 획 선택
-                selected_stroke = stroke
-                break # 하나만 선택하고 종료
-        update_canvas_shapes() # 선택 변경 사항을 반영하여 캔버스 다시 그리기
+        engine.select_at(event_x, event_y) # 가장 위에 그려진 획 하나만 선택
+        update_canvas_shapes() # 선택이 바뀐 획만 캔버스에 반영
         update_buttons_state() # 버튼 상태 업데이트
 
     # Pan (드래그) 시작 이벤트 핸들러
+    @perf_monitor.timed("handle_pan_start")
     def handle_pan_start(e: ft.DragStartEvent):
-        nonlocal current_stroke, selected_stroke, last_pan_time, last_pan_x, last_pan_y
+        nonlocal drag_last_x, drag_last_y
+        x, y = engine.viewport.to_world(e.local_x, e.local_y)
 
         if current_mode_type == "draw":
-            # 그리기 모드일 경우: 새로운 획 시작
-            # 압력 감지 활성화 여부에 따라 초기 획 두께 설정
-            initial_stroke_width = stroke_width_slider.value if is_pressure_sensitive else drawing_stroke_width
-            current_stroke = Stroke(drawing_paint_color, initial_stroke_width)
-            current_stroke.add_point(e.local_x, e.local_y)
-            canvas.shapes.append(current_stroke.path) # 캔버스에 즉시 추가
-            all_strokes.append(current_stroke) # 모든 획 목록에 추가
-
-            # 압력 감지를 위한 초기 시간 및 위치 기록
+            # 그리기 모드일 경우: 새로운 획 시작 (문서와 캔버스에 즉시 추가)
             if is_pressure_sensitive:
-                last_pan_time = time.time()
-                last_pan_x = e.local_x
-                last_pan_y = e.local_y
-            
-            canvas.update()
+                # 압력 감지 시: 슬라이더 값을 최대 두께로 하여 점마다 두께를 저장하는 획 시작
+                width = pressure_filter.begin(e.local_x, e.local_y, time.perf_counter(), stroke_width_slider.value)
+                engine.begin_stroke(x, y, drawing_paint_color, width, variable_width=True)
+            else:
+                engine.begin_stroke(x, y, drawing_paint_color, drawing_stroke_width)
+            update_canvas_shapes()
         elif current_mode_type == "select":
-            # 선택/조작 모드일 경우: 획 선택 또는 드래그 시작
-            select_stroke(e.local_x, e.local_y)
-            if selected_stroke:
-                selected_stroke.drag_start_x = e.local_x
-                selected_stroke.drag_start_y = e.local_y
+            # 선택/조작 모드일 경우: 획 위에서 시작하면 드래그 (이미 선택된 획이면 선택된 획들을 함께),
+            # 빈 곳에서 시작하면 선택 영역(올가미/사각형) 그리기
+            if engine.begin_drag(x, y) is None:
+                engine.begin_lasso(x, y, rectangle=is_rectangle_selection)
+            update_canvas_shapes()
+            update_buttons_state()
         elif current_mode_type == "erase":
             # 지우개 모드일 경우: 탭 시 바로 삭제 시도
-            stroke_to_remove = None
-            for stroke in reversed(all_strokes):
-                if stroke.is_hit(e.local_x, e.local_y):
-                    stroke_to_remove = stroke
-                    break
-            if stroke_to_remove:
-                all_strokes.remove(stroke_to_remove)
-                if selected_stroke == stroke_to_remove:
-                    selected_stroke.is_selected = False
-                    selected_stroke = None
+            had_selection = bool(engine.selection)
+            if engine.erase_at(x, y, single=True):
                 update_canvas_shapes()
-                update_buttons_state() # 버튼 상태 업데이트
+                if had_selection and not engine.selection:
+                    update_buttons_state() # 버튼 상태 업데이트
+        elif current_mode_type == "pan":
+            # 화면 이동 모드: 보기 영역 드래그 시작 (화면 좌표 기준)
+            drag_last_x = e.local_x
+            drag_last_y = e.local_y
 
     # Pan (드래그) 업데이트 이벤트 핸들러
+    @perf_monitor.timed("handle_pan_update")
     def handle_pan_update(e: ft.DragUpdateEvent):
-        nonlocal current_stroke, last_pan_time, last_pan_x, last_pan_y, selected_stroke
+        nonlocal drag_last_x, drag_last_y
+        x, y = engine.viewport.to_world(e.local_x, e.local_y)
         
-        if current_mode_type == "draw" and current_stroke:
-            # 그리기 모드
-            current_stroke.add_point(e.local_x, e.local_y)
-
-            if is_pressure_sensitive and last_pan_time is not None:
-                current_time = time.time()
-                dt = current_time - last_pan_time
-
-                if dt > 0:
-                    distance = math.sqrt((e.local_x - last_pan_x)**2 + (e.local_y - last_pan_y)**2)
-                    speed = distance / dt
-
-                    # 속도에 따라 획 두께 매핑 (느릴수록 두껍게, 빠를수록 얇게)
-                    # 정규화된 속도 (0.0 ~ 1.0)
-                    normalized_speed = (speed - MIN_SPEED_THRESHOLD) / (MAX_SPEED_THRESHOLD - MIN_SPEED_THRESHOLD)
-                    clamped_normalized_speed = max(0.0, min(1.0, normalized_speed))
-
-                    effective_width = stroke_width_slider.value - (clamped_normalized_speed * (stroke_width_slider.value - MIN_DISPLAY_WIDTH))
-                    
-                    current_stroke.path.paint.stroke_width = max(MIN_DISPLAY_WIDTH, effective_width)
-                    current_stroke.width = max(MIN_DISPLAY_WIDTH, effective_width) # Stroke 객체에도 업데이트
-                
-                last_pan_time = current_time
-                last_pan_x = e.local_x
-                last_pan_y = e.local_y
-
-            canvas.update()
-
-        elif current_mode_type == "select" and selected_stroke and hasattr(selected_stroke, 'drag_start_x'):
-            # 선택/조작 모드
-            dx = e.local_x - selected_stroke.drag_start_x
-            dy = e.local_y - selected_stroke.drag_start_y
-            selected_stroke.translate(dx, dy)
-            selected_stroke.drag_start_x = e.local_x
-            selected_stroke.drag_start_y = e.local_y
-            canvas.update()
+        if current_mode_type == "draw" and engine.current_stroke:
+            # 그리기 모드: 직전 점과 너무 가까운 샘플은 저장하지 않음
+            # 압력 감지 시 샘플의 두께는 그 점에만 저장되고, 캔버스에는 새 선분만 해당 두께 구간의 Path에 덧붙음
+            width = None
+            if engine.current_stroke.widths is not None:
+                width = pressure_filter.sample(e.local_x, e.local_y, time.perf_counter())
+            engine.extend_stroke(x, y, width)
+            schedule_canvas_update()
+
+        elif current_mode_type == "select":
+            # 선택/조작 모드: 선택된 획들 드래그 또는 선택 영역 넓히기
+            if engine.drag_to(x, y) or engine.extend_lasso(x, y):
+                schedule_canvas_update()
         
         elif current_mode_type == "erase":
-            # 지우개 모드: 드래그하는 동안 획 지속적으로 삭제
-            strokes_to_remove_in_update = []
-            for stroke in reversed(all_strokes):
-                if stroke.is_hit(e.local_x, e.local_y):
-                    strokes_to_remove_in_update.append(stroke)
-            
-            # 중복 제거 및 실제로 목록에서 제거
-            for stroke_to_remove in strokes_to_remove_in_update:
-                if stroke_to_remove in all_strokes: # 이미 제거되지 않았는지 다시 확인
-                    all_strokes.remove(stroke_to_remove)
-                    if selected_stroke == stroke_to_remove: # 지워진 획이 선택되어 있었다면 선택 해제
-                        selected_stroke.is_selected = False
-                        selected_stroke = None
-            
-            if strokes_to_remove_in_update: # 변경 사항이 있다면 캔버스 업데이트
-                update_canvas_shapes()
-                update_buttons_state() # 버튼 상태 업데이트
+            # 지우개 모드: 드래그하는 동안 획 지속적으로 삭제 (지워진 획이 선택되어 있었다면 선택도 해제됨)
+            had_selection = bool(engine.selection)
+            if engine.erase_at(x, y): # 변경 사항이 있다면 다음 프레임에 캔버스 업데이트
+                schedule_canvas_update()
+                if had_selection and not engine.selection:
+                    update_buttons_state() # 버튼 상태 업데이트
+
+        elif current_mode_type == "pan" and drag_last_x is not None:
+            # 화면 이동 모드: 드래그 동안은 캔버스 래퍼만 옮김 (새로 보이는 획은 드래그가 끝나면 올림)
+            engine.pan_view(e.local_x - drag_last_x, e.local_y - drag_last_y)
+            drag_last_x = e.local_x
+            drag_last_y = e.local_y
+            schedule_canvas_update()
 
     # Pan (드래그) 종료 이벤트 핸들러
+    @perf_monitor.timed("handle_pan_end")
     def handle_pan_end(e: ft.DragEndEvent):
-        nonlocal current_stroke, last_pan_time, last_pan_x, last_pan_y
-        if current_mode_type == "draw" and current_stroke:
-            # 그리기 모드 종료
-            current_stroke = None
-            last_pan_time = None
-            last_pan_x = None
-            last_pan_y = None
-            canvas.update()
-        elif current_mode_type == "select" and selected_stroke and hasattr(selected_stroke, 'drag_start_x'):
-            # 선택/조작 모드 드래그 종료
-            del selected_stroke.drag_start_x
-            del selected_stroke.drag_start_y
-            canvas.update()
-        # 지우개 모드는 특별한 종료 로직 없음 (연속 동작)
+        nonlocal drag_last_x, drag_last_y
+        if current_mode_type == "draw" and engine.current_stroke:
+            # 그리기 모드 종료: 단순화, 곡선 근사 후 획을 확정
+            engine.end_stroke()
+            update_history_buttons()
+            update_canvas_shapes()
+        elif current_mode_type == "select":
+            # 선택/조작 모드 드래그 종료: 드래그 동안 누적된 이동을 점 버퍼에 반영하거나 선택 영역 안의 획들을 선택
+            if engine.end_drag():
+                update_history_buttons()
+                update_canvas_shapes()
+            elif engine.lasso is not None:
+                engine.end_lasso()
+                update_canvas_shapes()
+                update_buttons_state()
+        elif current_mode_type == "erase":
+            # 지우개 모드: 아직 보내지 않은 삭제 사항 전송
+            checkpoint_history() # 한 번의 지우개 드래그로 지운 획들은 한 단계로 되돌림
+            update_canvas_shapes()
+        elif current_mode_type == "pan":
+            drag_last_x = None
+            drag_last_y = None
+            engine.settle_view() # 새로 보이는 획만 올리고 멀리 벗어난 획은 내림
+            update_canvas_shapes()
+
+    # 보기 영역 확대/축소 (화면 좌표 (x, y)를 기준으로, 없으면 화면 중앙 기준)
+    def zoom_view(factor, x=None, y=None):
+        if x is None:
+            x, y = engine.viewport.width / 2, engine.viewport.height / 2
+        nonlocal view_settle_timer
+        if gesture_recorder.active:
+            gesture_recorder.record(ZOOM, x, y, factor)
+        engine.zoom_view(factor, x, y)
+        if view_settle_timer is not None:
+            view_settle_timer.cancel()
+            view_settle_timer = None
+        if VIEW_SETTLE_DELAY:
+            view_settle_timer = threading.Timer(VIEW_SETTLE_DELAY, update_scheduler.synchronized(settle_zoom))
+            view_settle_timer.daemon = True
+            view_settle_timer.start()
+            schedule_canvas_update()
+        else:
+            settle_zoom()
+
+    # 확대/축소가 멈춘 뒤 타이머 스레드에서 lock을 잡고 호출 (도형을 새 배율로 다시 만들고 새로 보이는 획을 올림)
+    def settle_zoom():
+        nonlocal view_settle_timer
+        view_settle_timer = None
+        engine.settle_view()
+        update_canvas_shapes()
+
+    # 마우스 휠로 포인터 위치를 기준으로 확대/축소
+    def handle_scroll(e: ft.ScrollEvent):
+        if e.scroll_delta_y:
+            zoom_view(VIEW_ZOOM_STEP ** (-e.scroll_delta_y / 100), e.local_x, e.local_y)
+
+    # 캔버스 크기가 바뀌면 보기 영역 크기에 반영
+    def handle_canvas_resize(e: cv.CanvasResizeEvent):
+        if gesture_recorder.active:
+            gesture_recorder.record(RESIZE, e.width, e.height)
+        engine.resize_view(e.width, e.height)
+        update_canvas_shapes()
 
 
     # 모드 설정 함수 (모든 모드 버튼이 호출)
     def set_mode(mode: str):
-        nonlocal current_mode_type, selected_stroke
+        nonlocal current_mode_type
         
         # 현재 모드와 같은 모드를 선택하면 아무것도 하지 않음
         if current_mode_type == mode:
             return
 
         current_mode_type = mode
+        if gesture_recorder.active:
+            gesture_recorder.record(MODE, 0, 0, MODES.index(mode))
 
         # 다른 모드로 전환 시 현재 선택된 획이 있다면 선택 해제
-        if selected_stroke:
-            selected_stroke.is_selected = False
-            selected_stroke = None
-            update_canvas_shapes() # 선택 해제 반영
+        engine.cancel_lasso()
+        engine.deselect()
+        update_canvas_shapes() # 선택 해제 반영 (바뀐 것이 없으면 보내지 않음)
 
         # 모든 모드 버튼의 텍스트/아이콘/스타일 업데이트
         # 현재 활성화된 모드 버튼만 `FilledButton`으로 표시
@@ -323,6 +293,10 @@ def main(page: ft.Page):
             bgcolor=ft.Colors.BLUE_GREY_100 if current_mode_type != "erase" else ft.Colors.BLUE_200,
             color=ft.Colors.BLACK if current_mode_type != "erase" else ft.Colors.WHITE
         )
+        pan_mode_button.style = ft.ButtonStyle(
+            bgcolor=ft.Colors.BLUE_GREY_100 if current_mode_type != "pan" else ft.Colors.BLUE_200,
+            color=ft.Colors.BLACK if current_mode_type != "pan" else ft.Colors.WHITE
+        )
 
         update_buttons_state() # 버튼 활성화/비활성화 상태 업데이트
         page.update()
@@ -337,32 +311,182 @@ def main(page: ft.Page):
     def activate_erase_mode(e):
         set_mode("erase")
 
+    def activate_pan_mode(e):
+        set_mode("pan")
+
 
     # 선택된 획 삭제 버튼 클릭 핸들러
     def delete_selected_stroke(e):
-        nonlocal selected_stroke
-        if selected_stroke:
-            all_strokes.remove(selected_stroke) # 모든 획 목록에서 제거
-            selected_stroke = None # 선택된 획 해제
-            update_canvas_shapes() # 캔버스 다시 그리기 (삭제 반영)
+        if engine.delete_selected(): # 모든 획 목록과 공간 인덱스에서 제거하고 선택 해제
+            update_history_buttons()
+            update_canvas_shapes() # 캔버스에 삭제 반영
             update_buttons_state() # 버튼 상태 업데이트
             page.update()
 
+    # 선택 모드에서 탭한 획 선택
+    def handle_tap_down(e: ft.TapEvent):
+        if current_mode_type == "select":
+            select_stroke(*engine.viewport.to_world(e.local_x, e.local_y))
+
+    # 노트 저장/불러오기 결과를 화면 아래에 잠시 표시
+    def show_message(text):
+        page.open(ft.SnackBar(ft.Text(text)))
+
+    # 노트 저장 버튼 클릭 핸들러
+    def save_document(e):
+        try:
+            save_notebook(NOTEBOOK_PATH, engine.strokes)
+        except OSError as ex:
+            show_message(f"저장 실패: {ex}")
+            return
+        show_message(f"획 {len(engine.strokes)}개를 {NOTEBOOK_PATH}에 저장했습니다")
+
+    # 노트 불러오기 버튼 클릭 핸들러 (현재 문서는 버려짐)
+    def load_document(e):
+        try:
+            strokes = load_notebook(NOTEBOOK_PATH)
+        except (OSError, NotebookFormatError) as ex:
+            show_message(f"불러오기 실패: {ex}")
+            return
+        engine.load(strokes) # 보기 영역 근처의 획만 캔버스에 올라감, 불러오기 이전 문서로는 되돌릴 수 없음
+        update_history_buttons()
+        update_canvas_shapes()
+        update_buttons_state()
+        show_message(f"{NOTEBOOK_PATH}에서 획 {len(strokes)}개를 불러왔습니다")
+
+    # SVG 내보내기 버튼 클릭 핸들러 (획마다 바로 파일에 씀)
+    def export_svg(e):
+        try:
+            count = write_svg(EXPORT_SVG_PATH, engine.strokes)
+        except (OSError, ValueError) as ex:
+            show_message(f"내보내기 실패: {ex}")
+            return
+        show_message(f"획 {count}개를 {EXPORT_SVG_PATH}로 내보냈습니다")
+
+    # PNG 내보내기 버튼 클릭 핸들러
+    # 핸들러에서는 획 좌표의 스냅숏만 임시 파일로 쓰고, 래스터화와 압축은 백그라운드 스레드에서 작업자들에 맡김
+    # (작업자는 프로세스이며, flet build로 묶은 앱처럼 프로세스를 띄울 수 없으면 스레드, export.can_spawn_workers 참고)
+    def export_png(e):
+        try:
+            export = RasterExport(engine.strokes, EXPORT_PNG_DPI)
+        except (OSError, ValueError) as ex:
+            show_message(f"내보내기 실패: {ex}")
+            return
+        export_png_button.disabled = True
+        export_png_button.update()
+
+        def run():
+            try:
+                export.write(EXPORT_PNG_PATH)
+                message = f"획 {export.stroke_count}개를 {EXPORT_PNG_PATH}로 내보냈습니다 ({export.width}x{export.height})"
+            except Exception as ex:
+                message = f"내보내기 실패: {ex}"
+            finally:
+                export.close()
+            with update_scheduler.lock:
+                export_png_button.disabled = False
+                export_png_button.update()
+                show_message(message)
+
+        threading.Thread(target=run, name="png-export", daemon=True).start()
+
+    # 제스처 녹화 버튼 클릭 핸들러 (녹화 시작 시 현재 문서도 함께 저장됨)
+    def toggle_gesture_recording(e):
+        if gesture_recorder.active:
+            gesture_recorder.stop()
+            record_button.icon = ft.Icons.FIBER_MANUAL_RECORD
+            record_button.tooltip = "제스처 녹화 시작"
+            show_message(f"제스처 {gesture_recorder.events}개를 {GESTURE_TRACE_PATH}에 기록했습니다")
+        else:
+            try:
+                gesture_recorder.start(GESTURE_TRACE_PATH, engine.strokes, engine.viewport, current_mode_type)
+            except OSError as ex:
+                show_message(f"녹화 실패: {ex}")
+                return
+            record_button.icon = ft.Icons.STOP
+            record_button.tooltip = "제스처 녹화 중지"
+        record_button.update()
+
+    # 계측 스냅숏을 오버레이 문구로 (백그라운드 스레드에서 lock을 잡고 호출됨)
+    def show_perf_overlay(snapshot):
+        lines = [
+            f"{name}: {stats['per_sec']:.0f}/s p50 {stats['p50']:.2f} p99 {stats['p99']:.2f} 최대 {stats['max']:.2f} ms"
+            for name, stats in snapshot["handlers_ms"].items()
+        ]
+        gauges = snapshot["gauges"]
+        lines.append(f"도형 {gauges['shapes']} 획 {gauges['strokes']} (보이는 획 {gauges['visible_strokes']}) 점 {gauges['points']}")
+        update_bytes = snapshot["values"].get("update_bytes")
+        if update_bytes:
+            lines.append(f"업데이트당 전송 p50 {update_bytes['p50'] / 1024:.1f} KB 평균 {update_bytes['mean'] / 1024:.1f} KB 최대 {update_bytes['max'] / 1024:.1f} KB")
+        lines.append(str(update_scheduler.stats))
+        lines.append(str(engine.simplifier.stats))
+        perf_overlay.value = "\n".join(lines)
+        perf_overlay.update()
+
+    # 성능 정보 버튼 클릭 핸들러 (계측과 오버레이를 함께 켜고 끔)
+    def toggle_perf_monitor(e):
+        if perf_monitor.enabled:
+            perf_monitor.stop()
+            perf_overlay.visible = False
+        else:
+            perf_monitor.start(show_perf_overlay)
+            perf_overlay.value = "성능 정보 수집 중..."
+            perf_overlay.visible = True
+        perf_overlay.update()
+
+    # 실행 취소/다시 실행 (선택을 해제한 뒤 한 단계의 명령들을 역순/순서대로 적용)
+    def undo_redo(undo):
+        if engine.undo() if undo else engine.redo():
+            update_canvas_shapes()
+        update_buttons_state()
+        update_history_buttons()
+
+    # 실행 취소/다시 실행 버튼의 활성화 상태 갱신 (바뀐 경우에만 전송)
+    def update_history_buttons():
+        for button, enabled in ((undo_button, engine.history.can_undo), (redo_button, engine.history.can_redo)):
+            if button.disabled == enabled:
+                button.disabled = not enabled
+                if button.page:
+                    button.update()
+
+    # 다른 세션의 변경 사항을 적용한 뒤 호출됨 (pubsub 스레드에서 lock을 잡고 호출)
+    # 바뀐 획은 다음 프레임에 모아서 반영하고, 선택된 획이 모두 지워졌거나 문서가 교체되었으면 버튼 상태도 갱신
+    def handle_board_change():
+        schedule_canvas_update()
+        if not delete_button.disabled and not engine.selection:
+            update_buttons_state()
+        update_history_buttons()
+
+    # Ctrl+Z: 실행 취소, Ctrl+Y 또는 Ctrl+Shift+Z: 다시 실행
+    def handle_keyboard(e: ft.KeyboardEvent):
+        if not (e.ctrl or e.meta):
+            return
+        key = e.key.upper()
+        if key == "Z":
+            undo_redo(undo=not e.shift)
+        elif key == "Y":
+            undo_redo(undo=False)
+
+    # 선택 영역 모양 전환 버튼 클릭 핸들러 (올가미 <-> 사각형)
+    def toggle_selection_shape(e):
+        nonlocal is_rectangle_selection
+        is_rectangle_selection = not is_rectangle_selection
+        selection_shape_button.icon = ft.Icons.CROP_SQUARE if is_rectangle_selection else ft.Icons.GESTURE
+        selection_shape_button.tooltip = "선택 영역: 사각형" if is_rectangle_selection else "선택 영역: 올가미"
+        selection_shape_button.update()
+
     # 선택된 획 크기 조절 함수
     def scale_selected_stroke(e, factor):
-        if selected_stroke and selected_stroke.points:
-            # 획의 경계 상자를 기준으로 중심점 계산 (확대/축소 기준점)
-            center_x = (selected_stroke.min_x + selected_stroke.max_x) / 2
-            center_y = (selected_stroke.min_y + selected_stroke.max_y) / 2
-            
-            selected_stroke.scale(factor, center_x, center_y) # 획 크기 조정
-            update_canvas_shapes() # 캔버스 다시 그리기
+        if engine.scale_selected(factor): # 선택된 획들 전체의 경계 상자 중심을 기준으로 함께 크기 조정
+            update_history_buttons()
+            update_canvas_shapes() # 크기가 바뀐 획만 다시 그리기
             page.update()
 
     # 조작 버튼(삭제, 확대, 축소)의 활성화/비활성화 상태 업데이트
+    @perf_monitor.timed("update_buttons_state")
     def update_buttons_state():
         # 선택/조작 버튼은 "select" 모드에서 획이 선택되었을 때만 활성화
-        is_selected_and_manipulate = (selected_stroke is not None) and (current_mode_type == "select")
+        is_selected_and_manipulate = bool(engine.selection) and (current_mode_type == "select")
         delete_button.disabled = not is_selected_and_manipulate
         scale_up_button.disabled = not is_selected_and_manipulate
         scale_down_button.disabled = not is_selected_and_manipulate
@@ -429,33 +553,68 @@ def main(page: ft.Page):
         is_pressure_sensitive = e.control.value
         update_buttons_state() # 스위치 상태 변경 시 버튼/슬라이더 상태 업데이트
 
+    # 제스처 감지기에 연결되는 핸들러 (녹화 중이면 이벤트를 먼저 기록)
+    # 타이머 스레드의 flush와 겹치지 않도록 핸들러는 스케줄러의 lock을 잡고 실행
+    pan_start_handler = update_scheduler.synchronized(recorded(PAN_START, handle_pan_start))
+    pan_update_handler = update_scheduler.synchronized(recorded(PAN_UPDATE, handle_pan_update))
+    pan_end_handler = update_scheduler.synchronized(recorded(PAN_END, handle_pan_end))
+    tap_down_handler = update_scheduler.synchronized(recorded(TAP_DOWN, handle_tap_down))
+
+    # 계측 중일 때 캔버스 왼쪽 위에 표시되는 성능 정보 (제스처 감지기 안에 있으므로 그리기를 막지 않음)
+    perf_overlay = ft.Text(
+        "",
+        size=11,
+        font_family="monospace",
+        color=ft.Colors.BLACK54,
+        bgcolor=ft.Colors.with_opacity(0.7, ft.Colors.WHITE),
+        visible=False,
+    )
+
     # 캔버스 설정
-    canvas = Canvas(
+    canvas = StrokeCanvas(
         [], # 초기 획 목록은 비어 있음
         expand=True, # 캔버스가 사용 가능한 모든 공간을 채우도록 확장
+        resize_interval=100,
+        on_resize=update_scheduler.synchronized(handle_canvas_resize),
         # bgcolor=ft.Colors.GREY_100, # 캔버스 배경색
-        # 제스처 감지기 이벤트 핸들러 연결
-        content=ft.Container(
-            ft.GestureDetector(
-                on_pan_start=handle_pan_start,
-                on_pan_update=handle_pan_update,
-                on_pan_end=handle_pan_end,
-                drag_interval=10,
-                on_tap_down=lambda e: select_stroke(e.local_x, e.local_y) if current_mode_type == "select" else None,
+    )
+    # 보기 영역 이동/확대 제스처 중에 scale/offset 변환을 받는 캔버스 래퍼
+    canvas_layer = ViewLayer(canvas, left=0, top=0, right=0, bottom=0)
+    # 캔버스 위에 겹친 제스처 감지기 (래퍼의 변환을 받지 않으므로 이벤트 좌표는 항상 현재 화면 좌표)
+    canvas_area = ft.Stack(
+        [
+            canvas_layer,
+            ft.Container(
+                ft.GestureDetector(
+                    on_pan_start=pan_start_handler,
+                    on_pan_update=pan_update_handler,
+                    on_pan_end=pan_end_handler,
+                    drag_interval=10,
+                    on_tap_down=tap_down_handler,
+                    content=ft.Container(perf_overlay, alignment=ft.alignment.top_left, padding=8),
+                    on_scroll=update_scheduler.synchronized(handle_scroll),
+                ),
+                border_radius=5,
+                border=ft.border.all(2, ft.Colors.BLACK38),
+                left=0, top=0, right=0, bottom=0,
             ),
-            border_radius=5,
-            border=ft.border.all(2, ft.Colors.BLACK38),
-        ),
-
-        
+        ],
+        expand=True,
     )
 
+    # 문서, 조작, 렌더 준비를 담당하는 엔진 (이벤트의 화면 좌표는 engine.viewport.to_world로 바꿔서 전달)
+    board_session = BoardSession(shared_board, page.pubsub, update_scheduler.lock) if shared_board is not None else None
+    engine = StrokeEngine(canvas, Viewport(), journal, board_session, memory_budget,
+                          post_workers=0 if update_rate_hz == 0 else None, quantum=quantum, layer=canvas_layer)
+    # 끝난 획의 후처리가 끝나면 다음 프레임에 결과를 적용 (작업자 스레드에서 호출됨)
+    engine.pipeline.on_ready = schedule_canvas_update
+
     # UI 컨트롤 요소들 정의
     # 모드 선택 버튼 (스타일 초기화)
     draw_mode_button = ft.FilledButton(
         text="모드: 그리기",
         icon=ft.Icons.DRAW,
-        on_click=activate_draw_mode,
+        on_click=update_scheduler.synchronized(activate_draw_mode),
         style=ft.ButtonStyle(
             bgcolor=ft.Colors.BLUE_200, # 초기 활성 색상
             color=ft.Colors.WHITE
@@ -464,7 +623,7 @@ def main(page: ft.Page):
     select_mode_button = ft.FilledButton(
         text="선택/조작",
         icon=ft.Icons.TOUCH_APP,
-        on_click=activate_select_mode,
+        on_click=update_scheduler.synchronized(activate_select_mode),
         style=ft.ButtonStyle(
             bgcolor=ft.Colors.BLUE_GREY_100, # 초기 비활성 색상
             color=ft.Colors.BLACK
@@ -473,29 +632,101 @@ def main(page: ft.Page):
     eraser_mode_button = ft.FilledButton(
         text="지우개",
         icon=ft.Icons.SQUARE,
-        on_click=activate_erase_mode,
+        on_click=update_scheduler.synchronized(activate_erase_mode),
         style=ft.ButtonStyle(
             bgcolor=ft.Colors.BLUE_GREY_100, # 초기 비활성 색상
             color=ft.Colors.BLACK
         )
     )
 
+    pan_mode_button = ft.FilledButton(
+        text="화면 이동",
+        icon=ft.Icons.PAN_TOOL,
+        on_click=update_scheduler.synchronized(activate_pan_mode),
+        style=ft.ButtonStyle(
+            bgcolor=ft.Colors.BLUE_GREY_100, # 초기 비활성 색상
+            color=ft.Colors.BLACK
+        )
+    )
+    view_zoom_in_button = ft.IconButton(
+        icon=ft.Icons.ADD,
+        tooltip="화면 확대",
+        on_click=update_scheduler.synchronized(lambda e: zoom_view(VIEW_ZOOM_STEP)),
+    )
+    view_zoom_out_button = ft.IconButton(
+        icon=ft.Icons.REMOVE,
+        tooltip="화면 축소",
+        on_click=update_scheduler.synchronized(lambda e: zoom_view(1 / VIEW_ZOOM_STEP)),
+    )
+
+    save_button = ft.IconButton(
+        icon=ft.Icons.SAVE,
+        tooltip="노트 저장",
+        on_click=update_scheduler.synchronized(save_document),
+    )
+    load_button = ft.IconButton(
+        icon=ft.Icons.FOLDER_OPEN,
+        tooltip="노트 불러오기",
+        on_click=update_scheduler.synchronized(load_document),
+    )
+    export_svg_button = ft.IconButton(
+        icon=ft.Icons.IMAGE_OUTLINED,
+        tooltip="SVG로 내보내기",
+        on_click=update_scheduler.synchronized(export_svg),
+    )
+    export_png_button = ft.IconButton(
+        icon=ft.Icons.IMAGE,
+        tooltip="PNG로 내보내기",
+        on_click=update_scheduler.synchronized(export_png),
+    )
+
+    record_button = ft.IconButton(
+        icon=ft.Icons.FIBER_MANUAL_RECORD,
+        tooltip="제스처 녹화 시작",
+        on_click=update_scheduler.synchronized(toggle_gesture_recording),
+    )
+
+    perf_button = ft.IconButton(
+        icon=ft.Icons.SPEED,
+        tooltip="성능 정보 표시",
+        on_click=update_scheduler.synchronized(toggle_perf_monitor),
+    )
+
+    undo_button = ft.IconButton(
+        icon=ft.Icons.UNDO,
+        tooltip="실행 취소 (Ctrl+Z)",
+        on_click=update_scheduler.synchronized(lambda e: undo_redo(undo=True)),
+        disabled=True, # 초기에는 비활성화
+    )
+    redo_button = ft.IconButton(
+        icon=ft.Icons.REDO,
+        tooltip="다시 실행 (Ctrl+Y)",
+        on_click=update_scheduler.synchronized(lambda e: undo_redo(undo=False)),
+        disabled=True, # 초기에는 비활성화
+    )
+
+    selection_shape_button = ft.IconButton(
+        icon=ft.Icons.GESTURE,
+        tooltip="선택 영역: 올가미",
+        on_click=update_scheduler.synchronized(toggle_selection_shape),
+    )
+
     delete_button = ft.IconButton(
         icon=ft.Icons.DELETE,
         tooltip="선택한 획 삭제",
-        on_click=delete_selected_stroke,
+        on_click=update_scheduler.synchronized(delete_selected_stroke),
         disabled=True, # 초기에는 비활성화
     )
     scale_up_button = ft.IconButton(
         icon=ft.Icons.ZOOM_IN,
         tooltip="선택한 획 확대",
-        on_click=lambda e: scale_selected_stroke(e, 1.1), # 10% 확대
+        on_click=update_scheduler.synchronized(lambda e: scale_selected_stroke(e, 1.1)), # 10% 확대
         disabled=True, # 초기에는 비활성화
     )
     scale_down_button = ft.IconButton(
         icon=ft.Icons.ZOOM_OUT,
         tooltip="선택한 획 축소",
-        on_click=lambda e: scale_selected_stroke(e, 0.9), # 10% 축소
+        on_click=update_scheduler.synchronized(lambda e: scale_selected_stroke(e, 0.9)), # 10% 축소
         disabled=True, # 초기에는 비활성화
     )
 
@@ -507,7 +738,7 @@ def main(page: ft.Page):
             ft.IconButton(
                 icon=ft.Icons.CIRCLE,
                 icon_color=color,
-                on_click=lambda e, c=color: set_drawing_color(c),
+                on_click=update_scheduler.synchronized(lambda e, c=color: set_drawing_color(c)),
                 tooltip=f"그리기 색상: {color}",
             )
         )
@@ -518,7 +749,7 @@ def main(page: ft.Page):
         min=MIN_DISPLAY_WIDTH, max=MAX_STROKE_WIDTH_CAP, # 슬라이더의 최대값을 상수화
         divisions=int((MAX_STROKE_WIDTH_CAP - MIN_DISPLAY_WIDTH) * 2), # 정수 간격으로 세분화
         value=drawing_stroke_width, label="{value:.1f}", # 소수점 한 자리까지 표시
-        on_change=change_stroke_width,
+        on_change=update_scheduler.synchronized(change_stroke_width),
         width=150,
         tooltip="그리기 획 두께"
     )
@@ -527,7 +758,7 @@ def main(page: ft.Page):
     pressure_sensitivity_switch = ft.Switch(
         label="압력 감지 (속도 기반)",
         value=is_pressure_sensitive,
-        on_change=toggle_pressure_sensitivity,
+        on_change=update_scheduler.synchronized(toggle_pressure_sensitivity),
         tooltip="그리기 속도에 따라 획 두께 조절"
     )
 
@@ -560,6 +791,7 @@ def main(page: ft.Page):
                                         draw_mode_button,
                                         select_mode_button,
                                         eraser_mode_button, # 지우개 버튼 추가
+                                        pan_mode_button,
                                         ft.VerticalDivider(),
                                         ft.Text("색상:", weight=ft.FontWeight.BOLD),
                                         color_buttons,
@@ -573,9 +805,23 @@ def main(page: ft.Page):
                                     [
                                         drawing_controls_row, # 그리기 관련 컨트롤 (가시성 동적 조절)
                                         ft.VerticalDivider(),
+                                        selection_shape_button,
                                         delete_button,
                                         scale_up_button,
                                         scale_down_button,
+                                        ft.VerticalDivider(),
+                                        view_zoom_in_button,
+                                        view_zoom_out_button,
+                                        ft.VerticalDivider(),
+                                        undo_button,
+                                        redo_button,
+                                        ft.VerticalDivider(),
+                                        save_button,
+                                        load_button,
+                                        export_svg_button,
+                                        export_png_button,
+                                        record_button,
+                                        perf_button,
                                     ],
                                     alignment=ft.MainAxisAlignment.START,
                                     spacing=10,
@@ -591,7 +837,7 @@ def main(page: ft.Page):
                 ),
                 # 캔버스 영역
                 ft.Container(
-                    content=canvas,
+                    content=canvas_area,
                     expand=True, # 부모 컬럼에 맞게 확장
                     border=ft.border.all(1, ft.Colors.GREY_400), # 테두리
                     border_radius=ft.border_radius.all(10), # 둥근 모서리
@@ -603,6 +849,34 @@ def main(page: ft.Page):
             horizontal_alignment=ft.CrossAxisAlignment.CENTER, # 가로 중앙 정렬
         )
     )
+    # 세션 종료: 계측과 예약된 업데이트 취소, 녹화 중지, 남은 저널 기록을 모두 씀
+    def close():
+        perf_monitor.stop()
+        update_scheduler.close()
+        gesture_recorder.stop()
+        with update_scheduler.lock:
+            if view_settle_timer is not None:
+                view_settle_timer.cancel()
+            engine.close() # 후처리 중이던 획도 저널과 공유 문서에 기록됨
+        if journal is not None:
+            journal.close()
+        if board_session is not None:
+            board_session.leave()
+            close_board(shared_board)
+
+    if board_session is not None:
+        # 공유 문서의 현재 상태를 불러오고 다른 세션의 변경 사항 받기 시작
+        board_session.join(engine, handle_board_change)
+    else:
+        # 지난 실행의 자동 저장 내용 복구 후 저널 기록 시작
+        for stroke in journal.recover():
+            engine.add_stroke(stroke)
+        journal.on_error = update_scheduler.synchronized(lambda ex: show_message(f"자동 저장 실패: {ex}"))
+        journal.start()
+    page.on_close = lambda e: close() # 세션이 끝나면 남은 기록을 모두 쓰고 종료
+    page.on_keyboard_event = update_scheduler.synchronized(handle_keyboard)
+    update_canvas_shapes()
+
     # 초기 상태 업데이트 호출하여 모드 버튼 스타일, 버튼 비활성화 상태 등을 설정
     update_buttons_state() 
     # 초기 모드 설정 (draw 모드 활성화)
@@ -611,5 +885,36 @@ def main(page: ft.Page):
     ft.Column(col=6, controls=[ft.Text("Column 1")]),
     ft.Column(col=6, controls=[ft.Text("Column 2")])
 ]))
+
+    return types.SimpleNamespace(
+        engine=engine,
+        scheduler=update_scheduler,
+        pan_start=pan_start_handler,
+        pan_update=pan_update_handler,
+        pan_end=pan_end_handler,
+        tap_down=tap_down_handler,
+        set_mode=update_scheduler.synchronized(set_mode),
+        zoom_view=update_scheduler.synchronized(zoom_view),
+        resize=update_scheduler.synchronized(handle_canvas_resize),
+        toggle_recording=update_scheduler.synchronized(toggle_gesture_recording),
+        close=close,
+    )
+
 # Flet 앱 실행
-ft.app(target=main)
+#   python main.py                      # 혼자 쓰는 노트
+#   python main.py --board team         # 공유 화이트보드 (브라우저 여러 개로 http://localhost:8550 에 접속)
+#   python main.py --memory-budget 64   # 획 점 데이터를 64 MB까지만 메모리에 둠
+#   python main.py --quantize 0.25      # 캔버스로 보내는 좌표를 0.25 px 격자로 반올림
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flet 프리핸드 노트 앱")
+    parser.add_argument("--board", help="공유 화이트보드 이름 (같은 이름의 세션들이 한 문서를 함께 편집)")
+    parser.add_argument("--port", type=int, default=8550, help="공유 화이트보드 웹 서버 포트")
+    parser.add_argument("--memory-budget", type=float, help="메모리에 둘 획 점 데이터의 최대 크기 (MB)")
+    parser.add_argument("--quantize", type=float, help="캔버스로 보내는 화면 좌표의 격자 간격 (px, 예: 0.25)")
+    args = parser.parse_args()
+    memory_budget = int(args.memory_budget * 1024 * 1024) if args.memory_budget is not None else None
+    if args.board:
+        ft.app(target=functools.partial(main, board=args.board, memory_budget=memory_budget, quantum=args.quantize),
+               view=ft.AppView.WEB_BROWSER, port=args.port)
+    else:
+        ft.app(target=functools.partial(main, memory_budget=memory_budget, quantum=args.quantize))
@@ -0,0 +1,170 @@
+import os
+import struct
+
+import numpy as np
+
+from stroke import Stroke
+
+
+# 노트 파일(.fnb) 형식 (모든 값은 little-endian)
+#   헤더: 매직(4) 버전(u16) 플래그(u16) 획 수(u32) 색상 수(u32) 좌표 수(u64) 세대 번호(u64)
+#   색상 표: 색상마다 길이(u16) + UTF-8 문자열
+#   획 표: 8바이트 경계에 맞춘 STROKE_DTYPE 배열 (획 수만큼)
+#   획 ID: FLAG_IDS가 있으면 획 표 바로 뒤에 u64 배열 (저널 스냅숏에서 사용)
+#   좌표: 4바이트 경계에 맞춘 float32 배열 하나 [x0, y0, x1, y1, ...]
+#         각 획의 점 다음에 곡선 제어점이 이어짐 (offset, count, curve_count는 점 단위)
+#   두께: FLAG_WIDTHS가 있으면 좌표 바로 뒤에 좌표 배열의 점마다 float32 두께 하나
+#         (압력 감지로 그린 획의 점 구간에만 값이 있고 나머지는 NaN)
+# 불러올 때는 파일을 메모리 맵으로 열고 각 획이 좌표 배열의 뷰를 참조하므로,
+# 점은 실제로 읽히는 시점에 (운영체제가 해당 페이지를 올릴 때) 디코딩됨
+MAGIC = b"FNB1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIQQ")
+FLAG_IDS = 1
+FLAG_WIDTHS = 2
+
+STROKE_DTYPE = np.dtype([
+    ("color", "<u4"), # 색상 표 인덱스
+    ("width", "<f4"),
+    ("min_x", "<f4"),
+    ("min_y", "<f4"),
+    ("max_x", "<f4"),
+    ("max_y", "<f4"),
+    ("offset", "<u8"), # 좌표 배열에서 첫 점의 위치
+    ("count", "<u4"), # 점 개수
+    ("curve_count", "<u4"), # 곡선 제어점 개수 (곡선 근사가 없으면 0)
+])
+
+
+class NotebookFormatError(ValueError):
+    pass
+
+
+def _align(offset, alignment):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+# 색상 값을 문자열로 (ft.Colors 같은 문자열 Enum은 값을 사용)
+def _color_name(color):
+    return getattr(color, "value", color)
+
+
+# 획 목록을 path에 저장 (임시 파일에 쓴 뒤 교체하므로 저장 중에 실패해도 기존 파일은 그대로 남음)
+# ids: 획마다 붙일 ID 목록 (없으면 저장하지 않음), generation: 헤더에 기록할 세대 번호
+def save_notebook(path, strokes, ids=None, generation=0):
+    colors = {}
+    rows = []
+    chunks = []
+    width_chunks = [] # (좌표 배열에서의 위치, 점마다의 두께)
+    offset = 0
+    for stroke in strokes:
+        points = stroke.points
+        curves = stroke.curves
+        curve_count = 0 if curves is None else len(curves)
+        if stroke.widths is not None:
+            width_chunks.append((offset, stroke.widths))
+        rows.append((
+            colors.setdefault(_color_name(stroke.color), len(colors)), stroke.width,
+            stroke.min_x, stroke.min_y, stroke.max_x, stroke.max_y,
+            offset, len(points), curve_count,
+        ))
+        chunks.append(points)
+        if curves is not None:
+            chunks.append(curves)
+        offset += len(points) + curve_count
+
+    table = np.array(rows, dtype=STROKE_DTYPE)
+    coords = np.concatenate(chunks).astype("<f4") if chunks else np.empty((0, 2), dtype="<f4")
+
+    color_table = bytearray()
+    for name in colors:
+        encoded = name.encode("utf-8")
+        color_table += struct.pack("<H", len(encoded)) + encoded
+
+    flags = 0
+    if ids is not None:
+        flags |= FLAG_IDS
+        ids = np.asarray(ids, dtype="<u8")
+    widths = None
+    if width_chunks:
+        flags |= FLAG_WIDTHS
+        widths = np.full(len(coords), np.nan, dtype="<f4")
+        for start, chunk in width_chunks:
+            widths[start:start + len(chunk)] = chunk
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(strokes), len(colors), coords.size, generation))
+        f.write(color_table)
+        position = HEADER.size + len(color_table)
+        f.write(b"\0" * (_align(position, 8) - position))
+        f.write(table.tobytes())
+        position = _align(position, 8) + table.nbytes
+        if ids is not None:
+            f.write(ids.tobytes())
+            position += ids.nbytes
+        f.write(b"\0" * (_align(position, 4) - position))
+        f.write(coords.tobytes())
+        if widths is not None:
+            f.write(widths.tobytes())
+    os.replace(tmp_path, path)
+
+
+# path의 노트를 메모리 맵으로 열어 획 목록 반환
+# 각 획은 경계 상자를 표에서 바로 받으므로 점을 읽지 않고도 공간 인덱스에 넣을 수 있음
+def load_notebook(path):
+    return load_notebook_snapshot(path)[0]
+
+
+# load_notebook과 같지만 (획 목록, 획 ID 목록 또는 None, 세대 번호) 반환
+def load_notebook_snapshot(path):
+    if os.path.getsize(path) < HEADER.size: # 빈 파일은 메모리 맵으로 열 수도 없음
+        raise NotebookFormatError(f"노트 파일이 너무 짧음: {path}")
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, version, flags, stroke_count, color_count, coord_count, generation = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise NotebookFormatError(f"노트 파일 형식이 아님: {path}")
+    if version != VERSION:
+        raise NotebookFormatError(f"지원하지 않는 노트 파일 버전: {version}")
+    if coord_count % 2:
+        raise NotebookFormatError(f"노트 파일 좌표 수가 홀수임: {path}")
+
+    colors = []
+    position = HEADER.size
+    try:
+        for _ in range(color_count):
+            (length,) = struct.unpack_from("<H", data, position)
+            position += 2
+            colors.append(bytes(data[position:position + length]).decode("utf-8"))
+            position += length
+    except (struct.error, UnicodeDecodeError) as ex:
+        raise NotebookFormatError(f"노트 파일 색상 표가 손상됨: {path}") from ex
+
+    position = _align(position, 8)
+    table_end = position + stroke_count * STROKE_DTYPE.itemsize
+    ids_end = table_end + (stroke_count * 8 if flags & FLAG_IDS else 0)
+    coords_start = _align(ids_end, 4)
+    widths_end = coords_start + coord_count * 4 + (coord_count // 2 * 4 if flags & FLAG_WIDTHS else 0)
+    if widths_end > len(data):
+        raise NotebookFormatError(f"노트 파일이 잘렸음: {path}")
+    table = data[position:table_end].view(STROKE_DTYPE)
+    ids = data[table_end:ids_end].view("<u8").tolist() if flags & FLAG_IDS else None
+    coords = data[coords_start:coords_start + coord_count * 4].view("<f4").reshape(-1, 2)
+    widths = data[coords_start + coord_count * 4:widths_end].view("<f4") if flags & FLAG_WIDTHS else None
+    # 획 표가 가리키는 구간과 색상이 파일 안에 있는지 한 번에 확인 (손상된 파일이 잘린 뷰나 IndexError로 이어지지 않도록)
+    ends = table["offset"] + table["count"] + table["curve_count"]
+    if stroke_count and (ends.max() > coord_count // 2 or table["color"].max() >= len(colors)):
+        raise NotebookFormatError(f"노트 파일 획 표가 손상됨: {path}")
+
+    strokes = []
+    for row in table.tolist(): # 한 번에 파이썬 값으로 변환 (행마다 numpy 스칼라를 만들지 않도록)
+        color, width, min_x, min_y, max_x, max_y, offset, count, curve_count = row
+        points = coords[offset:offset + count]
+        curves = coords[offset + count:offset + count + curve_count] if curve_count else None
+        stroke_widths = None
+        if widths is not None and count and not np.isnan(widths[offset]):
+            stroke_widths = widths[offset:offset + count]
+        strokes.append(Stroke.from_buffer(
+            colors[color], width, points, curves, (min_x, min_y, max_x, max_y), stroke_widths,
+        ))
+    return strokes, ids, generation
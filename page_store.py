@@ -0,0 +1,157 @@
+import mmap
+import tempfile
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+
+# 획의 점 데이터를 메모리 예산 안에서만 메모리에 두고 나머지는 디스크로 내보내는 페이지 저장소
+# 메모리에 올라 있는 점 데이터(Stroke.resident_bytes)를 최근에 쓴 순서(LRU)로 추적하다가
+# 합이 예산을 넘으면 오래 쓰이지 않은 획부터 LOW_WATER 비율 아래로 내려갈 때까지 골라
+# 그 점, 제어점, 점 두께를 임시 페이지 파일 끝에 한 번에 쓰고, 각 획의 버퍼를 그 영역의 읽기 전용 메모리 맵 뷰로 바꿈
+# 내보낸 획에는 경계 상자 같은 메타데이터만 메모리에 남고, 충돌 검사나 렌더링, 변환 적용이 점을 읽으면
+# 운영체제가 해당 페이지를 파일에서 다시 올림 (점을 바꾸는 시점에는 Stroke가 버퍼를 메모리로 복사하므로 다시 추적됨)
+# 한 번 내보낼 때마다 메모리 맵 하나를 만들며, 한 번에 예산의 (1 - LOW_WATER) 정도를 모아서 내보내므로 매핑 수는 많지 않음
+# 페이지 파일에는 덧붙이기만 하고, 획이 없어지거나 (실행 취소 기록에서도 사라져 해제됨) 점이 바뀌어 메모리로 올라오면
+# 그 영역은 죽은 영역이 됨. 내보낼 때 죽은 영역이 COMPACT_MIN_BYTES와 살아 있는 영역 크기를 모두 넘으면
+# 살아 있는 획들을 새로 내보낼 획과 함께 새 페이지 파일에 옮겨 쓰고 이전 파일을 닫음 (압축)
+# 이전 파일의 뷰를 아직 들고 있는 곳이 있어도 매핑이 남아 있는 동안은 계속 읽을 수 있고, 매핑이 모두 풀리면 운영체제가 공간을 회수함
+# 페이지 파일은 저장소를 닫으면 삭제됨
+class PageStore:
+    LOW_WATER = 0.75 # 한 번 내보낼 때 예산의 이 비율까지 줄임
+    COMPACT_MIN_BYTES = 16 * 1024 * 1024 # 죽은 영역이 이보다 작으면 압축하지 않음
+
+    # budget: 메모리에 둘 점 데이터의 최대 크기(바이트)
+    # directory: 페이지 파일을 만들 디렉터리 (None이면 시스템 임시 디렉터리)
+    def __init__(self, budget, directory=None):
+        self.budget = budget
+        self.directory = directory
+        self.resident_bytes = 0 # 추적 중인 획들의 메모리에 올라 있는 점 데이터 크기 합
+        self.paged_bytes = 0 # 지금 페이지 파일의 크기 (죽은 영역 포함)
+        self.evictions = 0 # 디스크로 내보낸 획 수
+        self.compactions = 0 # 페이지 파일을 압축한 횟수
+        self._resident = OrderedDict() # 획 -> 메모리에 올라 있는 크기 (오래 쓰이지 않은 획이 앞)
+        self._threshold = budget # resident_bytes가 이 값을 넘으면 내보냄
+        self._file = None # 페이지 파일 (처음 내보낼 때 만들어짐)
+        self._paged = weakref.WeakKeyDictionary() # 내보낸 획 -> (그 획의 영역을 담은 mmap, 영역 크기)
+
+    def __contains__(self, stroke):
+        return stroke in self._resident
+
+    # 획을 가장 최근에 쓴 것으로 표시하고 메모리 크기를 다시 셈 (문서에 추가, 충돌, 변환, 그리기 종료 때)
+    def touch(self, stroke):
+        size = stroke.resident_bytes
+        self.resident_bytes += size - self._resident.pop(stroke, 0)
+        if size:
+            self._resident[stroke] = size
+
+    # 문서에서 제거된 획 (파일로 내보낸 영역은 그대로 둠)
+    def discard(self, stroke):
+        self.resident_bytes -= self._resident.pop(stroke, 0)
+
+    def clear(self):
+        self._resident.clear()
+        self.resident_bytes = 0
+        self._threshold = self.budget
+
+    # 예산을 넘었으면 pinned(보기 영역 근처, 그리는 중, 선택된 획)를 제외하고 오래 쓰이지 않은 획부터 내보냄
+    # 내보낸 획 수 반환
+    def evict(self, pinned=()):
+        if self.resident_bytes <= self._threshold:
+            return 0
+        target = int(self.budget * self.LOW_WATER)
+        victims = []
+        skipped = []
+        freed = 0
+        while self._resident and self.resident_bytes - freed > target:
+            stroke, size = self._resident.popitem(last=False)
+            if stroke in pinned:
+                skipped.append((stroke, size))
+                continue
+            victims.append(stroke)
+            freed += size
+        for stroke, size in skipped:
+            self._resident[stroke] = size # 고정된 획은 가장 최근에 쓴 것으로 되돌림
+        if victims:
+            self._write(victims)
+            self.resident_bytes -= freed
+            self.evictions += len(victims)
+        # 고정된 획만으로 예산을 넘으면 매 flush마다 다시 훑지 않도록, 예산의 일부만큼 더 늘어날 때까지 기다림
+        self._threshold = max(self.budget, self.resident_bytes + self.budget - target)
+        return len(victims)
+
+    # 배열이 가리키는 메모리 맵 (메모리에 있는 배열이면 None)
+    @staticmethod
+    def _mapping(array):
+        while array is not None and not isinstance(array, mmap.mmap):
+            array = getattr(array, "base", None)
+        return array
+
+    # 아직 내보낸 영역을 쓰고 있는 획들과 그 영역 크기의 합
+    def _live(self):
+        strokes = []
+        size = 0
+        for stroke, (mapping, nbytes) in list(self._paged.items()):
+            if self._mapping(stroke.buffers()[0]) is mapping:
+                strokes.append(stroke)
+                size += nbytes
+            else:
+                del self._paged[stroke] # 점이 바뀌어 메모리로 올라온 획
+        return strokes, size
+
+    # 획들의 점 데이터를 페이지 파일 끝에 한 번에 쓰고 버퍼를 파일 뷰로 교체
+    # 죽은 영역이 충분히 쌓였으면 살아 있는 획들과 함께 새 파일에 씀
+    def _write(self, strokes):
+        if self._file is not None:
+            live, live_bytes = self._live()
+            if self.paged_bytes - live_bytes > max(self.COMPACT_MIN_BYTES, live_bytes):
+                self._file.close()
+                self._file = None
+                self.paged_bytes = 0
+                self.compactions += 1
+                strokes = live + strokes
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="strokes-", suffix=".pages", dir=self.directory)
+        f = self._file
+        f.seek(0, 2)
+        start = f.tell()
+        size = 0
+        layout = [] # 획마다 (점 수, 제어점 수, 점 두께 여부)
+        # 획마다 따로 써서 한 번에 내보내는 양만큼의 사본을 만들지 않음 (압축할 때는 이전 파일의 영역을 여기서 읽어 옴)
+        for stroke in strokes:
+            points, curves, widths = stroke.buffers()
+            for array in (points, curves, widths):
+                if array is not None:
+                    data = np.ascontiguousarray(array, dtype=np.float64)
+                    f.write(data.data)
+                    size += data.size
+            layout.append((len(points), 0 if curves is None else len(curves), widths is not None))
+        f.flush()
+        pages = np.memmap(f, dtype=np.float64, mode="r", offset=start, shape=(size,))
+        self.paged_bytes += pages.nbytes
+        mapping = self._mapping(pages)
+
+        position = 0
+        for stroke, (count, curve_count, has_widths) in zip(strokes, layout):
+            begin = position
+            points = pages[position:position + count * 2].reshape(-1, 2)
+            position += count * 2
+            curves = None
+            if curve_count:
+                curves = pages[position:position + curve_count * 2].reshape(-1, 2)
+                position += curve_count * 2
+            widths = None
+            if has_widths:
+                widths = pages[position:position + count]
+                position += count
+            stroke.swap_buffers(points, curves, widths)
+            self._paged[stroke] = (mapping, (position - begin) * pages.itemsize)
+
+    # 추적을 멈추고 페이지 파일을 닫음 (이미 내보낸 획의 뷰는 매핑이 남아 있는 동안 계속 읽을 수 있음)
+    def close(self):
+        self.clear()
+        self._paged.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
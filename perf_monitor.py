@@ -0,0 +1,152 @@
+import functools
+import json
+import math
+import threading
+import time
+
+
+# 로그 눈금 히스토그램 (한 옥타브를 BUCKETS_PER_OCTAVE개 구간으로 나눔, 구간 폭은 약 19%)
+# 값을 하나씩 저장하지 않으므로 기록이 오래 이어져도 메모리가 늘지 않음
+class Histogram:
+    BUCKETS_PER_OCTAVE = 4
+
+    def __init__(self):
+        self.buckets = {} # 구간 번호 -> 개수
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        bucket = int(math.log2(value) * self.BUCKETS_PER_OCTAVE) if value >= 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    # 백분위 값 (해당 구간의 위쪽 경계, 최댓값을 넘지 않음)
+    def percentile(self, q):
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    # scale: 보고할 단위로 바꾸는 배율 (나노초 -> 밀리초면 1e-6)
+    def summary(self, scale=1.0):
+        return {
+            "count": self.count,
+            "p50": round(self.percentile(50) * scale, 4),
+            "p99": round(self.percentile(99) * scale, 4),
+            "mean": round(self.total / self.count * scale, 4) if self.count else 0,
+            "max": round(self.max * scale, 4),
+        }
+
+
+# 핸들러별 지연 시간 계측
+# timed()로 감싼 함수는 꺼져 있을 때 enabled 확인 한 번만 더 하고 원래 함수를 호출함
+# 켜져 있으면 호출마다 지연 시간을 히스토그램에 넣고, interval마다 스냅숏을 만들어
+# dump_path에 JSON 한 줄씩 덧붙이고 on_report 콜백(화면 오버레이 등)에 넘김
+# lock: 백그라운드 스레드가 게이지를 읽고 on_report를 호출하는 동안 잡을 lock (핸들러와 같은 lock)
+class PerfMonitor:
+    def __init__(self, interval=1.0, dump_path=None, lock=None):
+        self.enabled = False
+        self.interval = interval # 스냅숏 주기(초)
+        self.dump_path = dump_path # 스냅숏을 덧붙일 파일 (None이면 기록하지 않음)
+        self._latencies = {} # 이름 -> 지연 시간(ns) Histogram
+        self._values = {} # 이름 -> 값 Histogram (업데이트당 전송량 등)
+        self._gauges = {} # 이름 -> 현재 값을 돌려주는 함수 (스냅숏 때만 호출)
+        self._window_counts = {} # 이름 -> 직전 스냅숏 때의 호출 수
+        self._window_start = 0.0
+        self._on_report = None
+        self._stop = None # 실행 중인 스냅숏 스레드를 멈추는 Event
+        self.lock = lock if lock is not None else threading.RLock()
+
+    def _histogram(self, name):
+        histogram = self._latencies.get(name)
+        if histogram is None:
+            histogram = self._latencies[name] = Histogram()
+        return histogram
+
+    # 함수의 지연 시간을 name으로 기록하는 데코레이터
+    def timed(self, name):
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._histogram(name).add(time.perf_counter_ns() - start)
+            return wrapper
+        return decorate
+
+    # 지연 시간이 아닌 값 기록 (켜져 있을 때만)
+    def observe(self, name, value):
+        if not self.enabled:
+            return
+        histogram = self._values.get(name)
+        if histogram is None:
+            histogram = self._values[name] = Histogram()
+        histogram.add(value)
+
+    def gauge(self, name, fn):
+        self._gauges[name] = fn
+
+    # 계측 시작 (이전 기록은 지움). on_report(snapshot)은 백그라운드 스레드에서 호출됨
+    def start(self, on_report=None):
+        self.stop()
+        self._latencies.clear()
+        self._values.clear()
+        self._window_counts.clear()
+        self._window_start = time.monotonic()
+        self._on_report = on_report
+        self.enabled = True
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop,), name="perf-monitor", daemon=True).start()
+
+    # 계측 중지 (lock을 잡은 핸들러에서도 부를 수 있도록 스레드가 끝나기를 기다리지 않음)
+    def stop(self):
+        self.enabled = False
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    # 시작 이후의 지연 시간 분포, 직전 스냅숏 이후의 초당 호출 수, 현재 게이지 값
+    def snapshot(self):
+        now = time.monotonic()
+        elapsed = max(now - self._window_start, 1e-9)
+        handlers = {}
+        for name, histogram in list(self._latencies.items()):
+            stats = histogram.summary(1e-6) # 밀리초
+            stats["per_sec"] = round((histogram.count - self._window_counts.get(name, 0)) / elapsed, 1)
+            self._window_counts[name] = histogram.count
+            handlers[name] = stats
+        self._window_start = now
+        return {
+            "time": round(time.time(), 3),
+            "handlers_ms": handlers,
+            "values": {name: histogram.summary() for name, histogram in list(self._values.items())},
+            "gauges": {name: fn() for name, fn in self._gauges.items()},
+        }
+
+    def _run(self, stop):
+        while not stop.wait(self.interval):
+            with self.lock:
+                if stop.is_set():
+                    break
+                snapshot = self.snapshot()
+                if self._on_report is not None:
+                    self._on_report(snapshot)
+            if self.dump_path is not None:
+                try:
+                    with open(self.dump_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+                except OSError:
+                    pass # 기록 실패로 앱이 멈추지 않도록 무시
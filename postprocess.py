@@ -0,0 +1,110 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from curve_fit import DENSIFY_SPACING
+from simplify import simplify_points
+from stroke import fit_stroke_curves
+
+
+# 끝난 획 하나의 후처리 단계: RDP 단순화 후 (점마다 두께가 없으면) 베지어 곡선 근사
+# 획이 아니라 점 배열의 스냅숏만 받는 순수 함수이므로 어느 스레드에서 실행해도 됨
+# (단순화된 점, 제어점 또는 None, 단순화된 점 두께 또는 None, 제거된 점 수) 반환
+def process_stroke(points, widths, tolerance, curve_error, curve_spacing):
+    points, widths, removed = simplify_points(points, widths, tolerance)
+    curves = None
+    if curve_error > 0 and widths is None:
+        curves = fit_stroke_curves(points, curve_error, curve_spacing)
+    return points, curves, widths, removed
+
+
+# 읽기 전용 복사본 (작업자 스레드가 읽는 동안 UI 쪽에서 획을 바꿔도 영향이 없도록)
+def _snapshot(array):
+    if array is None:
+        return None
+    array = np.array(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+# 그리기가 끝난 획의 후처리를 작업자 스레드 풀에서 실행하는 파이프라인
+# 핸들러는 획의 점을 복사한 스냅숏으로 작업을 제출하기만 하고 바로 돌아가므로 다음 제스처가 막히지 않음
+# 결과는 UI 쪽(엔진 flush, 핸들러와 같은 lock)에서 take_ready()로 꺼내 획에 한 번에 적용하며,
+# 획 순서대로 저널과 공유 문서에 기록되도록 제출한 순서대로만 꺼냄
+# 적용 전에 획이 지워지거나 이동/크기 조정되면 cancel()로 작업을 취소하고 결과를 버림
+# workers가 0이면 제출할 때 그 자리에서 실행함 (제스처 재생처럼 결과가 항상 같아야 할 때)
+class StrokePipeline:
+    def __init__(self, workers=2):
+        self.workers = workers
+        self.on_ready = None # 작업 하나가 끝날 때마다 작업자 스레드에서 호출 (캔버스 업데이트 예약 등)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="stroke-post") if workers else None
+        self._jobs = {} # 획 -> 아직 적용되지 않은 작업의 Future (제출한 순서)
+        self.completed = 0 # 결과를 적용한 작업 수
+        self.cancelled = 0 # 적용 전에 취소된 작업 수
+        self.error = None # 작업에서 마지막으로 발생한 오류
+
+    def __contains__(self, stroke):
+        return stroke in self._jobs
+
+    @property
+    def pending(self):
+        return len(self._jobs)
+
+    # 획의 후처리 작업 제출 (tolerance: RDP 허용 오차, curve_error: 곡선 근사 허용 오차, 0이면 근사하지 않음,
+    # curve_spacing: 곡선 근사 오차를 잴 점 간격. 모두 월드 좌표 단위이므로 제출하는 쪽에서 보기 배율을 반영해서 넘김)
+    def submit(self, stroke, tolerance, curve_error, curve_spacing=DENSIFY_SPACING):
+        args = (_snapshot(stroke.points), _snapshot(stroke.widths), tolerance, curve_error, curve_spacing)
+        if self._executor is None:
+            future = Future()
+            future.set_result(process_stroke(*args))
+            self._jobs[stroke] = future
+            return
+        future = self._executor.submit(process_stroke, *args)
+        self._jobs[stroke] = future
+        future.add_done_callback(self._done)
+
+    def _done(self, future):
+        if not future.cancelled() and self.on_ready is not None:
+            self.on_ready()
+
+    # 획의 작업 취소 (아직 적용되지 않은 작업이 있었으면 True)
+    def cancel(self, stroke):
+        future = self._jobs.pop(stroke, None)
+        if future is None:
+            return False
+        future.cancel() # 이미 실행 중이면 끝까지 돌지만 결과는 쓰이지 않음
+        self.cancelled += 1
+        return True
+
+    def cancel_all(self):
+        for stroke in list(self._jobs):
+            self.cancel(stroke)
+
+    # 끝난 작업의 (획, 결과) 목록을 제출한 순서대로 꺼냄 (앞선 작업이 아직 실행 중이면 그 뒤는 다음 번에)
+    # 작업이 실패했으면 결과 자리에 None (후처리 없이 확정)
+    def take_ready(self):
+        ready = []
+        while self._jobs:
+            stroke, future = next(iter(self._jobs.items()))
+            if not future.done():
+                break
+            del self._jobs[stroke]
+            error = future.exception()
+            if error is not None:
+                self.error = error
+                ready.append((stroke, None))
+            else:
+                ready.append((stroke, future.result()))
+            self.completed += 1
+        return ready
+
+    # 제출된 작업이 모두 끝날 때까지 기다림 (세션을 닫기 전에 남은 결과를 적용할 때)
+    def wait(self, timeout=None):
+        wait(list(self._jobs.values()), timeout)
+
+    # 남은 작업을 취소하고 작업자 스레드 종료 (기다리지 않음)
+    def close(self):
+        self.on_ready = None
+        self.cancel_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,61 @@
+import math
+
+
+# 속도 기반 압력 감지 (느릴수록 두껍게, 빠를수록 얇게)
+# 포인터 이동 거리와 시간 간격을 최근 WINDOW개 샘플의 링 버퍼에 넣고 구간 합으로 평균 속도를 구하므로,
+# 이벤트 간격이 들쭉날쭉해도 두께가 샘플마다 튀지 않으며 샘플 하나당 비용은 상수임
+# 좌표는 화면 px, 시간은 초 단위
+class PressureFilter:
+    WINDOW = 6 # 평균 속도를 구할 최근 샘플 수
+
+    def __init__(self, min_speed=50.0, max_speed=500.0, min_width=1.0, window=WINDOW):
+        self.min_speed = min_speed # 이 속도 이하이면 가장 두꺼운 선
+        self.max_speed = max_speed # 이 속도 이상이면 가장 얇은 선
+        self.min_width = min_width
+        self.max_width = min_width
+        self._distances = [0.0] * window
+        self._intervals = [0.0] * window
+        self._index = 0 # 다음 샘플을 넣을 링 버퍼 위치
+        self._distance_sum = 0.0
+        self._interval_sum = 0.0
+        self._x = None # 직전 샘플
+        self._y = None
+        self._time = None
+        self.width = min_width # 마지막으로 계산한 두께
+
+    # 새 획 시작. 멈춘 상태에서 시작하므로 첫 점은 가장 두꺼운 선
+    def begin(self, x, y, time, max_width):
+        self.max_width = max(max_width, self.min_width)
+        window = len(self._distances)
+        self._distances = [0.0] * window
+        self._intervals = [0.0] * window
+        self._index = 0
+        self._distance_sum = 0.0
+        self._interval_sum = 0.0
+        self._x = x
+        self._y = y
+        self._time = time
+        self.width = self.max_width
+        return self.width
+
+    # 샘플 하나를 넣고 평활화한 속도에 해당하는 두께 반환
+    def sample(self, x, y, time):
+        distance = math.hypot(x - self._x, y - self._y)
+        interval = max(time - self._time, 0.0)
+        self._x = x
+        self._y = y
+        self._time = time
+
+        i = self._index
+        self._distance_sum += distance - self._distances[i]
+        self._interval_sum += interval - self._intervals[i]
+        self._distances[i] = distance
+        self._intervals[i] = interval
+        self._index = (i + 1) % len(self._distances)
+
+        if self._interval_sum > 1e-9: # 같은 시각에 몰려 온 샘플뿐이면 직전 두께 유지
+            speed = max(self._distance_sum, 0.0) / self._interval_sum
+            normalized = (speed - self.min_speed) / (self.max_speed - self.min_speed)
+            normalized = max(0.0, min(1.0, normalized))
+            self.width = self.max_width - normalized * (self.max_width - self.min_width)
+        return self.width
@@ -0,0 +1,658 @@
+import json
+import math
+
+import flet as ft
+import numpy as np
+from flet import Paint, StrokeCap, StrokeJoin
+from flet.canvas import Canvas, Path
+from flet.core.embed_json_encoder import EmbedJsonEncoder
+
+from stroke import SELECTED_WIDTH_BONUS
+
+
+# 페이지 전체 업데이트(page.update) 때 획 도형들을 훑지 않도록 분리된(isolated) 캔버스
+# 도형 목록이 바뀌면 렌더러가 canvas.update()를 직접 호출함
+class StrokeCanvas(Canvas):
+    def is_isolated(self):
+        return True
+
+
+# 캔버스를 감싸 보기 영역 변환만 받는 컨테이너
+# 이동/확대 제스처 중에는 도형을 다시 만들지 않고 이 컨테이너의 scale/offset만 바꿔서 현재 보기 영역을 보여줌
+# 캔버스가 분리된 컨트롤이므로 이 컨테이너를 업데이트해도 도형은 훑거나 다시 직렬화하지 않음
+class ViewLayer(ft.Container):
+    def __init__(self, canvas=None, **kwargs):
+        super().__init__(canvas, **kwargs)
+        self.transform = None # 적용된 (scale, dx, dy, width, height), 아직 적용하지 않았으면 None
+
+    # 도형의 화면 좌표 p가 p * scale + (dx, dy)에 보이도록 함 (width, height: 캔버스 크기)
+    # 크기 변환은 왼쪽 위 모서리 기준이고, offset은 컨트롤 크기에 대한 비율이므로 px를 크기로 나눠서 넣음
+    def set_transform(self, scale, dx, dy, width, height):
+        self.transform = (scale, dx, dy, width, height)
+        self.scale = ft.Scale(scale, alignment=ft.alignment.top_left)
+        self.offset = ft.Offset(dx / width if width else 0.0, dy / height if height else 0.0)
+
+
+# 색상과 화면 두께가 같은 Path들이 함께 쓰는 공유 스타일 (flyweight)
+# Paint 객체와 그 JSON을 스타일마다 한 번만 만들고 Path는 참조만 가지므로, 도형 수와 관계없이 Paint는 (색상, 두께) 조합 수만큼만 있음
+# 공유되므로 만든 뒤에는 바꾸지 않으며, 선택 하이라이트나 배율 변화는 Path의 스타일 참조를 다른 스타일로 바꿔서 적용함
+class StrokeStyle:
+    __slots__ = ("color", "width", "paint", "json")
+
+    def __init__(self, color, width):
+        self.color = color
+        self.width = width
+        self.paint = Paint(
+            color=color,
+            stroke_width=width,
+            style=ft.PaintingStyle.STROKE,
+            stroke_cap=StrokeCap.ROUND,
+            stroke_join=StrokeJoin.ROUND,
+        )
+        self.json = json.dumps(self.paint, cls=EmbedJsonEncoder, separators=(",", ":"))
+
+
+STYLE_CACHE_SIZE = 4096 # 이보다 많은 스타일이 쌓이면 (여러 배율을 거치며) 캐시를 비움, 쓰고 있는 Path는 참조를 그대로 가짐
+_styles = {} # (색상, 화면 두께) -> StrokeStyle (모든 세션이 함께 씀)
+
+
+# (color, width)의 공유 스타일
+def stroke_style(color, width):
+    key = (color, width)
+    style = _styles.get(key)
+    if style is None:
+        if len(_styles) >= STYLE_CACHE_SIZE:
+            _styles.clear()
+        style = _styles[key] = StrokeStyle(color, width)
+    return style
+
+
+# 바뀐 속성만 다시 직렬화하는 Path
+# 기본 Path는 update()가 호출될 때마다 모든 요소를 JSON으로 다시 만들기 때문에
+# 캔버스 전체를 업데이트하면 전체 점 개수에 비례하는 비용이 듦
+# 또한 직렬화가 끝난 Path 요소 객체는 버리고 JSON 문자열만 유지하여 점 좌표가 중복 보관되지 않도록 함
+# Paint는 공유 스타일(StrokeStyle)의 것을 쓰며 JSON도 스타일에 만들어 둔 것을 그대로 보냄
+# owner가 주어지면 새로 직렬화한 속성 크기를 owner.bytes_serialized에 더함 (바뀐 속성은 통째로 전송됨)
+# 세션마다 렌더러가 따로 세도록 전역 합계가 아니라 Path를 만든 렌더러에 기록함
+class StrokePath(Path):
+    def __init__(self, elements=None, style=None, owner=None):
+        super().__init__(elements, style.paint if style is not None else None)
+        self.style = style
+        self.owner = owner
+        self.elements_dirty = True
+        self.paint_dirty = True
+        self._appended = [] # 마지막 직렬화 이후 끝에 덧붙여진 요소
+
+    # 다른 공유 스타일로 바꿈 (바뀌었으면 True, 다음 업데이트 때 Paint가 전송됨)
+    def set_style(self, style):
+        if style is self.style:
+            return False
+        self.style = style
+        self.paint = style.paint
+        self.paint_dirty = True
+        return True
+
+    # 모든 요소 교체
+    def set_elements(self, elements):
+        self.elements = elements
+        self._appended = []
+        self.elements_dirty = True
+
+    # 끝에 요소 추가 (이미 직렬화된 부분은 다시 만들지 않음)
+    def append_elements(self, elements):
+        self._appended.extend(elements)
+
+    def _count(self, size):
+        if self.owner is not None:
+            self.owner.bytes_serialized += size
+
+    def before_update(self):
+        # Path.before_update는 건너뛰고 상위 클래스의 훅만 호출
+        super(Path, self).before_update()
+        if self.elements_dirty:
+            self._set_attr_json("elements", self.elements)
+            self.elements = []
+            self.elements_dirty = False
+            self._count(len(self._get_attr("elements") or ""))
+        if self._appended:
+            head = self._get_attr("elements") or "[]"
+            tail = self._convert_attr_json(self._appended)
+            elements = tail if head == "[]" else head[:-1] + "," + tail[1:]
+            self._set_attr("elements", elements)
+            self._appended = []
+            self._count(len(elements))
+        if self.paint_dirty:
+            paint = self.style.json if self.style is not None else None
+            if self._get_attr("paint") != paint:
+                self._set_attr("paint", paint)
+                self._count(len(paint or ""))
+            self.paint_dirty = False
+
+
+# 화면 좌표를 quantum(px) 간격의 격자로 반올림 (0이면 그대로)
+# 좌표는 JSON 숫자로 전송되므로 0.25 px 격자이면 "412.38129425048828" 대신 "412.5"처럼 짧아짐
+def quantize(points, quantum):
+    if not quantum:
+        return points
+    decimals = max(0, 1 - math.floor(math.log10(quantum))) # 0.1 같은 값도 부동소수 오차 없이 짧게 출력되도록
+    return np.round(np.round(points / quantum) * quantum, decimals)
+
+
+# 월드 좌표를 캔버스로 보낼 화면 좌표로 (viewport가 없으면 월드 좌표 그대로, quantum은 quantize 참고)
+def screen_points(points, viewport=None, quantum=0.0):
+    if viewport is not None:
+        points = viewport.to_screen(points)
+    return quantize(points, quantum)
+
+
+# 점 좌표 배열로부터 Flet Path 요소 생성
+# start가 0이 아니면 이전 점에 이어지는 LineTo 요소만 만듦
+# viewport가 주어지면 월드 좌표를 화면 좌표로 변환하여 만듦
+def build_path_elements(points, start=0, viewport=None, quantum=0.0):
+    coords = screen_points(points[start:], viewport, quantum).tolist()
+    if not coords:
+        return []
+    elements = []
+    if start == 0:
+        # 첫 점은 PathMoveTo
+        x, y = coords.pop(0)
+        elements.append(Path.MoveTo(x, y))
+    # 나머지 점들은 PathLineTo
+    elements.extend(Path.LineTo(x, y) for x, y in coords)
+    return elements
+
+
+# 베지어 제어점 배열 [p0, c1, c2, p1, ...]로부터 Flet Path 요소 생성
+def build_curve_elements(curves, viewport=None, quantum=0.0):
+    coords = screen_points(curves, viewport, quantum).tolist()
+    x, y = coords[0]
+    elements = [Path.MoveTo(x, y)]
+    for i in range(1, len(coords), 3):
+        (c1x, c1y), (c2x, c2y), (x, y) = coords[i:i + 3]
+        elements.append(Path.CubicTo(c1x, c1y, c2x, c2y, x, y))
+    return elements
+
+
+# 획 전체의 Path 요소 생성 (곡선 근사가 있으면 곡선 사용)
+# tolerance(화면 px)가 주어지면 현재 배율에서 그만큼의 오차 안에 드는 가장 거친 상세도의 점을 사용
+# (곡선 근사가 있으면 요소 수가 더 적은 쪽을 사용)
+def build_stroke_elements(stroke, viewport=None, tolerance=0.0, quantum=0.0):
+    curves = stroke.curves
+    if tolerance > 0:
+        points = stroke.lod_points(tolerance / (viewport.zoom if viewport is not None else 1.0))
+        if points is not None and (curves is None or len(points) < (len(curves) + 2) // 3):
+            return build_path_elements(points, viewport=viewport, quantum=quantum)
+    if curves is not None:
+        return build_curve_elements(curves, viewport, quantum)
+    return build_path_elements(stroke.points, viewport=viewport, quantum=quantum)
+
+
+# 획의 선택 상태에 맞는 공유 스타일 (하이라이트 효과)
+# zoom: 보기 배율 (획 두께는 월드 좌표 단위이므로 화면 두께는 배율만큼 커짐)
+# width: 획의 width 대신 쓸 두께 (점마다 두께가 다른 획의 두께 구간)
+def stroke_style_for(stroke, zoom=1.0, width=None):
+    if stroke.is_selected:
+        color = ft.Colors.BLUE_200 # 선택 시 강조 색상
+    else:
+        color = stroke.color # 기본 색상
+    if width is None:
+        width = stroke.display_width # 선택 시 약간 두껍게 (기본 width를 기준으로)
+    elif stroke.is_selected:
+        width += SELECTED_WIDTH_BONUS
+    return stroke_style(color, width * zoom)
+
+
+# 점마다 두께가 다른 획(압력 감지)을 두께 구간별 Path로 나누어 그리는 도형 묶음
+# 선분의 두께(양 끝점 두께의 평균)를 WIDTH_STEP 단위 구간으로 반올림하고, 같은 구간의 선분들을 같은 Path에 모음
+# (Path 하나는 Paint 두께가 하나뿐이므로 구간마다 Path가 필요하며, 구간이 이어지는 곳은 둥근 끝 모양이 겹쳐 이어짐)
+# 그리는 동안 새 선분은 그 구간의 Path 끝에만 덧붙으므로 획 전체의 두께를 바꾸어 다시 보내지 않으며,
+# 덧붙이는 Path가 MAX_SEGMENTS개의 선분을 넘으면 같은 구간의 새 Path를 시작하여 이벤트마다 다시 보내는 속성 크기를 제한함
+# 두께가 일정한 획도 그리는 동안에는 이 묶음으로 그림 (모든 선분이 획 두께를 뜻하는 구간 0에 들어감)
+class WidthBucketPaths:
+    WIDTH_STEP = 0.5 # 두께 구간 폭 (월드 좌표 단위)
+    MAX_SEGMENTS = 64 # 그리는 동안 Path 하나에 덧붙일 최대 선분 수
+
+    # owner: Path들의 직렬화 크기를 셀 렌더러 (StrokePath 참고)
+    def __init__(self, owner=None):
+        self.owner = owner
+        self.paths = [] # StrokePath 목록 (만들어진 순서)
+        self._buckets = {} # Path -> 두께 구간
+        self._open = {} # 두께 구간 -> [선분을 덧붙이고 있는 Path, 그 Path의 선분 수]
+        self._tail = None # 마지막 선분이 들어간 Path (다음 선분이 같은 Path로 가면 LineTo만 덧붙임)
+
+    # start번째 점부터의 선분마다의 두께 구간 (점이 하나면 그 점의 구간 하나)
+    # 두께가 일정한 획은 모두 구간 0 (획 두께), 점마다 두께가 있는 획의 구간은 1 이상
+    @classmethod
+    def _segment_buckets(cls, stroke, start=0):
+        widths = stroke.widths
+        if widths is None:
+            count = stroke.point_count - start
+            return np.zeros(count - 1 if count > 1 else count, dtype=np.int64)
+        widths = widths[start:]
+        if len(widths) > 1:
+            widths = (widths[:-1] + widths[1:]) / 2
+        return np.maximum(np.rint(widths / cls.WIDTH_STEP), 1).astype(np.int64)
+
+    # 두께 구간의 공유 스타일
+    def _bucket_style(self, bucket, stroke, zoom):
+        return stroke_style_for(stroke, zoom, bucket * self.WIDTH_STEP if bucket else None)
+
+    def _style(self, path, stroke, zoom):
+        path.set_style(self._bucket_style(self._buckets[path], stroke, zoom))
+
+    def _new_path(self, bucket, stroke, zoom):
+        path = StrokePath([], self._bucket_style(bucket, stroke, zoom), self.owner)
+        self._buckets[path] = bucket
+        self.paths.append(path)
+        return path
+
+    # 획 전체로 Path들을 다시 만듦 (이미 있는 Path는 순서대로 재사용). Path가 추가/제거되었으면 True
+    def rebuild(self, stroke, viewport=None, zoom=1.0, quantum=0.0):
+        coords = screen_points(stroke.points, viewport, quantum).tolist()
+        buckets = self._segment_buckets(stroke)
+        # 같은 구간이 이어지는 선분들 (run)의 시작과 끝 점 위치
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1)).tolist() if len(buckets) else []
+        ends = starts[1:] + [len(buckets)]
+        elements = {} # 두께 구간 -> [Path 요소 목록, 선분 수] (처음 나온 순서)
+        for start, end, bucket in zip(starts, ends, buckets[starts].tolist()):
+            entry = elements.setdefault(bucket, [[], 0])
+            entry[0].append(Path.MoveTo(*coords[start]))
+            entry[0].extend(Path.LineTo(x, y) for x, y in coords[start + 1:end + 1])
+            entry[1] += len(coords[start + 1:end + 1])
+
+        old_count = len(self.paths)
+        paths = self.paths[:len(elements)]
+        self.paths = []
+        self._buckets = {}
+        self._open = {}
+        for i, (bucket, (path_elements, segments)) in enumerate(elements.items()):
+            if i < len(paths):
+                path = paths[i]
+                self._buckets[path] = bucket
+                self.paths.append(path)
+                self._style(path, stroke, zoom)
+            else:
+                path = self._new_path(bucket, stroke, zoom)
+            path.set_elements(path_elements)
+            self._open[bucket] = [path, segments]
+        self._tail = self._open[buckets[-1].item()][0] if len(buckets) else None
+        return len(self.paths) != old_count
+
+    # start번째 점부터 새로 추가된 점들의 선분을 해당 구간 Path 끝에 덧붙임
+    # (바뀐 Path 목록, 새 Path가 추가되었는지 여부) 반환
+    def append(self, stroke, start, viewport=None, zoom=1.0, quantum=0.0):
+        coords = screen_points(stroke.points[start - 1:], viewport, quantum).tolist()
+        changed = {}
+        added = False
+        for i, bucket in enumerate(self._segment_buckets(stroke, start - 1).tolist()):
+            entry = self._open.get(bucket)
+            if entry is None or entry[1] >= self.MAX_SEGMENTS:
+                entry = self._open[bucket] = [self._new_path(bucket, stroke, zoom), 0]
+                added = True
+            path = entry[0]
+            if path is not self._tail:
+                path.append_elements([Path.MoveTo(*coords[i])]) # 다른 구간에서 넘어오면 새 sub-path 시작
+                self._tail = path
+            path.append_elements([Path.LineTo(*coords[i + 1])])
+            entry[1] += 1
+            changed[path] = None
+        return list(changed), added
+
+    # 선택 상태나 보기 배율에 맞게 모든 Path의 Paint 다시 적용
+    def restyle(self, stroke, zoom=1.0):
+        for path in self.paths:
+            self._style(path, stroke, zoom)
+
+
+# 같은 Paint(색상, 두께)로 그려지는 확정된 획들을 하나의 Path로 묶은 묶음
+# 각 획은 MoveTo로 시작하므로 한 Path 안에서 서로 이어지지 않음
+class StrokeBatch:
+    def __init__(self, key, owner=None):
+        self.key = key
+        self.strokes = {} # 획 -> 묶음에 반영된 점 개수 (삽입 순서 유지)
+        self.point_count = 0
+        self.path = StrokePath([], stroke_style(*key), owner)
+
+    def rebuild(self, viewport=None, tolerance=0.0, quantum=0.0):
+        elements = []
+        for stroke in self.strokes:
+            elements.extend(build_stroke_elements(stroke, viewport, tolerance, quantum))
+        self.path.set_elements(elements)
+        color, width = self.key
+        self.path.set_style(stroke_style(color, width * (viewport.zoom if viewport is not None else 1.0)))
+
+
+# 캔버스에 올라간 획들의 변경 사항을 추적하여 바뀐 도형만 클라이언트로 보내는 렌더 계층
+# 그리는 중인 획과 선택된 획은 각자 Path(단독 도형)로 그리고, 확정된 획들은 Paint별 묶음(StrokeBatch)으로 합쳐서
+# 캔버스의 도형 수를 획 수보다 훨씬 적게 유지함
+# Path 속성은 바뀌면 통째로 다시 전송되므로 확정된 획을 곧바로 묶음에 덧붙이지 않고,
+# 같은 Paint의 확정 획이 MERGE_POINTS/MERGE_STROKES만큼 쌓일 때까지 단독 도형으로 두었다가 새 묶음 하나로 한 번에 합침
+# 새 묶음이 바로 앞 묶음보다 크거나 같으면 BATCH_POINTS를 넘지 않는 한 앞 묶음에 합치므로 (이진 카운터처럼)
+# 묶음 크기가 두 배씩 커지고, Paint 하나의 묶음 수는 대략 점 개수 / BATCH_POINTS + 로그 개로 유지됨
+# (묶음 안 획을 지우거나 옮길 때 다시 보내는 양은 묶음 하나 크기인 BATCH_POINTS로 제한됨)
+# 묶음은 Paint 단위로 그려지므로 서로 다른 색이 겹친 부분의 위아래 순서는 보장하지 않음
+# 점마다 두께가 다른 획은 두께 구간별 Path 묶음(WidthBucketPaths)으로 그리며, 확정된 뒤에도 Paint별 묶음에 합치지 않음
+# 그리는 중인 획도 두께와 상관없이 WidthBucketPaths로 그려 새 선분을 짧은 Path에만 덧붙이고,
+# 두께가 일정한 획은 확정될 때 단독 Path 하나로 다시 만듦
+class CanvasRenderer:
+    MERGE_POINTS = 256 # 묶음 하나로 합칠 확정 획들의 점 개수 합
+    MERGE_STROKES = 8 # 묶음 하나로 합칠 확정 획 수
+    BATCH_POINTS = 1024 # 앞 묶음에 합쳐 키울 수 있는 묶음 하나의 최대 점 개수
+    LOD_TOLERANCE = 0.5 # 축소해서 볼 때 획을 단순화해도 되는 화면 오차(px), 0이면 항상 원본으로 그림
+
+    # quantum: 캔버스로 보내는 화면 좌표를 반올림할 격자 간격(px, 0이면 반올림하지 않음), quantize 참고
+    # layer: 캔버스를 감싼 ViewLayer (None이면 변환 없이 viewport 기준 좌표를 그대로 보여줌)
+    def __init__(self, canvas, viewport=None, quantum=0.0, layer=None):
+        self.canvas = canvas
+        self.viewport = viewport # 도형을 만드는 기준 보기 영역 (None이면 월드 좌표를 그대로 화면 좌표로 사용)
+        self.quantum = quantum
+        self.layer = layer
+        self._transform = None # 다음 flush 때 layer에 적용할 (scale, dx, dy), 바뀌지 않았으면 None
+        self._solo = {} # 획 -> 단독 StrokePath 또는 WidthBucketPaths (아직 만들어지지 않았으면 None, 다음 flush 때 생성)
+        self._sent_counts = {} # 단독 획 -> Path에 이미 반영된 점 개수
+        self._live = set() # 아직 그리는 중인 획
+        self._staged = {} # (색상, 두께) -> 묶음으로 합쳐지기를 기다리는 확정 단독 획 (순서 유지용 dict)
+        self._staged_points = {} # (색상, 두께) -> 대기 중인 획들의 점 개수 합
+        self._staged_key = {} # 대기 중인 획 -> (색상, 두께)
+        self._batches = {} # (색상, 두께) -> StrokeBatch 목록
+        self._stroke_batch = {} # 묶음에 들어간 획 -> StrokeBatch
+        self._dirty_batches = {} # 다음 flush 때 다시 만들 묶음 (순서 유지용 dict)
+        self._pending = {} # 획 -> [Path 요소 재생성 여부, 스타일 재적용 여부]
+        self._structure_changed = False # 도형이 추가/제거되었는지 여부
+        self.updates = 0 # 캔버스 업데이트를 보낸 횟수
+        self.bytes_serialized = 0 # 이 렌더러의 Path들이 새로 직렬화한 속성 크기의 합 (전송량 추정치, StrokePath가 더함)
+
+    def __contains__(self, stroke):
+        return stroke in self._solo or stroke in self._stroke_batch
+
+    # 캔버스에 올라가 있는 도형 수
+    @property
+    def shape_count(self):
+        solo = sum(len(path.paths) if isinstance(path, WidthBucketPaths) else 1 for path in self._solo.values())
+        return solo + sum(len(chunks) for chunks in self._batches.values())
+
+    # 획을 캔버스에 추가 (live=True이면 그리는 중인 획으로 취급하여 commit될 때까지 묶음에 넣지 않음)
+    def add(self, stroke, live=False):
+        if stroke in self:
+            return
+        self._add_solo(stroke)
+        if live:
+            self._live.add(stroke)
+        elif not stroke.is_selected:
+            self._stage(stroke)
+
+    # 그리기가 끝난 획을 묶음 대기 목록으로 옮김
+    def commit(self, stroke):
+        if stroke not in self._live:
+            return
+        self._live.discard(stroke)
+        if self._solo.get(stroke) is not None and not self._chunked(stroke):
+            self._solo[stroke] = None # 나뉘어 있던 Path들을 다음 flush 때 Path 하나로 다시 만듦
+            self._pending.pop(stroke, None)
+            self._structure_changed = True
+        if not stroke.is_selected:
+            self._stage(stroke)
+
+    # 획을 캔버스에서 제거
+    def remove(self, stroke):
+        self._live.discard(stroke)
+        self._pending.pop(stroke, None)
+        if stroke in self._solo:
+            self._unstage(stroke)
+            self._remove_solo(stroke)
+        else:
+            self._remove_from_batch(stroke)
+
+    @staticmethod
+    def _batch_key(stroke):
+        return (stroke.color, stroke.width)
+
+    # 획을 WidthBucketPaths로 그리는지 여부 (점마다 두께가 있거나 아직 그리는 중인 획)
+    def _chunked(self, stroke):
+        return stroke.widths is not None or stroke in self._live
+
+    def _add_solo(self, stroke):
+        self._solo[stroke] = None
+        self._structure_changed = True
+
+    def _remove_solo(self, stroke):
+        del self._solo[stroke]
+        self._sent_counts.pop(stroke, None)
+        self._structure_changed = True
+
+    # 확정된 단독 획을 대기 목록에 넣고, 충분히 쌓였으면 묶음으로 합침 (점마다 두께가 다른 획은 제외)
+    def _stage(self, stroke):
+        if stroke.widths is not None:
+            return
+        key = self._batch_key(stroke)
+        self._staged_key[stroke] = key
+        self._staged.setdefault(key, {})[stroke] = None
+        self._staged_points[key] = self._staged_points.get(key, 0) + stroke.point_count
+        if (self._staged_points[key] >= self.MERGE_POINTS
+                or len(self._staged[key]) >= self.MERGE_STROKES):
+            self._merge(key)
+
+    def _unstage(self, stroke):
+        key = self._staged_key.pop(stroke, None)
+        if key is None:
+            return
+        staged = self._staged[key]
+        del staged[stroke]
+        if staged:
+            self._staged_points[key] -= stroke.point_count
+        else:
+            del self._staged[key]
+            del self._staged_points[key]
+
+    # 대기 중인 획들을 새 묶음 하나로 합침
+    def _merge(self, key):
+        batch = StrokeBatch(key, self)
+        for stroke in self._staged.pop(key):
+            del self._staged_key[stroke]
+            flags = self._pending.get(stroke)
+            if flags is not None and not flags[1]:
+                del self._pending[stroke] # 묶음은 현재 점으로 새로 만들어지므로 남은 점 변경은 필요 없음
+            # 스타일 변경(선택, 두께)은 남겨 두어 flush 때 _flush_batched가 묶음에서 다시 꺼내게 함
+            self._remove_solo(stroke)
+            batch.strokes[stroke] = stroke.point_count
+            batch.point_count += stroke.point_count
+            self._stroke_batch[stroke] = batch
+        del self._staged_points[key]
+        chunks = self._batches.setdefault(key, [])
+        while (chunks and chunks[-1].point_count <= batch.point_count
+               and chunks[-1].point_count + batch.point_count <= self.BATCH_POINTS):
+            batch = self._fold(chunks.pop(), batch)
+        chunks.append(batch)
+        self._dirty_batches[batch] = None
+
+    # 묶음 newer의 획들을 앞 묶음 older 뒤에 붙여 하나로 합침 (같은 Paint이므로 겹친 부분의 순서는 상관없음)
+    def _fold(self, older, newer):
+        for stroke, count in newer.strokes.items():
+            older.strokes[stroke] = count
+            self._stroke_batch[stroke] = older
+        older.point_count += newer.point_count
+        self._dirty_batches.pop(newer, None)
+        self._structure_changed = True
+        return older
+
+    def _remove_from_batch(self, stroke):
+        batch = self._stroke_batch.pop(stroke, None)
+        if batch is None:
+            return
+        batch.point_count -= batch.strokes.pop(stroke)
+        if batch.strokes:
+            self._dirty_batches[batch] = None
+            return
+        # 빈 묶음은 캔버스에서 제거
+        chunks = self._batches[batch.key]
+        chunks.remove(batch)
+        if not chunks:
+            del self._batches[batch.key]
+        self._dirty_batches.pop(batch, None)
+        self._structure_changed = True
+
+    # 다음 flush 때 획을 다시 보내도록 표시
+    # rebuild: 점이 바뀌어 Path 요소를 다시 만들어야 함 (translate, scale 등)
+    # restyle: 선택 상태나 두께가 바뀌어 Paint를 다시 적용해야 함
+    # 둘 다 False이면 add_point로 새로 추가된 점만 Path 끝에 덧붙임
+    def invalidate(self, stroke, rebuild=False, restyle=False):
+        if stroke not in self:
+            return
+        flags = self._pending.get(stroke)
+        if flags is None:
+            self._pending[stroke] = [rebuild, restyle]
+        else:
+            flags[0] = flags[0] or rebuild
+            flags[1] = flags[1] or restyle
+
+    # 보기 영역이 바뀌어 올라간 모든 도형의 화면 좌표와 두께를 다시 만들어야 함을 표시
+    def invalidate_view(self):
+        for stroke in self._solo:
+            self._pending[stroke] = [True, True]
+        for chunks in self._batches.values():
+            for batch in chunks:
+                self._dirty_batches[batch] = None
+
+    # viewport 기준으로 만든 도형을 현재 보기 영역에 맞게 보여줄 변환 (Viewport.transform_to 참고), 다음 flush 때 layer에 반영
+    def set_transform(self, scale, dx, dy):
+        if self.layer is not None:
+            self._transform = (scale, dx, dy)
+
+    @property
+    def _zoom(self):
+        return self.viewport.zoom if self.viewport is not None else 1.0
+
+    # 단독 획의 변경 사항 반영. 선택이 풀리거나 Paint가 바뀐 확정 획은 묶음 대기 목록을 다시 정함
+    def _flush_solo(self, stroke, rebuild, restyle, changed):
+        if restyle and stroke not in self._live:
+            if stroke.is_selected:
+                self._unstage(stroke)
+            elif self._staged_key.get(stroke) != self._batch_key(stroke):
+                self._unstage(stroke)
+                self._stage(stroke)
+                if stroke not in self._solo: # 곧바로 묶음으로 합쳐짐
+                    return
+        path = self._solo[stroke]
+        if path is None: # 아직 만들어지지 않은 Path는 아래에서 현재 상태로 생성됨
+            return
+        if isinstance(path, WidthBucketPaths) != self._chunked(stroke):
+            # 점마다의 두께가 생기거나 없어진 획 (다른 세션에서 확정된 획 등)은 도형을 새로 만듦
+            self._solo[stroke] = None
+            self._structure_changed = True
+            return
+        if isinstance(path, WidthBucketPaths):
+            self._flush_variable(stroke, path, rebuild, restyle, changed)
+            return
+        if rebuild:
+            path.set_elements(build_stroke_elements(stroke, self.viewport, self.LOD_TOLERANCE, self.quantum))
+        elif stroke.point_count > self._sent_counts[stroke]:
+            path.append_elements(build_path_elements(stroke.points, self._sent_counts[stroke], self.viewport, self.quantum))
+        self._sent_counts[stroke] = stroke.point_count
+        if restyle:
+            path.set_style(stroke_style_for(stroke, self._zoom)) # 선택 하이라이트는 공유 스타일 참조만 바꿈
+        changed.append(path)
+
+    # WidthBucketPaths로 그리는 단독 획의 변경 사항 반영 (그리는 동안에는 덧붙여진 선분이 들어간 Path만 바뀜)
+    def _flush_variable(self, stroke, paths, rebuild, restyle, changed):
+        if rebuild:
+            if paths.rebuild(stroke, self.viewport, self._zoom, self.quantum):
+                self._structure_changed = True
+            changed.extend(paths.paths)
+        else:
+            if stroke.point_count > self._sent_counts[stroke]:
+                appended, added = paths.append(stroke, self._sent_counts[stroke], self.viewport, self._zoom, self.quantum)
+                if added:
+                    self._structure_changed = True
+                if not restyle:
+                    changed.extend(appended)
+            if restyle:
+                paths.restyle(stroke, self._zoom)
+                changed.extend(paths.paths)
+        self._sent_counts[stroke] = stroke.point_count
+
+    # 단독 획의 도형 생성 (flush 때 아직 만들어지지 않은 획)
+    def _new_solo(self, stroke):
+        if self._chunked(stroke):
+            paths = WidthBucketPaths(self)
+            paths.rebuild(stroke, self.viewport, self._zoom, self.quantum)
+            return paths
+        elements = build_stroke_elements(stroke, self.viewport, self.LOD_TOLERANCE, self.quantum)
+        return StrokePath(elements, stroke_style_for(stroke, self._zoom), self)
+
+    # 묶음 안 획의 변경 사항 반영. 선택되었거나 Paint가 바뀐 획은 묶음에서 꺼냄
+    def _flush_batched(self, stroke, rebuild, restyle):
+        batch = self._stroke_batch[stroke]
+        if restyle and (stroke.is_selected or self._batch_key(stroke) != batch.key):
+            self._remove_from_batch(stroke)
+            self._add_solo(stroke)
+            if not stroke.is_selected:
+                self._stage(stroke)
+        elif rebuild or stroke.point_count != batch.strokes[stroke]:
+            batch.point_count += stroke.point_count - batch.strokes[stroke]
+            batch.strokes[stroke] = stroke.point_count
+            self._dirty_batches[batch] = None
+
+    # 표시된 획과 묶음만 갱신하여 클라이언트로 전송
+    def flush(self):
+        changed = []
+        pending = self._pending
+        self._pending = {}
+        for stroke, (rebuild, restyle) in pending.items():
+            if stroke in self._solo:
+                self._flush_solo(stroke, rebuild, restyle, changed)
+            else:
+                self._flush_batched(stroke, rebuild, restyle)
+
+        for batch in self._dirty_batches:
+            batch.rebuild(self.viewport, self.LOD_TOLERANCE, self.quantum)
+            changed.append(batch.path)
+        self._dirty_batches.clear()
+
+        for stroke, path in self._solo.items():
+            if path is None:
+                self._solo[stroke] = self._new_solo(stroke)
+                self._sent_counts[stroke] = stroke.point_count
+
+        layer_changed = False
+        if self._transform is not None:
+            transform = self._transform + (self.viewport.width, self.viewport.height)
+            self._transform = None
+            if transform != self.layer.transform:
+                self.layer.set_transform(*transform)
+                layer_changed = True
+
+        if self._structure_changed:
+            # 도형 목록이 바뀐 경우에만 캔버스 전체를 업데이트 (바뀌지 않은 Path는 다시 직렬화되지 않음)
+            # 묶음이 아래, 단독 획이 위에 오도록 배치 (단독 획끼리는 추가된 순서)
+            self._structure_changed = False
+            shapes = [batch.path for chunks in self._batches.values() for batch in chunks]
+            for path in self._solo.values():
+                if isinstance(path, WidthBucketPaths):
+                    shapes.extend(path.paths)
+                else:
+                    shapes.append(path)
+            self.canvas.shapes[:] = shapes
+            self.canvas.update()
+            if layer_changed:
+                self.canvas.page.update(self.layer)
+        elif changed or layer_changed:
+            if layer_changed:
+                changed.append(self.layer) # 래퍼는 scale/offset만 직렬화됨
+            self.canvas.page.update(*changed)
+        else:
+            return
+        self.updates += 1
+
+    def clear(self):
+        self._solo.clear()
+        self._sent_counts.clear()
+        self._live.clear()
+        self._staged.clear()
+        self._staged_points.clear()
+        self._staged_key.clear()
+        self._batches.clear()
+        self._stroke_batch.clear()
+        self._dirty_batches.clear()
+        self._pending.clear()
+        self.canvas.shapes.clear()
+        self._structure_changed = True
@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+
+import flet as ft
+from flet.core.connection import Connection
+from flet.core.protocol import PageCommandsBatchResponsePayload
+
+import main as app_main
+from benchmark import summarize
+from gestures import EVENT_NAMES, MODE, MODES, PAN_END, PAN_START, PAN_UPDATE, RESIZE, TAP_DOWN, ZOOM, load_trace
+
+
+# 녹화한 제스처(gestures.fgt)를 앱의 핸들러에 그대로 다시 보내 핸들러별 시간을 재는 도구
+# 클라이언트 대신 ReplayConnection에 연결된 페이지로 main()을 실행하므로 핸들러, 엔진, 렌더 계층은 앱과 같은 코드가 실행됨
+# 기록 시작 시 저장된 문서와 보기 영역에서 시작하며, 자동 저장 저널은 임시 디렉터리에 기록됨
+#
+#   python replay.py gestures.fgt                # 최대한 빠르게 (이벤트마다 바로 캔버스에 반영하여 결과가 항상 같음)
+#   python replay.py gestures.fgt --realtime     # 기록된 시간 간격대로 (앱과 같은 주기로 업데이트를 모아서 보냄)
+#   python replay.py gestures.fgt --output replay.json
+
+
+# 클라이언트 대신 명령을 받아 크기만 세는 연결
+class ReplayConnection(Connection):
+    def __init__(self):
+        super().__init__()
+        self._ids = itertools.count(1)
+        self.bytes_sent = 0
+        self.batches = 0
+
+    def _size(self, commands):
+        size = 0
+        for command in commands:
+            size += sum(len(name) + len(value) for name, value in command.attrs.items())
+            size += sum(len(str(value)) for value in command.values)
+            size += self._size(command.commands)
+        return size
+
+    def send_commands(self, session_id, commands):
+        self.batches += 1
+        self.bytes_sent += self._size(commands)
+        # add 명령마다 새 컨트롤 ID 목록을 돌려줌
+        results = [
+            " ".join(f"_{next(self._ids)}" for _ in command.commands)
+            for command in commands if command.name == "add"
+        ]
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def send_command(self, session_id, command):
+        self.bytes_sent += self._size([command])
+        return types.SimpleNamespace(result="", error="")
+
+
+# 핸들러별 소요 시간과 그동안 보낸 데이터 크기 수집
+class Timings:
+    def __init__(self, connection):
+        self.connection = connection
+        self.samples = {} # 이름 -> [소요 시간(ns)]
+        self.bytes = {} # 이름 -> 보낸 바이트 수
+
+    def call(self, name, fn, *args):
+        bytes_before = self.connection.bytes_sent
+        start = time.perf_counter_ns()
+        result = fn(*args)
+        self.samples.setdefault(name, []).append(time.perf_counter_ns() - start)
+        self.bytes[name] = self.bytes.get(name, 0) + self.connection.bytes_sent - bytes_before
+        return result
+
+    def summary(self):
+        return {name: summarize(samples, self.bytes[name]) for name, samples in self.samples.items()}
+
+
+def replay(trace, realtime=False):
+    connection = ReplayConnection()
+    page = ft.Page(connection, "replay", asyncio.new_event_loop())
+    strokes = trace.load_strokes()
+    # 앱은 실행 디렉터리에 자동 저장 파일을 쓰므로 임시 디렉터리에서 실행
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            app = app_main.main(page) if realtime else app_main.main(page, update_rate_hz=0)
+            return _run(trace, app, connection, strokes, realtime)
+        finally:
+            os.chdir(cwd)
+
+
+def _run(trace, app, connection, strokes, realtime):
+    engine = app.engine
+    with app.scheduler.lock:
+        engine.load(strokes)
+        viewport = engine.viewport
+        viewport.zoom, viewport.offset_x, viewport.offset_y, viewport.width, viewport.height = trace.view
+        engine.settle_view()
+    app.set_mode(trace.mode)
+    app.scheduler.flush_now()
+
+    timings = Timings(connection)
+    # 핸들러 시간에는 그 안에서 일어난 flush가 포함되고, flush는 따로도 집계됨 (실시간 재생에서는 타이머 스레드의 flush 포함)
+    flush = engine.flush
+    engine.flush = lambda: timings.call("flush", flush)
+    bytes_before = connection.bytes_sent
+
+    handlers = {
+        PAN_START: app.pan_start,
+        PAN_UPDATE: app.pan_update,
+        PAN_END: app.pan_end,
+        TAP_DOWN: app.tap_down,
+    }
+    start = time.perf_counter()
+    for kind, at, x, y, value in trace.events:
+        if realtime:
+            delay = start + at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        name = EVENT_NAMES.get(kind)
+        if kind in handlers:
+            timings.call(name, handlers[kind], types.SimpleNamespace(local_x=x, local_y=y))
+        elif kind == MODE:
+            timings.call(name, app.set_mode, MODES[int(value)])
+        elif kind == ZOOM:
+            timings.call(name, app.zoom_view, value, x, y)
+        elif kind == RESIZE:
+            timings.call(name, app.resize, types.SimpleNamespace(width=x, height=y))
+    app.scheduler.flush_now()
+    elapsed = time.perf_counter() - start
+    engine.flush = flush
+    app.close()
+
+    return {
+        "events": len(trace.events),
+        "recorded_seconds": round(trace.duration, 3),
+        "replay_seconds": round(elapsed, 3),
+        "realtime": realtime,
+        "strokes": len(engine.strokes),
+        "shapes": engine.renderer.shape_count,
+        "bytes_sent": connection.bytes_sent - bytes_before,
+        "handlers": timings.summary(),
+        "flush": app.scheduler.stats.summary(), # 재생 시작 전 불러오기의 flush 포함
+        "simplify": engine.simplifier.stats.summary(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="녹화한 제스처 재생 및 핸들러별 시간 측정")
+    parser.add_argument("trace", help="제스처 기록 파일 (.fgt)")
+    parser.add_argument("--realtime", action="store_true", help="기록된 시간 간격대로 재생")
+    parser.add_argument("--output", help="결과 JSON 파일")
+    args = parser.parse_args(argv)
+
+    trace = load_trace(os.path.abspath(args.trace))
+    result = replay(trace, args.realtime)
+    print(f"이벤트 {result['events']}개 (기록 {result['recorded_seconds']:.2f}초, 재생 {result['replay_seconds']:.2f}초), "
+          f"획 {result['strokes']}개, 도형 {result['shapes']}개, 전송 {result['bytes_sent']} B")
+    for name, stats in result["handlers"].items():
+        print(f"  {name:<12} {stats['count']:6d}회  p50 {stats['p50_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms  "
+              f"최대 {stats['max_ms']:8.3f} ms  {stats['bytes_per_op']:10.0f} B/회")
+    flush = result["flush"]
+    print(f"flush {flush['flushes']}회, flush당 이벤트 평균 {flush['average_batch']:.1f} 최대 {flush['max_batch']} 마지막 {flush['last_batch']}")
+    simplify = result["simplify"]
+    print(f"단순화: 획 {simplify['strokes']}개, 입력 {simplify['input_points']}점 중 "
+          f"거리 필터 {simplify['removed_radial']}점, RDP {simplify['removed_rdp']}점 제거")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
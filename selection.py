@@ -0,0 +1,39 @@
+import numpy as np
+
+from simplify import rdp_keep_mask
+
+
+# 올가미/사각형 다중 선택을 위한 다각형 포함 판정
+
+# 점 배열 (N, 2)의 각 점이 다각형 (M, 2) 안에 있는지 (짝홀 규칙)
+# 다각형의 변마다 모든 점에 대해 한 번에 교차 여부를 계산하므로 파이썬 반복은 변 수(M)만큼만 일어남
+def points_in_polygon(points, polygon):
+    x = points[:, 0]
+    y = points[:, 1]
+    inside = np.zeros(len(points), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for (x0, y0), (x1, y1) in zip(polygon.tolist(), np.roll(polygon, 1, axis=0).tolist()):
+            if y0 == y1:
+                continue # 수평인 변은 반직선과 교차하지 않음
+            crosses = (y0 > y) != (y1 > y)
+            inside ^= crosses & (x < x0 + (y - y0) * ((x1 - x0) / (y1 - y0)))
+    return inside
+
+
+# 후보 획 중 점의 min_inside 비율 이상이 다각형 안에 있는 획들
+# 후보 획들의 점을 하나의 배열로 모아 한 번에 판정하고 획별 개수는 reduceat으로 셈
+# tolerance: 판정 전에 다각형(올가미 경로)을 이 오차로 단순화하여 변 수를 줄임
+def strokes_in_polygon(strokes, polygon, min_inside=0.5, tolerance=0.0):
+    polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    strokes = [stroke for stroke in strokes if stroke.point_count]
+    if len(polygon) < 3 or not strokes:
+        return []
+    if tolerance > 0:
+        polygon = polygon[rdp_keep_mask(polygon, tolerance)]
+    counts = np.array([stroke.point_count for stroke in strokes])
+    points = np.concatenate([stroke.points for stroke in strokes])
+    inside = points_in_polygon(points, polygon)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    inside_counts = np.add.reduceat(inside.astype(np.int64), starts)
+    return [stroke for stroke, hits, count in zip(strokes, inside_counts.tolist(), counts.tolist())
+            if hits >= min_inside * count]
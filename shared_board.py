@@ -0,0 +1,381 @@
+import threading
+
+import numpy as np
+
+from journal import Journal
+from stroke import Stroke
+from update_scheduler import UpdateScheduler
+
+
+# 같은 프로세스의 여러 세션이 하나의 문서를 함께 편집하는 공유 화이트보드
+# SharedBoard는 이름별로 하나씩 있는 공유 획 저장소이고, 세션마다 BoardSession이 엔진을 저장소에 연결함
+# 세션은 문서 전체가 아니라 변경 사항(delta)만 page.pubsub으로 주고받으며, 받은 쪽은 바뀐 획만 캔버스에 반영함
+#
+# delta는 (작업 종류, 획 ID, 인자...) 튜플이고 점 배열은 세션 사이에 복사 없이 공유되므로 읽기 전용으로 보냄
+# 저장소는 delta마다 순서 번호를 매기고, 한 프레임(BROADCAST_RATE_HZ) 동안 쌓인 delta를 묶어 모든 세션에 한 번만 보냄
+# (세션마다 delta를 따로 보내면 세션 수의 제곱만큼 메시지가 생기지만, 묶어 보내면 프레임당 세션 수만큼만 생김)
+# pubsub 핸들러는 스레드 풀에서 순서 없이 호출되므로 세션은 받은 delta를 순서 번호대로 모아 빠진 번호가 없을 때만 적용함
+# 자기 세션의 변경은 보낼 때 이미 적용되어 있으므로 (로컬 우선) 동시에 같은 획을 바꾸면 적용 순서가 세션마다 다를 수 있음
+# 점마다의 두께(N)는 압력 감지로 그린 획에만 있고, 두께가 일정한 획이면 None
+OP_BEGIN = 1 # 그리기 시작: 색상, 두께, 점 (N, 2), 점마다의 두께
+OP_POINTS = 2 # 그리는 중인 획에 덧붙은 점 (N, 2), 점마다의 두께
+OP_FINISH = 3 # 그리기 종료: 단순화/곡선 근사가 끝난 점, 제어점, 점마다의 두께
+OP_ADD = 4 # 완성된 획 추가 (실행 취소로 되살아난 획 등): 색상, 두께, 점, 제어점, 점마다의 두께
+OP_REMOVE = 5 # 삭제: 지우개로 지웠는지 여부
+OP_TRANSLATE = 6 # 함께 이동 (획 ID 자리에 ID 튜플): dx, dy
+OP_SCALE = 7 # 함께 크기 조정 (획 ID 자리에 ID 튜플): 배율, 중심 x, 중심 y
+OP_RESET = 8 # 문서 교체 (노트 불러오기, 획 ID 자리에 None): (ID, 색상, 두께, 점, 제어점, 점마다의 두께) 목록
+
+
+# 세션 사이에 공유할 읽기 전용 복사본
+def _frozen(array):
+    if array is None:
+        return None
+    array = np.array(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+def _stroke_data(stroke):
+    return stroke.color, stroke.width, _frozen(stroke.points), _frozen(stroke.curves), _frozen(stroke.widths)
+
+
+# 공유된 점 배열을 그대로 쓰는 획 (읽기 전용이므로 점을 바꾸는 시점에 복사됨)
+def _make_stroke(color, width, points, curves, widths=None):
+    return Stroke.from_buffer(color, width, points, curves, widths=widths)
+
+
+# 이름 하나에 해당하는 공유 문서
+# journal: 공유 문서의 자동 저장 저널 (세션들이 같은 파일에 따로 쓰지 않도록 저장소가 가짐, None이면 기록하지 않음)
+class SharedBoard:
+    BROADCAST_RATE_HZ = 60 # 쌓인 delta를 세션들에 보내는 주기
+
+    def __init__(self, name, journal=None):
+        self.name = name
+        self.topic = f"board/{name}"
+        self.lock = threading.Lock()
+        self.journal = journal
+        self.seq = 0 # 마지막으로 매긴 delta 순서 번호
+        self.strokes = {} # ID -> 획 (그려진 순서), 나중에 들어오는 세션에 보낼 현재 문서
+        self.live = set() # 그리는 중인 획의 ID
+        self.sessions = 0
+        self.pubsub = None # 묶음을 보낼 때 쓰는 pubsub (참여한 세션의 page.pubsub)
+        self.broadcasts = 0
+        self._next_id = 0
+        self._outbox = [] # 아직 보내지 않은 delta
+        self._outbox_seq = 1 # _outbox 첫 delta의 순서 번호
+        self._broadcaster = UpdateScheduler(self._broadcast, self.BROADCAST_RATE_HZ)
+        if journal is not None:
+            for stroke in journal.recover():
+                self.strokes[self.new_id()] = stroke
+            journal.start()
+
+    def new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    # delta를 저장소에 적용하고 보낼 목록에 넣은 뒤 순서 번호 반환 (lock을 잡고 호출, 보내는 것은 request_broadcast)
+    def commit(self, delta):
+        op, stroke_id, *args = delta
+        journal = self.journal
+        if op == OP_RESET:
+            self.strokes = {entry[0]: _make_stroke(*entry[1:]) for entry in args[0]}
+            self.live.clear()
+            if journal is not None:
+                journal.reset(list(self.strokes.values()))
+        elif op in (OP_TRANSLATE, OP_SCALE):
+            strokes = [self.strokes[i] for i in stroke_id if i in self.strokes]
+            for stroke in strokes:
+                if op == OP_TRANSLATE:
+                    stroke.translate(*args)
+                else:
+                    stroke.scale(*args)
+            if journal is not None and strokes:
+                if op == OP_TRANSLATE:
+                    journal.log_translate(strokes, *args)
+                else:
+                    journal.log_scale(strokes, *args)
+        elif op == OP_BEGIN:
+            color, width, points, widths = args
+            self.strokes[stroke_id] = _make_stroke(color, width, points, None, widths)
+            self.live.add(stroke_id)
+        elif op == OP_ADD:
+            stroke = self.strokes[stroke_id] = _make_stroke(*args)
+            if journal is not None:
+                journal.log_add(stroke)
+        else:
+            stroke = self.strokes.get(stroke_id)
+            if stroke is None:
+                pass
+            elif op == OP_POINTS:
+                points, widths = args
+                if widths is None:
+                    for x, y in points.tolist():
+                        stroke.add_point(x, y)
+                else:
+                    for (x, y), width in zip(points.tolist(), widths.tolist()):
+                        stroke.add_point(x, y, width)
+            elif op == OP_FINISH:
+                stroke.set_points(*args)
+                self.live.discard(stroke_id)
+                if journal is not None:
+                    journal.log_add(stroke)
+            elif op == OP_REMOVE:
+                del self.strokes[stroke_id]
+                self.live.discard(stroke_id)
+                if journal is not None:
+                    journal.log_remove(stroke, args[0])
+        self._outbox.append(delta)
+        self.seq += 1
+        return self.seq
+
+    # 쌓인 delta를 다음 프레임에 보내도록 예약 (주기가 지났으면 바로 보냄)
+    def request_broadcast(self):
+        self._broadcaster.request()
+
+    # 쌓인 delta를 (첫 순서 번호, delta 목록) 메시지 하나로 모든 세션에 보냄
+    def _broadcast(self):
+        with self.lock:
+            if not self._outbox or self.pubsub is None:
+                return
+            message = (self._outbox_seq, self._outbox)
+            self._outbox_seq += len(self._outbox)
+            self._outbox = []
+        self.broadcasts += 1
+        self.pubsub.send_all_on_topic(self.topic, message)
+
+    # 쌓인 delta를 다음 프레임까지 기다리지 않고 바로 보냄
+    def flush(self):
+        self._broadcaster.flush_now()
+
+    def close(self):
+        self.flush()
+        self._broadcaster.close()
+        if self.journal is not None:
+            self.journal.close()
+
+    # 현재 문서: (ID, 색상, 두께, 점, 제어점, 그리는 중인지) 목록 (lock을 잡고 호출)
+    def snapshot(self):
+        return [(stroke_id, *_stroke_data(stroke), stroke_id in self.live) for stroke_id, stroke in self.strokes.items()]
+
+
+_boards = {}
+_boards_lock = threading.Lock()
+
+
+# 이름이 name인 공유 문서 (없으면 만들고 journal_base의 자동 저장 내용으로 복구)
+def open_board(name, journal_base=None):
+    with _boards_lock:
+        board = _boards.get(name)
+        if board is None:
+            board = _boards[name] = SharedBoard(name, Journal(journal_base) if journal_base else None)
+        board.sessions += 1
+        return board
+
+
+# 세션이 공유 문서를 떠남. 마지막 세션이면 저널을 모두 쓰고 닫음 (다음 세션은 저널에서 다시 복구)
+def close_board(board):
+    with _boards_lock:
+        board.sessions -= 1
+        if board.sessions > 0:
+            return
+        if _boards.get(board.name) is board:
+            del _boards[board.name]
+    board.close()
+
+
+# 세션 하나의 엔진을 공유 문서에 연결
+# 엔진은 문서를 바꿀 때마다 이 객체의 begin/finish/add/remove/translate/scale/reset을 호출하고,
+# 그리는 중인 획에 덧붙은 점은 바로 보내지 않고 flush()(캔버스 업데이트 주기)마다 모아서 보냄
+# pubsub: 세션의 page.pubsub, lock: 엔진을 바꿀 때 잡을 lock (업데이트 스케줄러의 lock)
+class BoardSession:
+    def __init__(self, board, pubsub, lock):
+        self.board = board
+        self.pubsub = pubsub
+        self.lock = lock
+        self.engine = None
+        self.on_change = None
+        self._ids = {} # 획 -> ID
+        self._strokes = {} # ID -> 획
+        self._live_sent = {} # 그리는 중인 획 -> 이미 보낸 점 개수
+        self._drawing = set() # 다른 세션에서 그리는 중인 획
+        self._inbox = {} # 순서 번호 -> 아직 적용하지 않은 delta (자기 세션이 보낸 것은 None으로 표시)
+        self._next_seq = 1
+        self._applying = False # 받은 delta를 적용하는 중 (다시 보내지 않음)
+        self.received = 0
+        self.sent = 0
+
+    # 공유 문서의 현재 상태를 엔진에 불러온 뒤 변경 사항 구독 시작
+    # on_change: 받은 delta를 적용한 뒤 호출 (캔버스 업데이트 예약)
+    def join(self, engine, on_change=None):
+        self.engine = engine
+        self.on_change = on_change
+        with self.lock:
+            with self.board.lock:
+                snapshot = self.board.snapshot()
+                self._next_seq = self.board.seq + 1
+                self.pubsub.subscribe_topic(self.board.topic, self._on_message)
+                self.board.pubsub = self.pubsub
+            self._applying = True
+            try:
+                strokes = []
+                for stroke_id, color, width, points, curves, widths, live in snapshot:
+                    stroke = self._register(stroke_id, _make_stroke(color, width, points, curves, widths))
+                    strokes.append((stroke, live))
+                engine.load([stroke for stroke, live in strokes if not live])
+                for stroke, live in strokes:
+                    if live:
+                        self._drawing.add(stroke)
+                        engine.add_stroke(stroke, live=True)
+            finally:
+                self._applying = False
+
+    def leave(self):
+        self.pubsub.unsubscribe_topic(self.board.topic)
+
+    def _register(self, stroke_id, stroke):
+        self._ids[stroke] = stroke_id
+        self._strokes[stroke_id] = stroke
+        return stroke
+
+    def _unregister(self, stroke):
+        self._drawing.discard(stroke)
+        stroke_id = self._ids.pop(stroke, None)
+        self._strokes.pop(stroke_id, None)
+        return stroke_id
+
+    # 다른 세션에서 아직 그리는 중인 획인지 여부
+    # 이런 획을 옮기면 나중에 도착하는 점과 끝난 점이 이동 전 좌표로 덮어써 세션마다 결과가 달라지므로 엔진은 옮기지 않음
+    def is_drawing(self, stroke):
+        return stroke in self._drawing
+
+    # ---- 보내기 (엔진이 호출) ----
+
+    def _publish(self, delta):
+        if self._live_sent and delta[0] != OP_POINTS:
+            self.flush() # 그리는 중인 획의 남은 점이 다른 변경보다 먼저 가도록 함
+        with self.board.lock:
+            seq = self.board.commit(delta)
+        self._inbox[seq] = None # 이미 적용된 변경
+        self.sent += 1
+        self.board.request_broadcast()
+
+    def begin(self, stroke):
+        if self._applying:
+            return
+        with self.board.lock:
+            stroke_id = self.board.new_id()
+        self._register(stroke_id, stroke)
+        self._live_sent[stroke] = stroke.point_count
+        self._publish((OP_BEGIN, stroke_id, stroke.color, stroke.width, _frozen(stroke.points), _frozen(stroke.widths)))
+
+    # 그리는 중인 획에 쌓인 점 전송
+    def flush(self):
+        for stroke, sent in list(self._live_sent.items()):
+            if stroke.point_count > sent:
+                self._live_sent[stroke] = stroke.point_count
+                widths = stroke.widths
+                self._publish((OP_POINTS, self._ids[stroke], _frozen(stroke.points[sent:]),
+                               None if widths is None else _frozen(widths[sent:])))
+
+    def finish(self, stroke):
+        if self._applying or stroke not in self._ids:
+            return
+        self._live_sent.pop(stroke, None)
+        self._publish((OP_FINISH, self._ids[stroke], _frozen(stroke.points), _frozen(stroke.curves), _frozen(stroke.widths)))
+
+    def add(self, stroke):
+        if self._applying:
+            return
+        with self.board.lock:
+            stroke_id = self.board.new_id()
+        self._register(stroke_id, stroke)
+        self._publish((OP_ADD, stroke_id, *_stroke_data(stroke)))
+
+    def remove(self, stroke, erased=False):
+        self._live_sent.pop(stroke, None)
+        stroke_id = self._unregister(stroke)
+        if not self._applying and stroke_id is not None:
+            self._publish((OP_REMOVE, stroke_id, erased))
+
+    def translate(self, strokes, dx, dy):
+        if not self._applying:
+            self._publish((OP_TRANSLATE, tuple(self._ids[stroke] for stroke in strokes if stroke in self._ids), dx, dy))
+
+    def scale(self, strokes, factor, center_x, center_y):
+        if not self._applying:
+            ids = tuple(self._ids[stroke] for stroke in strokes if stroke in self._ids)
+            self._publish((OP_SCALE, ids, factor, center_x, center_y))
+
+    def reset(self, strokes):
+        if self._applying:
+            return
+        self._ids.clear()
+        self._strokes.clear()
+        self._live_sent.clear()
+        self._drawing.clear()
+        with self.board.lock:
+            ids = [self.board.new_id() for _ in strokes]
+        entries = [(stroke_id, *_stroke_data(self._register(stroke_id, stroke))) for stroke_id, stroke in zip(ids, strokes)]
+        self._publish((OP_RESET, None, entries))
+
+    # ---- 받기 (pubsub 스레드) ----
+
+    def _on_message(self, topic, message):
+        first_seq, deltas = message
+        with self.lock:
+            inbox = self._inbox
+            for seq, delta in enumerate(deltas, first_seq):
+                # 참여하기 전에 이미 상태에 반영된 변경과 자기 세션이 보낸 변경은 건너뜀
+                if seq >= self._next_seq and seq not in inbox:
+                    inbox[seq] = delta
+            applied = False
+            while self._next_seq in self._inbox:
+                delta = self._inbox.pop(self._next_seq)
+                self._next_seq += 1
+                if delta is not None:
+                    self._apply(delta)
+                    applied = True
+            if applied and self.on_change is not None:
+                self.on_change()
+
+    def _apply(self, delta):
+        engine = self.engine
+        op, stroke_id, *args = delta
+        self.received += 1
+        self._applying = True
+        try:
+            if op == OP_RESET:
+                self._ids.clear()
+                self._strokes.clear()
+                self._live_sent.clear()
+                self._drawing.clear()
+                engine.load([self._register(entry[0], _make_stroke(*entry[1:])) for entry in args[0]])
+            elif op in (OP_TRANSLATE, OP_SCALE):
+                strokes = [self._strokes[i] for i in stroke_id if i in self._strokes]
+                if op == OP_TRANSLATE:
+                    engine.translate_strokes(strokes, *args)
+                else:
+                    engine.scale_strokes(strokes, *args)
+            elif op == OP_BEGIN:
+                color, width, points, widths = args
+                stroke = self._register(stroke_id, _make_stroke(color, width, points, None, widths))
+                self._drawing.add(stroke)
+                engine.add_stroke(stroke, live=True)
+            elif op == OP_ADD:
+                engine.add_stroke(self._register(stroke_id, _make_stroke(*args)))
+            else:
+                stroke = self._strokes.get(stroke_id)
+                if stroke is None:
+                    return
+                if op == OP_POINTS:
+                    engine.append_points(stroke, *args)
+                elif op == OP_FINISH:
+                    self._drawing.discard(stroke)
+                    engine.finish_remote_stroke(stroke, *args)
+                elif op == OP_REMOVE:
+                    if stroke is engine.current_stroke:
+                        engine.current_stroke = None # 그리는 중인 획을 다른 세션에서 지움
+                    engine.remove_stroke(stroke, args[0])
+        finally:
+            self._applying = False
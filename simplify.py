@@ -0,0 +1,136 @@
+import numpy as np
+
+
+# 선분 a-b에서 각 점까지의 최단 거리의 제곱 (점 배열에 대해 한 번에 계산)
+def _distance_sq_to_segment(a, b, points):
+    ab = b - a
+    ap = points - a
+    length_sq = float(ab @ ab)
+    if length_sq == 0:
+        return (ap * ap).sum(axis=1)
+    t = np.clip(ap @ ab / length_sq, 0.0, 1.0)
+    d = ap - t[:, None] * ab
+    return (d * d).sum(axis=1)
+
+
+# Ramer–Douglas–Peucker 단순화에서 남길 점의 마스크 계산
+# 재귀 대신 스택을 사용하고, 각 구간의 거리 계산은 NumPy로 한 번에 처리
+def rdp_keep_mask(points, tolerance):
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    if n < 3 or tolerance <= 0:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        d_sq = _distance_sq_to_segment(points[first], points[last], points[first + 1:last])
+        k = int(d_sq.argmax())
+        if d_sq[k] > tolerance_sq:
+            k += first + 1
+            keep[k] = True
+            stack.append((first, k))
+            stack.append((k, last))
+    return keep
+
+
+# 점들을 tolerance 기준 RDP로 단순화하여 (점, 점마다의 두께, 제거된 점 수) 반환
+# widths: 점마다의 두께 (남은 점의 두께만 남김, 없으면 None). 제거된 점이 없으면 입력을 그대로 반환
+def simplify_points(points, widths, tolerance):
+    if len(points) < 3 or tolerance <= 0:
+        return points, widths, 0
+    keep = rdp_keep_mask(points, tolerance)
+    removed = len(keep) - int(keep.sum())
+    if not removed:
+        return points, widths, 0
+    return points[keep], None if widths is None else widths[keep], removed
+
+
+# 단순화로 줄어든 점 개수 통계
+class SimplifyStats:
+    def __init__(self):
+        self.strokes = 0 # 단순화를 거친 획 수
+        self.input_points = 0 # 입력된 전체 샘플 수
+        self.removed_radial = 0 # 그리는 도중 거리 필터로 버려진 샘플 수
+        self.removed_rdp = 0 # 그리기 종료 시 RDP로 제거된 점 수
+
+    @property
+    def removed(self):
+        return self.removed_radial + self.removed_rdp
+
+    @property
+    def kept(self):
+        return self.input_points - self.removed
+
+    # 계측 스냅숏, 벤치마크/재생 결과 JSON용
+    def summary(self):
+        return {
+            "strokes": self.strokes,
+            "input_points": self.input_points,
+            "removed_radial": self.removed_radial,
+            "removed_rdp": self.removed_rdp,
+            "kept": self.kept,
+        }
+
+    def __str__(self):
+        ratio = self.input_points / self.kept if self.kept else 1.0
+        return (f"획 {self.strokes}개: 입력 {self.input_points}점 중 {self.removed}점 제거 "
+                f"(거리 필터 {self.removed_radial}, RDP {self.removed_rdp}), {ratio:.1f}배 감소")
+
+
+# 그리기 경로의 스트리밍 단순화 단계
+# 그리는 동안에는 직전에 저장된 점과 min_distance 이내인 샘플을 버리고 (radial-distance 필터),
+# 획이 끝나면 후처리 단계(postprocess.py)가 tolerance 기준으로 Ramer–Douglas–Peucker 단순화(simplify_points)를 한 번 수행함
+class StrokeSimplifier:
+    def __init__(self, min_distance=1.0, tolerance=0.5):
+        self.min_distance = min_distance
+        self.tolerance = tolerance
+        self.stats = SimplifyStats()
+        self._stroke = None
+        self._last_x = None # 마지막으로 저장된 점
+        self._last_y = None
+        self._pending = None # 거리 필터에 걸려 아직 저장되지 않은 마지막 샘플
+
+    # 새 획의 첫 점이 추가된 뒤 호출
+    def begin(self, stroke, x, y):
+        self._stroke = stroke
+        self._last_x = x
+        self._last_y = y
+        self._pending = None
+        self.stats.input_points += 1
+
+    # 그리는 도중 들어온 샘플을 저장할지 결정 (width: 점마다 두께가 있는 획의 샘플 두께)
+    def accept(self, x, y, width=None):
+        self.stats.input_points += 1
+        dx = x - self._last_x
+        dy = y - self._last_y
+        if dx * dx + dy * dy < self.min_distance * self.min_distance:
+            self._pending = (x, y, width)
+            self.stats.removed_radial += 1
+            return False
+        self._last_x = x
+        self._last_y = y
+        self._pending = None
+        return True
+
+    # 획이 끝났을 때 호출. 거리 필터에 걸린 마지막 샘플을 살렸으면 True 반환
+    def finish(self):
+        stroke = self._stroke
+        self._stroke = None
+        if stroke is None:
+            return False
+        changed = False
+        if self._pending is not None:
+            # 획이 펜을 뗀 위치에서 정확히 끝나도록 마지막 샘플은 살림
+            stroke.add_point(*self._pending)
+            self.stats.removed_radial -= 1
+            self._pending = None
+            changed = True
+
+        self.stats.strokes += 1
+        return changed
@@ -0,0 +1,160 @@
+import math
+
+
+# 획 경계 상자(bounding box)를 위한 균일 격자(uniform grid) 공간 인덱스
+# 각 격자 셀에는 그 셀과 겹치는 획들이 들어 있고, 질의 결과는 z-순서(가장 위에 그려진 획부터)로 반환됨
+class StrokeIndex:
+    def __init__(self, cell_size=128.0, max_cells_per_stroke=256):
+        self.cell_size = cell_size
+        # 이보다 많은 셀을 덮는 거대한 획은 격자 대신 별도 목록에 보관 (셀 갱신 비용 제한)
+        self.max_cells_per_stroke = max_cells_per_stroke
+        self._cells = {}  # (셀 x, 셀 y) -> 획 집합
+        self._ranges = {}  # 획 -> 현재 등록된 셀 범위 (cx0, cy0, cx1, cy1), 거대 획이나 빈 획은 None
+        self._large = set()  # 거대 획 목록
+        self._next_z = 0  # 다음에 추가될 획의 z-순서
+        # 질의 시 경계 상자를 확장할 여유 (가장 두꺼운 획의 절반 두께)
+        self._max_half_width = 0.0
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def __contains__(self, stroke):
+        return stroke in self._ranges
+
+    # 획의 경계 상자가 덮는 셀 범위 계산 (점이 없는 획은 None)
+    def _cell_range(self, stroke):
+        if stroke.min_x > stroke.max_x:
+            return None
+        size = self.cell_size
+        return (
+            math.floor(stroke.min_x / size),
+            math.floor(stroke.min_y / size),
+            math.floor(stroke.max_x / size),
+            math.floor(stroke.max_y / size),
+        )
+
+    def _is_large(self, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        return (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.max_cells_per_stroke
+
+    def _add_cells(self, stroke, cell_range, skip_range=None):
+        cells = self._cells
+        cx0, cy0, cx1, cy1 = cell_range
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                if skip_range and skip_range[0] <= cx <= skip_range[2] and skip_range[1] <= cy <= skip_range[3]:
+                    continue
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    bucket = cells[(cx, cy)] = set()
+                bucket.add(stroke)
+
+    def _remove_cells(self, stroke, cell_range, skip_range=None):
+        cells = self._cells
+        cx0, cy0, cx1, cy1 = cell_range
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                if skip_range and skip_range[0] <= cx <= skip_range[2] and skip_range[1] <= cy <= skip_range[3]:
+                    continue
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(stroke)
+                    if not bucket:
+                        del cells[(cx, cy)]
+
+    # 획을 인덱스에 추가 (z-순서가 없으면 가장 위에 놓이도록 새로 부여)
+    def insert(self, stroke):
+        if stroke in self._ranges:
+            return
+        if stroke.z_order is None:
+            stroke.z_order = self._next_z
+        self._next_z = max(self._next_z, stroke.z_order + 1)
+        stroke.owner_index = self
+        self._ranges[stroke] = None
+        self.update(stroke)
+
+    # 획을 인덱스에서 제거
+    def remove(self, stroke):
+        if stroke not in self._ranges:
+            return
+        cell_range = self._ranges.pop(stroke)
+        if cell_range is not None:
+            self._remove_cells(stroke, cell_range)
+        self._large.discard(stroke)
+        stroke.owner_index = None
+
+    # 획의 경계 상자가 바뀌었을 때 (add_point, translate, scale) 호출됨
+    # 바뀐 셀만 추가/제거하므로 점이 추가되어 상자가 조금 커지는 경우 비용이 거의 없음
+    def update(self, stroke):
+        if stroke not in self._ranges:
+            return
+        # 선택 하이라이트 시 두께가 +2 되므로 그만큼 여유를 둠
+        half_width = stroke.width / 2 + 1
+        if half_width > self._max_half_width:
+            self._max_half_width = half_width
+
+        old_range = self._ranges[stroke]
+        new_range = self._cell_range(stroke)
+        if new_range is not None and self._is_large(new_range):
+            if old_range is not None:
+                self._remove_cells(stroke, old_range)
+            self._ranges[stroke] = None
+            self._large.add(stroke)
+            return
+        if old_range == new_range and stroke not in self._large:
+            return
+
+        self._large.discard(stroke)
+        if old_range is None:
+            if new_range is not None:
+                self._add_cells(stroke, new_range)
+        elif new_range is None:
+            self._remove_cells(stroke, old_range)
+        else:
+            # 겹치는 셀은 그대로 두고 차이 나는 셀만 갱신
+            self._remove_cells(stroke, old_range, skip_range=new_range)
+            self._add_cells(stroke, new_range, skip_range=old_range)
+        self._ranges[stroke] = new_range
+
+    # 사각형 영역과 경계 상자가 겹치는 획들을 z-순서 역순(가장 위 획부터)으로 반환
+    def query_rect(self, x0, y0, x1, y1):
+        size = self.cell_size
+        cx0 = math.floor(x0 / size)
+        cy0 = math.floor(y0 / size)
+        cx1 = math.floor(x1 / size)
+        cy1 = math.floor(y1 / size)
+
+        candidates = set(self._large)
+        cells = self._cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # 질의 영역이 넓으면 존재하는 셀만 훑는 편이 빠름
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    candidates.update(bucket)
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket:
+                        candidates.update(bucket)
+
+        hits = [
+            stroke for stroke in candidates
+            if stroke.min_x <= x1 and stroke.max_x >= x0 and stroke.min_y <= y1 and stroke.max_y >= y0
+        ]
+        hits.sort(key=lambda stroke: stroke.z_order, reverse=True)
+        return hits
+
+    # (x, y) 근처의 후보 획들을 z-순서 역순으로 반환 (정밀한 판정은 Stroke.is_hit이 담당)
+    def query_point(self, x, y, tolerance=5):
+        pad = tolerance + self._max_half_width
+        return self.query_rect(x - pad, y - pad, x + pad, y + pad)
+
+    def clear(self):
+        for stroke in self._ranges:
+            stroke.owner_index = None
+        self._cells.clear()
+        self._ranges.clear()
+        self._large.clear()
+        self._next_z = 0
+        self._max_half_width = 0.0
@@ -0,0 +1,416 @@
+import math
+import mmap
+
+import numpy as np
+
+from curve_fit import DENSIFY_SPACING, fit_cubic_beziers
+from simplify import rdp_keep_mask
+
+
+# 선택된 획을 하이라이트할 때 더해지는 두께
+SELECTED_WIDTH_BONUS = 2
+
+# 상세도(LOD) 단계: k단계는 LOD_MIN_TOLERANCE * 2**k 허용 오차로 단순화한 점들
+LOD_MIN_TOLERANCE = 1.0
+LOD_MAX_LEVEL = 16
+
+
+# 점 (x, y)에서 꺾은선(polyline)까지의 최단 거리의 제곱
+# 모든 선분에 대해 한 번에(NumPy 배열 연산으로) 계산함
+def distance_sq_to_polyline(points, x, y):
+    if len(points) == 1:
+        dx = points[0, 0] - x
+        dy = points[0, 1] - y
+        return float(dx * dx + dy * dy)
+
+    ax = points[:-1, 0]
+    ay = points[:-1, 1]
+    abx = points[1:, 0] - ax
+    aby = points[1:, 1] - ay
+    apx = x - ax
+    apy = y - ay
+
+    # 각 선분 위에서 (x, y)에 가장 가까운 점의 위치 t (0: 선분 시작, 1: 선분 끝)
+    length_sq = abx * abx + aby * aby
+    dot = apx * abx + apy * aby
+    degenerate = length_sq == 0 # 길이가 0인 선분 (같은 점이 연속된 경우)
+    t = np.divide(dot, length_sq, out=np.zeros_like(dot), where=~degenerate)
+    np.clip(t, 0.0, 1.0, out=t)
+
+    dx = apx - t * abx
+    dy = apy - t * aby
+    return float((dx * dx + dy * dy).min())
+
+
+# 점들을 max_error 이내의 3차 베지어 곡선으로 근사한 제어점 (근사하지 않는 편이 나으면 None)
+# LineTo 대신 CubicTo를 보내면 요소 하나가 숫자 6개를 담으므로, 곡선 수가 선분 수의 1/3 이하일 때만 사용
+def fit_stroke_curves(points, max_error, spacing=DENSIFY_SPACING):
+    if len(points) < 4:
+        return None
+    curves = fit_cubic_beziers(points, max_error, spacing)
+    if curves is None or (len(curves) - 1) > len(points) - 1:
+        return None
+    return curves
+
+
+# 배열이 파일을 메모리 맵한 영역을 가리키는지 여부 (노트 파일, 페이지 저장소의 뷰)
+# 이런 배열은 운영체제가 필요할 때 파일에서 읽어 올리고 언제든 내릴 수 있으므로 프로세스 메모리로 치지 않음
+def is_file_backed(array):
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+# 각 드로잉 획을 관리하기 위한 클래스
+# 점 좌표는 [x0, y0, x1, y1, ...] 형태의 연속된 float64 버퍼 하나에만 저장됨
+# (Flet Path 요소는 렌더러가 필요할 때 이 버퍼로부터 만들어 냄)
+# 이동/크기 조정은 누적 변환 (화면 좌표 = 버퍼 좌표 * _scale + (_tx, _ty))으로만 기록해 두었다가
+# bake_transform()이 호출될 때 버퍼에 한 번에 적용함
+# 압력 감지로 그린 획은 점마다 두께를 별도 버퍼(_widths)에 저장하며, 이때 width는 점 두께의 최댓값임
+# (두께는 이동/크기 조정의 영향을 받지 않음)
+class Stroke:
+    __slots__ = (
+        "_coords", "_count", "_widths", "_curves", "_lods",
+        "_scale", "_tx", "_ty",
+        "color", "width", "is_selected",
+        "min_x", "max_x", "min_y", "max_y",
+        "z_order", "owner_index",
+        "__weakref__", # 페이지 저장소가 내보낸 획을 약한 참조로 추적
+    )
+
+    INITIAL_CAPACITY = 16 # 처음 확보하는 점 개수
+
+    # variable_width: 점마다 두께를 저장하는 획이면 True (add_point에 두께를 넘김)
+    def __init__(self, color, width, variable_width=False):
+        # 획을 구성하는 원본 좌표 버퍼와 실제로 사용 중인 점 개수
+        self._coords = np.empty(self.INITIAL_CAPACITY * 2)
+        self._count = 0
+        # 점마다의 두께 버퍼 (좌표 버퍼와 같은 용량, 두께가 일정한 획이면 None)
+        self._widths = np.empty(self.INITIAL_CAPACITY) if variable_width else None
+        # 끝난 획을 근사한 3차 베지어 제어점 (없으면 None, 그리기에만 사용되고 충돌 검사는 원본 점을 사용)
+        self._curves = None
+        # 단계별로 단순화한 점 (버퍼 좌표, 필요할 때 만들어짐, 없으면 None)
+        self._lods = None
+        # 아직 버퍼에 적용되지 않은 누적 변환 (균일 배율과 평행 이동)
+        self._scale = 1.0
+        self._tx = 0.0
+        self._ty = 0.0
+        # 현재 선택되었는지 여부
+        self.is_selected = False
+        # 획의 기본 색상과 두께 저장 (선택 시 하이라이트 등에 사용)
+        self.color = color
+        self.width = width # 이 width는 이제 '기본' 또는 '초기' 두께 역할을 할 수 있음
+        # 획의 경계 상자(bounding box)를 위한 최소/최대 좌표
+        self.min_x = float('inf')
+        self.max_x = float('-inf')
+        self.min_y = float('inf')
+        self.max_y = float('-inf')
+        # 공간 인덱스 관련 정보 (z-순서: 클수록 위에 그려진 획)
+        self.z_order = None
+        self.owner_index = None
+
+    # 파일 등에서 읽은 (N, 2) 점 배열을 복사하지 않고 그대로 쓰는 획 생성
+    # 읽기 전용 배열(메모리 맵 뷰 등)이면 점을 바꾸는 시점에 버퍼를 복사함
+    # bounds: (min_x, min_y, max_x, max_y), 주어지면 점을 읽지 않고 경계 상자로 사용
+    # widths: 점마다의 두께 (압력 감지로 그린 획, 없으면 None)
+    @classmethod
+    def from_buffer(cls, color, width, points, curves=None, bounds=None, widths=None):
+        stroke = cls(color, width)
+        stroke._coords = points.reshape(-1)
+        stroke._count = len(points)
+        stroke._widths = widths
+        stroke._curves = curves
+        if bounds is None:
+            stroke._recompute_bounds()
+        else:
+            stroke.min_x, stroke.min_y, stroke.max_x, stroke.max_y = bounds
+        return stroke
+
+    # 점 개수
+    @property
+    def point_count(self):
+        return self._count
+
+    # 누적 변환이 남아 있는지 여부
+    @property
+    def has_transform(self):
+        return self._scale != 1.0 or self._tx != 0.0 or self._ty != 0.0
+
+    # 버퍼에 저장된 (변환 전) 점 좌표 뷰
+    def _local_points(self):
+        return self._coords[:self._count * 2].reshape(-1, 2)
+
+    # (N, 2) 형태의 화면 좌표 (변환이 없으면 버퍼를 복사하지 않는 읽기 전용 뷰)
+    @property
+    def points(self):
+        view = self._local_points()
+        if self.has_transform:
+            return view * self._scale + (self._tx, self._ty)
+        view.flags.writeable = False
+        return view
+
+    # 점마다의 두께 읽기 전용 뷰 (두께가 일정한 획이면 None)
+    @property
+    def widths(self):
+        if self._widths is None:
+            return None
+        view = self._widths[:self._count]
+        view.flags.writeable = False
+        return view
+
+    # 베지어 제어점의 화면 좌표 (곡선 근사가 없으면 None)
+    @property
+    def curves(self):
+        if self._curves is None or not self.has_transform:
+            return self._curves
+        return self._curves * self._scale + (self._tx, self._ty)
+
+    # 화면에 그려지는 실제 두께 (선택 시 약간 두껍게)
+    @property
+    def display_width(self):
+        return self.width + SELECTED_WIDTH_BONUS if self.is_selected else self.width
+
+    # 점, 제어점, 점 두께, 상세도 캐시 중 파일에 매핑되지 않고 메모리에 올라 있는 배열의 크기(바이트)
+    @property
+    def resident_bytes(self):
+        size = 0
+        for array in (self._coords, self._curves, self._widths):
+            if array is not None and not is_file_backed(array):
+                size += array.nbytes
+        if self._lods is not None:
+            size += sum(points.nbytes for points in self._lods)
+        return size
+
+    # 변환 전 (점, 제어점, 점 두께) 배열 (페이지 저장소가 파일로 내보낼 때 사용)
+    def buffers(self):
+        widths = None if self._widths is None else self._widths[:self._count]
+        return self._local_points(), self._curves, widths
+
+    # 같은 내용의 다른 배열(파일에 매핑된 읽기 전용 뷰 등)로 저장 공간만 교체
+    # 모양과 누적 변환은 그대로이고, 상세도 캐시는 다시 만들 수 있으므로 버림
+    def swap_buffers(self, points, curves=None, widths=None):
+        self._coords = points.reshape(-1)
+        self._curves = curves
+        self._widths = widths
+        self._lods = None
+
+    # 경계 상자가 바뀌었음을 공간 인덱스에 알림
+    def _notify_index(self):
+        if self.owner_index is not None:
+            self.owner_index.update(self)
+
+    # 버퍼를 점 개수만큼 쓸 수 있도록 확보 (부족하면 두 배씩 늘려 add_point의 비용을 분할 상환)
+    def _reserve(self, count):
+        capacity = len(self._coords) // 2
+        widths = self._widths
+        if (count <= capacity and self._coords.flags.writeable
+                and (widths is None or (len(widths) >= count and widths.flags.writeable))):
+            return
+        new_capacity = max(count, capacity * 2, self.INITIAL_CAPACITY)
+        new_coords = np.empty(new_capacity * 2)
+        new_coords[:self._count * 2] = self._coords[:self._count * 2]
+        self._coords = new_coords
+        if widths is not None:
+            self._widths = np.empty(new_capacity)
+            self._widths[:self._count] = widths[:self._count]
+
+    # 누적 변환을 점 버퍼와 제어점에 한 번에 적용 (드래그가 끝났을 때 등)
+    def bake_transform(self):
+        if not self.has_transform:
+            return
+        if not self._coords.flags.writeable:
+            self._coords = self._coords[:self._count * 2].astype(np.float64)
+        points = self._local_points()
+        points *= self._scale
+        points += (self._tx, self._ty)
+        if self._curves is not None:
+            self._curves = self._curves * self._scale + (self._tx, self._ty)
+        self._lods = None
+        self._scale = 1.0
+        self._tx = 0.0
+        self._ty = 0.0
+
+    # 그리기가 끝난 획의 남는 용량을 반환
+    def trim(self):
+        if len(self._coords) > self._count * 2:
+            self._coords = self._coords[:self._count * 2].copy()
+        if self._widths is not None and len(self._widths) > self._count:
+            self._widths = self._widths[:self._count].copy()
+
+    # 획에 새로운 점 추가
+    # width: 점의 두께 (점마다 두께를 저장하는 획에서만 사용, None이면 획의 width)
+    def add_point(self, x, y, width=None):
+        n = self._count
+        self._reserve(n + 1)
+        if self._widths is not None:
+            if width is None:
+                width = self.width
+            elif width > self.width:
+                self.width = width # 공간 인덱스와 충돌 검사는 가장 두꺼운 점 기준
+            self._widths[n] = width
+        if self.has_transform:
+            # 버퍼에는 변환 전 좌표로 저장
+            self._coords[2 * n] = (x - self._tx) / self._scale
+            self._coords[2 * n + 1] = (y - self._ty) / self._scale
+        else:
+            self._coords[2 * n] = x
+            self._coords[2 * n + 1] = y
+        self._count = n + 1
+        self._curves = None
+        self._lods = None
+
+        # 경계 상자 업데이트
+        if x < self.min_x:
+            self.min_x = x
+        if x > self.max_x:
+            self.max_x = x
+        if y < self.min_y:
+            self.min_y = y
+        if y > self.max_y:
+            self.max_y = y
+        self._notify_index()
+
+    # 점 전체를 (N, 2) 배열로 교체 (단순화 등 후처리 결과 적용)
+    # curves: 함께 설정할 베지어 제어점 (저장된 획 복원 등)
+    # widths: 점마다의 두께 (None이면 두께가 일정한 획이 됨)
+    def set_points(self, points, curves=None, widths=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self._coords = points.ravel().copy()
+        self._count = len(points)
+        self._widths = None if widths is None else np.array(widths, dtype=np.float64).reshape(-1)
+        if self._widths is not None and len(self._widths):
+            self.width = float(self._widths.max())
+        self._curves = None if curves is None else np.asarray(curves, dtype=np.float64).reshape(-1, 2)
+        self._lods = None
+        self._scale = 1.0
+        self._tx = 0.0
+        self._ty = 0.0
+        self._recompute_bounds()
+        self._notify_index()
+
+    # 허용 오차 tolerance(월드 좌표 단위) 안에서 가장 거친 상세도의 점 (화면 좌표, 원본을 써야 하면 None)
+    # 각 단계는 바로 앞 단계의 점을 두 배 허용 오차로 다시 단순화하여 만들고 획마다 캐시함
+    # (단계를 거친 누적 오차는 해당 단계 허용 오차의 두 배 미만)
+    # 단계는 버퍼 좌표로 저장하므로 translate/scale에는 그대로 유효하고, 배율은 허용 오차에 반영함
+    # 점마다 두께가 있는 획은 단순화하면 두께와 점이 어긋나므로 항상 원본을 씀
+    def lod_points(self, tolerance):
+        if self._count < 3 or self._widths is not None:
+            return None
+        local_tolerance = tolerance / abs(self._scale)
+        if local_tolerance < LOD_MIN_TOLERANCE:
+            return None
+        level = min(int(math.log2(local_tolerance / LOD_MIN_TOLERANCE)), LOD_MAX_LEVEL)
+
+        if self._lods is None:
+            self._lods = []
+        while len(self._lods) <= level:
+            previous = self._lods[-1] if self._lods else self._local_points()
+            if len(previous) <= 2:
+                break # 양 끝점만 남으면 더 줄일 수 없음
+            keep = rdp_keep_mask(previous, LOD_MIN_TOLERANCE * 2 ** len(self._lods))
+            points = previous[keep]
+            points.flags.writeable = False
+            self._lods.append(points)
+        if not self._lods:
+            return None
+
+        points = self._lods[min(level, len(self._lods) - 1)]
+        if self.has_transform:
+            return points * self._scale + (self._tx, self._ty)
+        return points
+
+    # 특정 (x, y) 좌표가 획에 "충돌"하는지 (즉, 선택되었는지) 확인
+    # 경계 상자로 빠르게 걸러낸 뒤, 획을 이루는 선분들까지의 실제 거리로 판정
+    def is_hit(self, x, y, tolerance=5):
+        if not self._count:
+            return False
+
+        # 획의 두께와 선택을 위한 허용 오차를 고려하여 경계 상자 확장
+        # 화면에 그려지는 두께를 사용 (선택 상태에 따라 달라지기 때문)
+        effective_tolerance = tolerance + self.display_width / 2
+
+        if not (self.min_x - effective_tolerance <= x <= self.max_x + effective_tolerance and
+                self.min_y - effective_tolerance <= y <= self.max_y + effective_tolerance):
+            return False
+
+        # 점들을 변환하는 대신 질의 점을 버퍼 좌표계로 역변환하여 비교
+        if self.has_transform:
+            x = (x - self._tx) / self._scale
+            y = (y - self._ty) / self._scale
+            effective_tolerance /= abs(self._scale)
+        return distance_sq_to_polyline(self._local_points(), x, y) <= effective_tolerance * effective_tolerance
+
+    # 점 좌표로부터 경계 상자 다시 계산
+    def _recompute_bounds(self):
+        if not self._count:
+            self.min_x = self.min_y = float('inf')
+            self.max_x = self.max_y = float('-inf')
+            return
+        points = self.points
+        self.min_x, self.min_y = points.min(axis=0).tolist()
+        self.max_x, self.max_y = points.max(axis=0).tolist()
+
+    # 획을 이동시키는 함수 (점 개수와 무관하게 변환만 누적)
+    def translate(self, dx, dy):
+        self._tx += dx
+        self._ty += dy
+        # 경계 상자도 함께 이동
+        self.min_x += dx
+        self.max_x += dx
+        self.min_y += dy
+        self.max_y += dy
+        self._notify_index()
+
+    # 획의 크기를 조정하는 함수 (점 개수와 무관하게 변환만 누적)
+    def scale(self, factor, center_x, center_y):
+        if not self._count:
+            return
+
+        # 중심점을 기준으로 한 확대/축소를 누적 변환에 합성
+        self._scale *= factor
+        self._tx = center_x + (self._tx - center_x) * factor
+        self._ty = center_y + (self._ty - center_y) * factor
+
+        # 경계 상자도 같은 변환으로 계산 (음수 배율이면 최소/최대가 뒤바뀜)
+        x0 = center_x + (self.min_x - center_x) * factor
+        x1 = center_x + (self.max_x - center_x) * factor
+        y0 = center_y + (self.min_y - center_y) * factor
+        y1 = center_y + (self.max_y - center_y) * factor
+        self.min_x, self.max_x = min(x0, x1), max(x0, x1)
+        self.min_y, self.max_y = min(y0, y1), max(y0, y1)
+        self._notify_index()
+
+
+# 여러 획의 누적 변환을 점 버퍼와 제어점에 한 번의 배열 연산으로 적용 (그룹 이동/크기 조정이 끝났을 때)
+# 모든 획의 점을 하나의 배열로 모은 뒤 획별 배율과 이동을 점마다 펼쳐서 한 번에 곱하고 더하며,
+# 각 획은 결과 배열에서 자기 구간의 뷰를 새 버퍼로 사용함
+def bake_transforms(strokes):
+    strokes = [stroke for stroke in strokes if stroke.has_transform]
+    if not strokes:
+        return
+    counts = [stroke._count for stroke in strokes]
+    points = np.concatenate([stroke._local_points() for stroke in strokes], dtype=np.float64)
+    points *= np.repeat([stroke._scale for stroke in strokes], counts)[:, None]
+    points += np.repeat([(stroke._tx, stroke._ty) for stroke in strokes], counts, axis=0)
+
+    curved = [stroke for stroke in strokes if stroke._curves is not None]
+    if curved:
+        curve_counts = [len(stroke._curves) for stroke in curved]
+        curves = np.concatenate([stroke._curves for stroke in curved], dtype=np.float64)
+        curves *= np.repeat([stroke._scale for stroke in curved], curve_counts)[:, None]
+        curves += np.repeat([(stroke._tx, stroke._ty) for stroke in curved], curve_counts, axis=0)
+        start = 0
+        for stroke, count in zip(curved, curve_counts):
+            stroke._curves = curves[start:start + count]
+            start += count
+
+    start = 0
+    for stroke, count in zip(strokes, counts):
+        stroke._coords = points[start:start + count].reshape(-1)
+        start += count
+        stroke._lods = None
+        stroke._scale = 1.0
+        stroke._tx = 0.0
+        stroke._ty = 0.0
@@ -0,0 +1,54 @@
+import numpy as np
+
+from curve_fit import fit_cubic_beziers
+from postprocess import process_stroke
+from stroke import distance_sq_to_polyline, fit_stroke_curves
+
+
+def _sample_curves(controls, count=64):
+    u = np.linspace(0.0, 1.0, count)[:, None]
+    mu = 1.0 - u
+    parts = []
+    for i in range(0, len(controls) - 1, 3):
+        b = controls[i:i + 4]
+        parts.append(mu ** 3 * b[0] + 3 * mu * mu * u * b[1] + 3 * mu * u * u * b[2] + u ** 3 * b[3])
+    return np.vstack(parts)
+
+
+def _wandering_stroke(seed, count=300):
+    rng = np.random.default_rng(seed)
+    angles = np.cumsum(rng.normal(0.0, 0.15, count))
+    return np.cumsum(np.column_stack((np.cos(angles), np.sin(angles))) * 2.0, axis=0)
+
+
+# 근사한 곡선은 양 끝점을 지나고 모든 입력 점에서 max_error 이내
+def test_fit_stays_within_max_error():
+    for seed in range(5):
+        points = _wandering_stroke(seed)
+        for max_error in (0.5, 2.0):
+            controls = fit_cubic_beziers(points, max_error)
+            assert np.allclose(controls[0], points[0]) and np.allclose(controls[-1], points[-1])
+            dense = _sample_curves(controls)
+            worst = max(distance_sq_to_polyline(dense, x, y) for x, y in points.tolist()) ** 0.5
+            assert worst <= max_error * 1.05
+
+
+# 곡선 수가 선분 수의 1/3을 넘으면 근사하지 않고 꺾은선을 그대로 씀
+def test_zigzag_falls_back_to_polyline():
+    points = np.column_stack((np.arange(40.0), np.where(np.arange(40) % 2, 5.0, -5.0)))
+    assert fit_stroke_curves(points, 0.1) is None
+    simplified, curves, widths, removed = process_stroke(points, None, 0.0, 0.1, 3.0)
+    assert curves is None and removed == 0
+    assert np.array_equal(simplified, points)
+
+
+def test_smooth_stroke_uses_fewer_elements():
+    points = _wandering_stroke(1)
+    curves = fit_stroke_curves(points, 1.0)
+    assert curves is not None
+    assert (len(curves) - 1) // 3 * 3 <= len(points) - 1
+
+
+def test_short_or_degenerate_input():
+    assert fit_stroke_curves(np.array([[0.0, 0.0], [1.0, 1.0], [2.0, 0.0]]), 1.0) is None
+    assert fit_cubic_beziers(np.zeros((3, 2)), 1.0) is None
@@ -0,0 +1,58 @@
+import flet as ft
+import numpy as np
+import pytest
+
+import export
+from export import RasterExport, color_rgb
+from stroke import Stroke
+
+
+def _strokes():
+    rng = np.random.default_rng(3)
+    strokes = []
+    for color in (ft.Colors.BLACK, ft.Colors.RED_200, ft.Colors.BLUE_ACCENT_400, "#00ff00"):
+        stroke = Stroke(color, 4.0)
+        for x, y in rng.uniform(0, 400, (30, 2)).tolist():
+            stroke.add_point(x, y)
+        strokes.append(stroke)
+    return strokes
+
+
+def test_palette_colors():
+    assert color_rgb(ft.Colors.RED) == (0xf4, 0x43, 0x36)
+    assert color_rgb(ft.Colors.RED_200) == (0xef, 0x9a, 0x9a)
+    assert color_rgb(ft.Colors.BLUE_ACCENT) == (0x44, 0x8a, 0xff)
+    assert color_rgb(ft.Colors.GREY_900) == (0x21, 0x21, 0x21)
+    assert color_rgb("#80ff0000") == (0xff, 0x00, 0x00)
+    for color in ft.Colors:
+        if color.value.rstrip("0123456789").removesuffix("accent") in export.SWATCHES:
+            color_rgb(color)
+
+
+def test_unknown_color_raises():
+    with pytest.raises(ValueError):
+        color_rgb(ft.Colors.PRIMARY)
+    with pytest.raises(ValueError):
+        color_rgb("no-such-color")
+
+
+def _png(path, workers):
+    raster = RasterExport(_strokes(), dpi=96, tile_size=64)
+    try:
+        raster.write(str(path), workers)
+    finally:
+        raster.close()
+    return path.read_bytes()
+
+
+# 프로세스를 띄울 수 없는 앱 런타임에서는 스레드 풀로 같은 결과를 냄
+def test_embedded_runtime_renders_with_threads(tmp_path, monkeypatch):
+    inline = _png(tmp_path / "inline.png", 0)
+    monkeypatch.setenv("FLET_PLATFORM", "android")
+    assert not export.can_spawn_workers()
+
+    def no_processes(*args, **kwargs):
+        raise AssertionError("작업자 프로세스를 띄우면 안 됨")
+
+    monkeypatch.setattr(export, "ProcessPoolExecutor", no_processes)
+    assert _png(tmp_path / "threads.png", 3) == inline
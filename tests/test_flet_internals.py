@@ -0,0 +1,64 @@
+import os
+
+import flet as ft
+from flet.version import version as flet_version
+
+from engine import HeadlessCanvas
+from renderer import StrokePath, stroke_style
+
+# 아래 테스트는 앱이 기대는 Flet 비공개 구현을 확인함. 실패하면 Flet 버전이 바뀐 것이므로
+# requirements.txt의 고정 버전을 되돌리거나 해당 코드를 새 구현에 맞춰야 함
+
+REQUIREMENTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "requirements.txt")
+
+
+def _pinned_version():
+    with open(REQUIREMENTS) as f:
+        for line in f:
+            if line.startswith("flet=="):
+                return line.strip().split("==")[1]
+    return None
+
+
+def test_flet_version_is_pinned():
+    assert flet_version == _pinned_version()
+
+
+# 속성 이름 -> 전송될 값 (Flet이 update 명령을 만드는 방식 그대로)
+def _command_attrs(control):
+    attrs = control._build_command(False).attrs
+    attrs.pop("id", None)
+    return attrs
+
+
+# HeadlessCanvas는 Control.__attrs의 (값, dirty) 쌍을 직접 읽어 전송량을 셈
+def test_headless_canvas_matches_flet_commands():
+    path = ft.canvas.Path([ft.canvas.Path.MoveTo(1, 2), ft.canvas.Path.LineTo(3, 4)], ft.Paint(color="red"))
+    twin = ft.canvas.Path([ft.canvas.Path.MoveTo(1, 2), ft.canvas.Path.LineTo(3, 4)], ft.Paint(color="red"))
+    assert isinstance(twin._Control__attrs, dict)
+    expected = sum(len(name) + len(value) for name, value in _command_attrs(path).items())
+    assert HeadlessCanvas._serialize(twin) == expected
+    assert all(not dirty for value, dirty in twin._Control__attrs.values())
+    assert HeadlessCanvas._serialize(twin) == 0 # 바뀌지 않은 속성은 다시 보내지 않음
+
+
+def _elements(count, start=0):
+    elements = [ft.canvas.Path.MoveTo(start, 0)] if start == 0 else []
+    elements.extend(ft.canvas.Path.LineTo(start + i + 1, i * 0.5) for i in range(count))
+    return elements
+
+
+# StrokePath는 Path.before_update를 건너뛰고 직렬화된 elements JSON에 덧붙인 요소를 이어 붙임
+# 결과가 같은 요소를 가진 기본 Path를 Flet이 직렬화한 값과 같아야 함
+def test_stroke_path_matches_flet_path():
+    style = stroke_style("red", 2.0)
+    path = StrokePath(_elements(3), style)
+    assert _command_attrs(path) == _command_attrs(ft.canvas.Path(_elements(3), style.paint))
+
+    path.append_elements(_elements(4, start=3))
+    attrs = _command_attrs(path)
+    assert attrs == _command_attrs(ft.canvas.Path(_elements(3) + _elements(4, start=3), style.paint))
+    assert path.elements == [] # 직렬화한 뒤에는 요소 객체를 들고 있지 않음
+
+    path.set_style(stroke_style("blue", 3.0))
+    assert _command_attrs(path)["paint"] == _command_attrs(ft.canvas.Path([], stroke_style("blue", 3.0).paint))["paint"]
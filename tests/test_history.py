@@ -0,0 +1,119 @@
+import numpy as np
+
+from engine import HeadlessCanvas, StrokeEngine
+from viewport import Viewport
+
+
+def _engine(**limits):
+    engine = StrokeEngine(HeadlessCanvas(), Viewport(800, 600), post_workers=0)
+    for name, value in limits.items():
+        setattr(engine.history, name, value)
+    return engine
+
+
+# (x, y)에서 오른쪽으로 가는 가로 획 하나를 그림
+def _draw(engine, x, y, length=100):
+    engine.begin_stroke(x, y, "black", 3.0)
+    for step in range(1, length // 5 + 1):
+        engine.extend_stroke(x + step * 5.0, y)
+    return engine.end_stroke()
+
+
+# 문서 상태: 획 순서와 각 획의 월드 좌표
+def _state(engine):
+    return [(stroke, stroke.points.copy()) for stroke in engine.strokes]
+
+
+def _assert_state(engine, expected):
+    actual = _state(engine)
+    assert [stroke for stroke, _ in actual] == [stroke for stroke, _ in expected]
+    for (_, points), (_, want) in zip(actual, expected):
+        assert np.allclose(points, want)
+    for stroke in engine.strokes: # 색인도 문서와 같은 위치를 가리켜야 함
+        assert stroke in list(engine.index.query_point(*stroke.points[0], 1.0))
+
+
+# 한 번의 드래그 동안 쌓인 이동은 하나의 명령으로 합쳐지고 한 번에 되돌려짐
+def test_drag_moves_merge_into_one_step():
+    engine = _engine()
+    stroke = _draw(engine, 100, 100)
+    before = _state(engine)
+    engine.begin_drag(150, 100)
+    for step in range(1, 11):
+        engine.drag_to(150 + step * 10, 100 + step * 5)
+    engine.end_drag()
+    assert len(engine.history._undo) == 2
+    command, = engine.history._undo[-1].commands
+    assert (command.dx, command.dy) == (100, 50)
+    moved = _state(engine)
+    assert np.allclose(stroke.points, before[0][1] + (100, 50))
+
+    assert engine.undo()
+    _assert_state(engine, before)
+    assert engine.redo()
+    _assert_state(engine, moved)
+
+
+# 단계 수 한도를 넘으면 가장 오래된 단계부터 버리고, 남은 단계만 되돌릴 수 있음
+def test_step_limit_evicts_oldest():
+    engine = _engine(max_steps=3)
+    strokes = [_draw(engine, 100, 50 + i * 20) for i in range(5)]
+    assert len(engine.history._undo) == 3
+    for expected in (4, 3, 2):
+        assert engine.undo()
+        assert engine.strokes == strokes[:expected]
+    assert not engine.undo() # 처음 두 획은 기록에서 밀려났으므로 남음
+    assert engine.strokes == strokes[:2]
+    while engine.redo():
+        pass
+    assert engine.strokes == strokes
+
+
+# 메모리 한도를 넘어도 오래된 단계부터 버리되 최근 단계 하나는 남김
+def test_byte_limit_keeps_latest_step():
+    engine = _engine(max_bytes=1)
+    strokes = [_draw(engine, 100, 50 + i * 20) for i in range(3)]
+    assert len(engine.history._undo) == 1
+    assert engine.history.nbytes == engine.history._undo[0].nbytes
+    assert engine.undo()
+    assert engine.strokes == strokes[:2]
+    assert not engine.undo()
+
+
+# 추가, 지우기, 이동, 크기 조정을 차례로 되돌리고 다시 실행하면 매 단계의 문서 상태가 그대로 돌아옴
+def test_undo_redo_across_edits():
+    engine = _engine()
+    states = [_state(engine)]
+    for y in (100, 200, 300):
+        _draw(engine, 100, y)
+        states.append(_state(engine))
+    first, second, third = engine.strokes
+
+    assert engine.erase_at(150, 200) == [second] # 가운데 획 지우기
+    engine.checkpoint()
+    states.append(_state(engine))
+
+    engine.begin_drag(150, 300)
+    engine.drag_to(170, 330)
+    engine.drag_to(200, 360)
+    engine.end_drag()
+    states.append(_state(engine))
+
+    engine.select_strokes([first, third])
+    engine.scale_selected(2.0)
+    states.append(_state(engine))
+
+    for expected in reversed(states[:-1]):
+        assert engine.undo()
+        _assert_state(engine, expected)
+    assert not engine.undo()
+    assert engine.strokes == []
+    for expected in states[1:]:
+        assert engine.redo()
+        _assert_state(engine, expected)
+    assert not engine.redo()
+
+    # 되돌린 뒤 새로 그리면 다시 실행할 기록은 버려짐
+    engine.undo()
+    _draw(engine, 100, 400)
+    assert not engine.history.can_redo
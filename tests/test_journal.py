@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+
+import journal as journal_module
+from engine import HeadlessCanvas, StrokeEngine
+from journal import Journal
+from stroke import Stroke
+
+
+def _stroke(x):
+    stroke = Stroke("black", 2.0)
+    for i in range(4):
+        stroke.add_point(x + i, i * 2.0)
+    return stroke
+
+
+# 레코드들이 한 번에 모여 쓰이지 않도록 획마다 기록 스레드가 따라잡을 때까지 기다림
+def _log_strokes(journal, count):
+    strokes = []
+    for i in range(count):
+        stroke = _stroke(i * 10.0)
+        strokes.append(stroke)
+        journal.log_add(stroke)
+        deadline = time.monotonic() + 5
+        while journal.records_written < 2 * (i + 1) and time.monotonic() < deadline:
+            time.sleep(0.001)
+    return strokes
+
+
+def _points(strokes):
+    return [stroke.points.tolist() for stroke in strokes]
+
+
+def test_translate_and_scale_replay(tmp_path):
+    journal = Journal(str(tmp_path / "autosave"))
+    journal.recover()
+    journal.start()
+    strokes = [_stroke(0.0), _stroke(10.0)]
+    for stroke in strokes:
+        journal.log_add(stroke)
+    for stroke in strokes:
+        stroke.translate(3.0, -1.0)
+    journal.log_translate(strokes, 3.0, -1.0)
+    strokes[1].scale(2.0, 10.0, 0.0)
+    journal.log_scale(strokes[1:], 2.0, 10.0, 0.0)
+    journal.close()
+
+    recovered = Journal(str(tmp_path / "autosave")).recover()
+    assert np.allclose(_points(recovered), _points(strokes), atol=1e-4)
+
+
+# 압축이 실패해도 기록 스레드가 죽지 않고 지금 저널에 계속 쓰며 오류를 알림
+def test_compaction_failure_keeps_writing(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(journal_module, "save_notebook", fail)
+    journal = Journal(str(tmp_path / "autosave"))
+    journal.COMPACT_RECORDS = 4
+    errors = []
+    journal.on_error = errors.append
+    journal.recover()
+    journal.start()
+    strokes = _log_strokes(journal, 10)
+    journal.close()
+
+    assert errors and isinstance(journal.error, OSError)
+    assert not (tmp_path / "autosave.snapshot").exists()
+    assert [path.name for path in tmp_path.glob("*.journal")] == ["autosave.0.journal"]
+    monkeypatch.undo()
+    recovered = Journal(str(tmp_path / "autosave")).recover()
+    assert np.allclose(_points(recovered), _points(strokes))
+
+
+def test_compaction(tmp_path):
+    journal = Journal(str(tmp_path / "autosave"))
+    journal.COMPACT_RECORDS = 4
+    journal.recover()
+    journal.start()
+    strokes = _log_strokes(journal, 10)
+    journal.close()
+
+    assert journal.error is None
+    assert (tmp_path / "autosave.snapshot").exists()
+    recovered = Journal(str(tmp_path / "autosave")).recover()
+    assert np.allclose(_points(recovered), _points(strokes))
+
+
+def _draw(engine):
+    engine.begin_stroke(0.0, 0.0, "black", 3.0)
+    for i in range(1, 120):
+        engine.extend_stroke(i * 2.0, 10.0 * np.sin(i / 10.0))
+    return engine.end_stroke()
+
+
+# 후처리 결과로 바뀐 점도 기록되어 복구하면 단순화/곡선 근사된 획이 돌아옴
+def test_processed_points_are_replayed(tmp_path):
+    journal = Journal(str(tmp_path / "autosave"))
+    journal.recover()
+    journal.start()
+    engine = StrokeEngine(HeadlessCanvas(), journal=journal, post_workers=0)
+    stroke = _draw(engine)
+    engine.close()
+    journal.close()
+    assert stroke.point_count < 120 and stroke.curves is not None
+
+    [recovered] = Journal(str(tmp_path / "autosave")).recover()
+    assert np.allclose(recovered.points, stroke.points, atol=1e-3)
+    assert np.allclose(recovered.curves, stroke.curves, atol=1e-3)
+
+
+# 후처리 결과가 적용되기 전에 끝나면 그린 점 그대로 복구됨
+def test_stroke_is_logged_before_processing(tmp_path):
+    journal = Journal(str(tmp_path / "autosave"))
+    journal.recover()
+    journal.start()
+    engine = StrokeEngine(HeadlessCanvas(), journal=journal, post_workers=1)
+    stroke = _draw(engine)
+    raw = stroke.points.copy()
+    journal.close() # 결과를 적용하지 않은 채 (flush 전) 종료
+    engine.pipeline.close()
+
+    [recovered] = Journal(str(tmp_path / "autosave")).recover()
+    assert np.allclose(recovered.points, raw, atol=1e-3)
+    assert recovered.curves is None
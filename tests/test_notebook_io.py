@@ -0,0 +1,96 @@
+import gc
+
+import numpy as np
+import pytest
+
+from curve_fit import fit_cubic_beziers
+from notebook_io import HEADER, NotebookFormatError, load_notebook, load_notebook_snapshot, save_notebook
+from stroke import Stroke, is_file_backed
+
+
+# float32로 정확히 표현되는 좌표만 쓰므로 불러온 값이 저장한 값과 똑같아야 함
+def _strokes():
+    rng = np.random.default_rng(3)
+    plain = Stroke.from_buffer("black", 2.0, rng.integers(0, 4000, (50, 2)) / 4.0)
+    pressure = Stroke("red", 1.5, variable_width=True)
+    for x, y, width in zip(range(0, 200, 10), range(0, 400, 20), np.linspace(1.0, 6.0, 20).tolist()):
+        pressure.add_point(float(x), float(y), width)
+    pressure.trim()
+    points = np.column_stack((np.arange(40.0), np.sin(np.arange(40) / 5.0) * 20))
+    curves = fit_cubic_beziers(points, 0.5).astype(np.float32).astype(np.float64)
+    points = points.astype(np.float32).astype(np.float64)
+    curved = Stroke.from_buffer("blue400", 3.0, points, curves)
+    empty = Stroke.from_buffer("black", 2.0, np.empty((0, 2)))
+    return [plain, pressure, curved, empty]
+
+
+def test_round_trip_is_exact_and_file_backed(tmp_path):
+    path = str(tmp_path / "note.fnb")
+    strokes = _strokes()
+    ids = [7, 3, 2 ** 40, 11]
+    save_notebook(path, strokes, ids, generation=5)
+    loaded, loaded_ids, generation = load_notebook_snapshot(path)
+    assert (loaded_ids, generation) == (ids, 5)
+    assert len(loaded) == len(strokes)
+    for stroke, copy in zip(strokes, loaded):
+        assert (copy.color, copy.width, copy.point_count) == (stroke.color, stroke.width, stroke.point_count)
+        assert np.array_equal(copy.points, stroke.points)
+        assert (copy.widths is None) == (stroke.widths is None)
+        if stroke.widths is not None:
+            assert np.array_equal(copy.widths, stroke.widths.astype(np.float32))
+        assert (copy.curves is None) == (stroke.curves is None)
+        if stroke.curves is not None:
+            assert np.array_equal(copy.curves, stroke.curves)
+        if stroke.point_count:
+            assert (copy.min_x, copy.min_y, copy.max_x, copy.max_y) == (stroke.min_x, stroke.min_y, stroke.max_x, stroke.max_y)
+            assert is_file_backed(copy.points) # 점을 복사하지 않고 파일의 뷰를 참조
+    del loaded, copy
+    gc.collect()
+
+
+# ID 없이 저장하면 ID 목록도 없음
+def test_ids_are_optional(tmp_path):
+    path = str(tmp_path / "note.fnb")
+    save_notebook(path, _strokes())
+    loaded, ids, generation = load_notebook_snapshot(path)
+    assert (len(loaded), ids, generation) == (4, None, 0)
+
+
+def _corrupt(tmp_path, edit):
+    path = str(tmp_path / "note.fnb")
+    save_notebook(path, _strokes(), [1, 2, 3, 4])
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    data = edit(data)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _set_header(data, **fields):
+    names = ("magic", "version", "flags", "stroke_count", "color_count", "coord_count", "generation")
+    values = dict(zip(names, HEADER.unpack_from(data, 0)))
+    values.update(fields)
+    HEADER.pack_into(data, 0, *values.values())
+    return data
+
+
+# 잘리거나 손상된 파일은 numpy의 reshape/IndexError가 아니라 형식 오류로 알림
+@pytest.mark.parametrize("edit", [
+    lambda data: data[:0], # 빈 파일
+    lambda data: data[:HEADER.size - 1],
+    lambda data: data[:len(data) // 2],
+    lambda data: data[:-4],
+    lambda data: b"NOPE" + data[4:],
+    lambda data: _set_header(data, version=99),
+    lambda data: _set_header(data, coord_count=HEADER.unpack_from(data, 0)[5] - 1), # 홀수 좌표 수
+    lambda data: _set_header(data, coord_count=HEADER.unpack_from(data, 0)[5] - 20), # 획 표가 좌표 밖을 가리킴
+    lambda data: _set_header(data, color_count=1), # 획 표의 색상 인덱스가 색상 표 밖
+    lambda data: _set_header(data, color_count=1000), # 색상 표가 파일 끝을 넘음
+    lambda data: data[:HEADER.size + 2] + b"\xff\xfe" + data[HEADER.size + 4:], # UTF-8이 아닌 색상 이름
+])
+def test_corrupt_file_raises_format_error(tmp_path, edit):
+    path = _corrupt(tmp_path, edit)
+    with pytest.raises(NotebookFormatError):
+        load_notebook(path)
+    gc.collect()
@@ -0,0 +1,65 @@
+import gc
+
+import numpy as np
+
+from page_store import PageStore
+from stroke import Stroke, is_file_backed
+
+
+def _stroke(seed, count=500):
+    rng = np.random.default_rng(seed)
+    stroke = Stroke("black", 2.0)
+    for x, y in rng.uniform(0, 1000, (count, 2)).tolist():
+        stroke.add_point(x, y)
+    stroke.trim()
+    return stroke
+
+
+def _fill(store, strokes):
+    for stroke in strokes:
+        store.touch(stroke)
+    store.evict()
+
+
+# 지워진 획의 영역이 쌓이면 살아 있는 획만 새 파일로 옮겨 페이지 파일이 계속 커지지 않음
+def test_dead_extents_are_compacted(tmp_path):
+    store = PageStore(64 * 1024, str(tmp_path))
+    store.COMPACT_MIN_BYTES = 256 * 1024
+    kept = [_stroke(seed) for seed in range(20)]
+    expected = [stroke.points.copy() for stroke in kept]
+    _fill(store, kept)
+    assert all(is_file_backed(stroke.points) for stroke in kept[:10])
+
+    sizes = []
+    for round_ in range(20):
+        batch = [_stroke(1000 + round_ * 20 + seed) for seed in range(20)]
+        _fill(store, batch)
+        for stroke in batch:
+            store.discard(stroke)
+        del batch, stroke
+        gc.collect()
+        sizes.append(store.paged_bytes)
+    store.touch(kept[0])
+    _fill(store, [_stroke(5000 + seed) for seed in range(20)])
+
+    assert store.compactions > 0
+    assert max(sizes) < 6 * store.COMPACT_MIN_BYTES
+    for stroke, points in zip(kept, expected):
+        assert np.array_equal(stroke.points, points)
+    store.close()
+
+
+# 점이 바뀌어 메모리로 올라온 획의 영역도 죽은 영역으로 셈
+def test_rewritten_strokes_are_not_carried_over(tmp_path):
+    store = PageStore(64 * 1024, str(tmp_path))
+    store.COMPACT_MIN_BYTES = 0
+    strokes = [_stroke(seed) for seed in range(20)]
+    _fill(store, strokes)
+    paged = [stroke for stroke in strokes if is_file_backed(stroke.points)]
+    assert paged
+    for stroke in paged:
+        stroke.add_point(0.0, 0.0)
+        store.touch(stroke)
+    _fill(store, [_stroke(100 + seed) for seed in range(20)])
+    assert store.compactions == 1
+    store.close()
@@ -0,0 +1,158 @@
+import threading
+
+import numpy as np
+
+import postprocess
+from engine import HeadlessCanvas, StrokeEngine
+from postprocess import StrokePipeline
+from stroke import Stroke
+from viewport import Viewport
+
+
+# 획마다(첫 점의 y 좌표) 풀어 줄 때까지 후처리 작업자를 멈춰 두는 process_stroke
+class _Gate:
+    def __init__(self, monkeypatch):
+        self._events = {}
+        self._process = postprocess.process_stroke
+        monkeypatch.setattr(postprocess, "process_stroke", self._run)
+
+    def _event(self, key):
+        return self._events.setdefault(key, threading.Event())
+
+    def _run(self, points, *args):
+        assert self._event(float(points[0, 1])).wait(5)
+        return self._process(points, *args)
+
+    def release(self, y):
+        self._event(float(y)).set()
+
+
+def _done(pipeline, stroke):
+    pipeline._jobs[stroke].result(5)
+
+
+def _engine():
+    return StrokeEngine(HeadlessCanvas(), Viewport(800, 600), post_workers=2)
+
+
+# 단순화로 점이 줄어드는 가로 획 하나를 그림
+def _draw(engine, y):
+    engine.begin_stroke(100, y, "black", 3.0)
+    for step in range(1, 41):
+        engine.extend_stroke(100 + step * 5.0, y + (step % 2) * 0.1)
+    return engine.end_stroke()
+
+
+# 뒤에 제출한 작업이 먼저 끝나도 결과는 제출한 순서대로 꺼냄
+def test_results_are_taken_in_submission_order(monkeypatch):
+    gate = _Gate(monkeypatch)
+    pipeline = StrokePipeline(2)
+    ready = threading.Semaphore(0)
+    pipeline.on_ready = ready.release
+    first = Stroke.from_buffer("black", 3.0, np.array([[0.0, 1.0], [10.0, 1.0]]))
+    second = Stroke.from_buffer("black", 3.0, np.array([[0.0, 2.0], [10.0, 2.0]]))
+    pipeline.submit(first, 0.5, 0.0)
+    pipeline.submit(second, 0.5, 0.0)
+
+    gate.release(2)
+    assert ready.acquire(timeout=5) # 작업이 끝나면 업데이트 예약 콜백이 불림
+    assert pipeline.take_ready() == []
+    assert pipeline.pending == 2
+
+    gate.release(1)
+    pipeline.wait(5)
+    assert [stroke for stroke, _ in pipeline.take_ready()] == [first, second]
+    assert (pipeline.pending, pipeline.completed) == (0, 2)
+    pipeline.close()
+
+
+# 엔진도 앞선 획의 결과가 오기 전에는 뒤 획의 결과를 적용하지 않음
+def test_engine_applies_results_in_stroke_order(monkeypatch):
+    gate = _Gate(monkeypatch)
+    engine = _engine()
+    first, second = _draw(engine, 100), _draw(engine, 200)
+    raw = second.point_count
+    gate.release(200)
+    _done(engine.pipeline, second)
+    engine.apply_processed()
+    assert second.point_count == raw and second in engine.pipeline
+
+    gate.release(100)
+    _done(engine.pipeline, first)
+    engine.apply_processed()
+    assert engine.pipeline.pending == 0
+    assert first.point_count < raw and second.point_count < raw
+    engine.close()
+
+
+# 결과가 오기 전에 지운 획은 작업이 취소되고 늦게 끝난 결과도 버려짐
+def test_erased_stroke_discards_result(monkeypatch):
+    gate = _Gate(monkeypatch)
+    engine = _engine()
+    stroke = _draw(engine, 100)
+    raw = stroke.points.copy()
+    assert engine.erase_at(150, 100) == [stroke]
+    engine.checkpoint()
+    assert stroke not in engine.pipeline and engine.pipeline.cancelled == 1
+
+    gate.release(100)
+    engine.pipeline.wait(5)
+    engine.apply_processed()
+    assert np.array_equal(stroke.points, raw)
+    assert engine.pipeline.completed == 0
+    assert stroke not in engine.renderer
+    engine.close()
+
+
+# 그리기를 실행 취소하면 작업이 취소되고, 다시 실행하면 그린 점 그대로 묶음 도형으로 확정됨
+def test_undone_stroke_discards_result(monkeypatch):
+    gate = _Gate(monkeypatch)
+    engine = _engine()
+    stroke = _draw(engine, 100)
+    raw = stroke.points.copy()
+    assert engine.undo()
+    assert stroke not in engine.pipeline and engine.strokes == []
+
+    gate.release(100)
+    engine.pipeline.wait(5)
+    engine.apply_processed()
+    assert engine.redo()
+    engine.apply_processed()
+    assert engine.strokes == [stroke]
+    assert np.array_equal(stroke.points, raw)
+    assert stroke not in engine.renderer._live
+    engine.close()
+
+
+# 결과가 오기 전에 옮긴 획은 그린 점 그대로 확정하고 이동 전 점으로 만든 결과는 버림
+def test_moved_stroke_discards_result(monkeypatch):
+    gate = _Gate(monkeypatch)
+    engine = _engine()
+    stroke = _draw(engine, 100)
+    raw = stroke.points.copy()
+    engine.translate_strokes([stroke], 0, 50)
+    assert stroke not in engine.pipeline
+    assert stroke not in engine.renderer._live
+
+    gate.release(100)
+    engine.pipeline.wait(5)
+    engine.apply_processed()
+    assert np.allclose(stroke.points, raw + (0, 50))
+    engine.close()
+
+
+# 문서에서 빠진 획의 결과는 적용하지 않음 (점 교체, 저널 기록, 캔버스에 다시 올리기 모두 없음)
+def test_result_for_removed_stroke_is_ignored(monkeypatch):
+    gate = _Gate(monkeypatch)
+    engine = _engine()
+    stroke = _draw(engine, 100)
+    raw = stroke.points.copy()
+    engine.remove_stroke(stroke)
+    engine.pipeline.submit(stroke, 0.5, 0.5) # 취소되지 않고 남은 늦은 결과
+    gate.release(100)
+    engine.pipeline.wait(5)
+    engine.apply_processed()
+    assert engine.pipeline.pending == 0
+    assert np.array_equal(stroke.points, raw) and stroke.curves is None
+    assert stroke not in engine.renderer
+    engine.close()
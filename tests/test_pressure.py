@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from pressure import PressureFilter
+
+
+def _filter():
+    return PressureFilter(min_speed=50.0, max_speed=500.0, min_width=1.0, window=4)
+
+
+# 속도에 해당하는 두께 (min_speed 이하 10, max_speed 이상 1, 사이는 선형)
+def _width(speed):
+    normalized = max(0.0, min(1.0, (speed - 50.0) / 450.0))
+    return 10.0 - normalized * 9.0
+
+
+# 일정한 속도로 오른쪽으로 움직이는 샘플들을 넣고 마지막 두께 반환
+def _move(pressure, x, time, speed, count, interval=0.01):
+    width = None
+    for _ in range(count):
+        x += speed * interval
+        time += interval
+        width = pressure.sample(x, 0.0, time)
+    return x, time, width
+
+
+def test_constant_speed_maps_linearly():
+    pressure = _filter()
+    assert pressure.begin(0.0, 0.0, 0.0, 10.0) == 10.0 # 멈춘 상태에서 시작
+    for speed in (20.0, 275.0, 950.0):
+        pressure.begin(0.0, 0.0, 0.0, 10.0)
+        assert _move(pressure, 0.0, 0.0, speed, 8)[2] == pytest.approx(_width(speed))
+
+
+# 두께는 최근 window개 샘플의 이동 거리 합 / 시간 합으로 구한 속도를 따름
+def test_ring_buffer_matches_windowed_average():
+    rng = random.Random(7)
+    pressure = _filter()
+    pressure.begin(0.0, 0.0, 0.0, 10.0)
+    x = time = 0.0
+    samples = []
+    for _ in range(200):
+        interval = rng.choice((0.0, 0.002, 0.008, 0.03))
+        distance = rng.uniform(0.0, 8.0)
+        x += distance
+        time += interval
+        samples.append((distance, interval))
+        width = pressure.sample(x, 0.0, time)
+        recent = samples[-4:]
+        elapsed = sum(interval for _, interval in recent)
+        if elapsed > 1e-9:
+            assert width == pytest.approx(_width(sum(distance for distance, _ in recent) / elapsed))
+
+
+# 튀는 샘플 하나는 두께를 조금만 바꾸고, window개 샘플이 지나면 영향이 사라짐
+def test_outlier_is_smoothed_then_forgotten():
+    pressure = _filter()
+    pressure.begin(0.0, 0.0, 0.0, 10.0)
+    x, time, slow = _move(pressure, 0.0, 0.0, 100.0, 10)
+    jump = pressure.sample(x + 5.0, 0.0, time + 0.01) # 한 샘플만 500px/s
+    assert _width(500.0) < jump < slow
+    assert jump == pytest.approx(_width((3 * 1.0 + 5.0) / 0.04))
+    _, _, width = _move(pressure, x + 5.0, time + 0.01, 100.0, 4)
+    assert width == pytest.approx(slow)
+
+
+# 이벤트 간격이 들쭉날쭉해도 평균 속도가 같으면 두께가 흔들리지 않음
+def test_uneven_intervals_keep_width_steady():
+    pressure = _filter()
+    pressure.begin(0.0, 0.0, 0.0, 10.0)
+    x = time = 0.0
+    widths = []
+    for interval in [0.001, 0.019] * 10:
+        x += 200.0 * interval
+        time += interval
+        widths.append(pressure.sample(x, 0.0, time))
+    assert max(widths[4:]) - min(widths[4:]) < 1e-9
+    assert widths[-1] == pytest.approx(_width(200.0))
+
+
+# 같은 시각에 몰려 온 샘플만 있으면 직전 두께를 그대로 씀
+def test_zero_interval_keeps_previous_width():
+    pressure = _filter()
+    assert pressure.begin(0.0, 0.0, 1.0, 10.0) == 10.0
+    assert pressure.sample(30.0, 0.0, 1.0) == 10.0
+    assert pressure.sample(60.0, 0.0, 0.5) == 10.0 # 시계가 되돌아가도 음수 간격을 쓰지 않음
+
+
+# 새 획을 시작하면 직전 획의 속도와 획 사이의 시간이 남지 않음
+def test_begin_resets_between_strokes():
+    pressure = _filter()
+    pressure.begin(0.0, 0.0, 0.0, 10.0)
+    _, time, fast = _move(pressure, 0.0, 0.0, 2000.0, 10)
+    assert fast == 1.0
+
+    assert pressure.begin(500.0, 500.0, time + 3.0, 6.0) == 6.0 # 3초 뒤 다른 곳에서 다음 획
+    width = pressure.sample(500.0 + 275.0 * 0.01, 500.0, time + 3.01)
+    assert width == pytest.approx(6.0 - 0.5 * 5.0) # 직전 획 샘플 없이 이번 샘플의 속도만 반영
+    assert pressure.max_width == 6.0
+
+    assert pressure.begin(0.0, 0.0, 0.0, 0.5) == 1.0 # 최대 두께가 최소 두께보다 작으면 최소 두께
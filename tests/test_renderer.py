@@ -0,0 +1,87 @@
+from engine import HeadlessCanvas, StrokeEngine
+from viewport import Viewport
+
+
+def _engine():
+    return StrokeEngine(HeadlessCanvas(), Viewport(800, 600), post_workers=0)
+
+
+def _draw(engine, x, y, count=100):
+    engine.begin_stroke(x, y, "black", 3.0)
+    for i in range(count):
+        engine.extend_stroke(x + i, y + (i % 5))
+        engine.flush()
+    engine.end_stroke()
+    engine.flush()
+
+
+# 세션마다 자기 렌더러가 보낸 양만 셈
+def test_bytes_serialized_per_renderer():
+    first, second = _engine(), _engine()
+    _draw(first, 10, 10)
+    assert first.renderer.bytes_serialized > 0
+    assert second.renderer.bytes_serialized == 0
+    sent = first.renderer.bytes_serialized
+    _draw(second, 20, 20)
+    assert first.renderer.bytes_serialized == sent
+    assert second.renderer.bytes_serialized > 0
+
+
+# 그리는 중인 획의 업데이트 크기가 획 길이에 따라 커지지 않음 (새 선분은 짧은 Path에만 덧붙음)
+def test_live_stroke_update_size_is_bounded():
+    engine = _engine()
+    renderer = engine.renderer
+    engine.begin_stroke(10, 10, "black", 3.0)
+    engine.flush()
+    sizes = []
+    for i in range(600):
+        before = renderer.bytes_serialized
+        engine.extend_stroke(10 + i * 0.5, 10 + (i % 7))
+        engine.flush()
+        sizes.append(renderer.bytes_serialized - before)
+    assert max(sizes[-100:]) < 3 * max(sizes[:100])
+    engine.end_stroke()
+    engine.flush()
+    assert renderer.shape_count == 1
+
+
+# 같은 Paint로 그린 확정 획들은 획 수가 아니라 몇 개의 묶음 도형으로 보임
+def test_same_paint_strokes_merge_into_few_shapes():
+    engine = _engine()
+    renderer = engine.renderer
+    for i in range(193):
+        _draw(engine, 10 + (i % 20) * 35, 10 + (i // 20) * 50, count=20)
+    assert len(engine.strokes) == 193
+    assert renderer.shape_count <= 8
+    assert renderer.shape_count == len(renderer.canvas.shapes)
+
+
+# Paint마다 획이 열 개뿐이어도 묶음으로 합쳐짐 (Paint마다 묶음 하나와 대기 중인 획 몇 개)
+def test_few_strokes_per_paint_are_merged():
+    engine = _engine()
+    colors = ("black", "red", "blue", "green")
+    for i in range(40):
+        engine.begin_stroke(10 + (i % 10) * 60, 10 + (i // 10) * 80, colors[i % 4], 3.0)
+        for step in range(20):
+            engine.extend_stroke(10 + (i % 10) * 60 + step, 10 + (i // 10) * 80 + (step % 5))
+        engine.end_stroke()
+        engine.flush()
+    assert engine.renderer.shape_count <= 3 * len(colors)
+
+
+# 묶음으로 합쳐지기 직전에 선택된 획은 묶음에 들어가지 않고 선택 스타일의 단독 도형으로 남음
+def test_stroke_selected_before_merge_stays_separate():
+    engine = _engine()
+    renderer = engine.renderer
+    for i in range(renderer.MERGE_STROKES - 1):
+        _draw(engine, 10, 10 + i * 20, count=10)
+    selected = engine.strokes[0]
+    engine.select_strokes([selected]) # flush 전에 다음 획이 끝나 대기 중인 획이 MERGE_STROKES개가 되어 묶음으로 합쳐짐
+    engine.begin_stroke(10, 400, "black", 3.0)
+    engine.extend_stroke(50, 400)
+    engine.end_stroke()
+    engine.flush()
+    assert selected in renderer._solo and selected not in renderer._stroke_batch
+    engine.deselect()
+    engine.flush()
+    assert selected in renderer._staged_key # 선택이 풀리면 다시 묶음 대기 목록으로
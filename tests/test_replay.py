@@ -0,0 +1,67 @@
+import asyncio
+import types
+
+import flet as ft
+import numpy as np
+
+import main as app_main
+import replay
+from gestures import load_trace
+
+
+def _start_app():
+    page = ft.Page(replay.ReplayConnection(), "live", asyncio.new_event_loop())
+    return app_main.main(page, update_rate_hz=0)
+
+
+def _drag(app, points):
+    events = [types.SimpleNamespace(local_x=float(x), local_y=float(y)) for x, y in points]
+    app.pan_start(events[0])
+    for event in events[1:]:
+        app.pan_update(event)
+    app.pan_end(events[-1])
+
+
+# 가로 물결 모양 획 (float32로 정확히 기록되는 좌표)
+def _wave(x, y, count=30):
+    return [(x + i * 4, y + (i % 5) * 1.5) for i in range(count)]
+
+
+def _geometry(engine):
+    return [(stroke.color, stroke.width, stroke.points.copy()) for stroke in engine.strokes]
+
+
+# 앱에서 녹화한 제스처를 저장한 뒤 재생하면 최종 문서가 녹화한 세션과 같음
+def test_recorded_session_replays_to_same_document(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = _start_app()
+    _drag(app, _wave(50, 50)) # 녹화 전에 그린 획은 기록 시작 때의 문서로 저장됨
+    app.toggle_recording(None)
+    for row in range(6):
+        _drag(app, _wave(50 + row * 10, 100 + row * 40))
+    app.set_mode("erase")
+    _drag(app, [(70, 142), (70, 145), (71, 148)]) # 두 번째 행의 획 지우기
+    app.set_mode("select")
+    _drag(app, [(100, 262), (130, 280), (180, 300)]) # 다섯 번째 행의 획 옮기기
+    app.zoom_view(1.5, 300, 200)
+    app.set_mode("draw")
+    _drag(app, _wave(100, 60))
+    app.toggle_recording(None)
+    live = _geometry(app.engine)
+    app.close()
+    assert len(live) == 7
+    assert any(np.allclose(points[0], (170, 298)) for _, _, points in live)
+
+    replayed = {}
+    start = replay.app_main.main
+    def capture(page, **options):
+        replayed["app"] = start(page, **options)
+        return replayed["app"]
+    monkeypatch.setattr(replay.app_main, "main", capture)
+    result = replay.replay(load_trace(str(tmp_path / "gestures.fgt")))
+
+    assert result["strokes"] == len(live)
+    geometry = _geometry(replayed["app"].engine)
+    for (color, width, points), (live_color, live_width, live_points) in zip(geometry, live):
+        assert (color, width) == (live_color, live_width)
+        assert np.allclose(points, live_points)
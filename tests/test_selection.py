@@ -0,0 +1,95 @@
+import numpy as np
+
+from engine import HeadlessCanvas, StrokeEngine
+from selection import points_in_polygon, strokes_in_polygon
+from stroke import Stroke
+from viewport import Viewport
+
+# 오른쪽이 파인 U자 모양 (오목 다각형)
+U_SHAPE = np.array([[0, 0], [30, 0], [30, 10], [10, 10], [10, 20], [30, 20], [30, 30], [0, 30]], dtype=np.float64)
+
+
+def _line(x0, y0, x1, y1, count=11):
+    return Stroke.from_buffer("black", 3.0, np.linspace((x0, y0), (x1, y1), count))
+
+
+def test_points_in_concave_polygon():
+    points = np.array([[5, 15], [20, 5], [20, 25], [20, 15], [35, 15], [-1, 15], [9.9, 15], [10.1, 15]])
+    assert points_in_polygon(points, U_SHAPE).tolist() == [True, True, True, False, False, False, True, False]
+
+
+# 변 위의 점은 인접한 두 다각형 중 정확히 한쪽에만 속함 (나란히 놓인 선택 영역이 같은 점을 두 번 세지 않음)
+def test_point_on_shared_edge_counts_once():
+    left = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=np.float64)
+    right = left + (10, 0)
+    top = left + (0, -10)
+    vertical = np.array([[10, 5], [10, 0.5], [10, 9.5]]) # left와 right가 맞닿은 변 위
+    horizontal = np.array([[5, 0], [0.5, 0], [9.5, 0]]) # left와 top이 맞닿은 변 위
+    assert (points_in_polygon(vertical, left) ^ points_in_polygon(vertical, right)).all()
+    assert (points_in_polygon(horizontal, left) ^ points_in_polygon(horizontal, top)).all()
+
+
+def test_strokes_in_concave_polygon():
+    inside = _line(2, 5, 28, 5) # 아래 팔 안
+    notch = _line(12, 15, 28, 15) # 파인 부분 (경계 상자 안이지만 다각형 밖)
+    half = _line(2, 25, 58, 25) # 점의 절반 정도만 안
+    across = _line(5, 2, 5, 28) # 세로 기둥 안
+    selected = strokes_in_polygon([inside, notch, half, across], U_SHAPE)
+    assert selected == [inside, across]
+    assert strokes_in_polygon([half], U_SHAPE, min_inside=0.4) == [half]
+    assert strokes_in_polygon([inside], U_SHAPE[:2]) == [] # 변이 두 개뿐인 올가미
+
+
+def _engine():
+    return StrokeEngine(HeadlessCanvas(), Viewport(800, 600), post_workers=0)
+
+
+def _lasso(engine, polygon):
+    engine.begin_lasso(*polygon[0])
+    for x, y in polygon[1:]:
+        engine.extend_lasso(x, y)
+    engine.extend_lasso(*polygon[0])
+    return engine.end_lasso()
+
+
+# 올가미로 선택한 획들을 드래그하면 드래그가 끝날 때 점 버퍼에 이동이 반영되고 색인도 새 위치를 가리킴
+def test_lasso_drag_bakes_transforms():
+    engine = _engine()
+    a, b, c = _line(100, 100, 200, 100), _line(100, 150, 200, 150), _line(100, 300, 200, 300)
+    engine.load([a, b, c])
+    original = [stroke.points.copy() for stroke in (a, b, c)]
+    assert _lasso(engine, [(90, 90), (210, 90), (210, 160), (90, 160)]) == [a, b]
+
+    engine.begin_drag(150, 100)
+    for step in range(1, 6):
+        engine.drag_to(150 + step * 20, 100 + step * 40)
+    assert a.has_transform and b.has_transform
+    engine.end_drag()
+    assert not a.has_transform and not b.has_transform
+    assert np.allclose(a.points, original[0] + (100, 200))
+    assert np.allclose(b.points, original[1] + (100, 200))
+    assert np.array_equal(c.points, original[2])
+
+    assert list(engine.hit_strokes(150, 100)) == []
+    assert list(engine.hit_strokes(250, 300)) == [a]
+    engine.deselect()
+    assert _lasso(engine, [(190, 290), (310, 290), (310, 360), (190, 360)]) == [a, b]
+
+
+# 크기 조정 뒤 이어서 드래그하면 배율과 이동이 함께 점 버퍼에 반영됨
+def test_lasso_scale_then_drag_bakes_transforms():
+    engine = _engine()
+    a, b = _line(100, 100, 200, 100), _line(100, 200, 200, 200)
+    engine.load([a, b])
+    original = [stroke.points.copy() for stroke in (a, b)]
+    assert _lasso(engine, [(90, 90), (210, 90), (210, 210), (90, 210)]) == [a, b]
+
+    assert engine.scale_selected(2.0) # 중심 (150, 150) 기준
+    engine.begin_drag(150, 50)
+    engine.drag_to(160, 70)
+    engine.end_drag()
+    for stroke, points in zip((a, b), original):
+        assert not stroke.has_transform
+        assert np.allclose(stroke.points, (points - 150) * 2 + 150 + (10, 20))
+    assert (a.min_x, a.max_x, a.min_y) == (60, 260, 70)
+    assert list(engine.hit_strokes(160, 270)) == [b]
@@ -0,0 +1,167 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from engine import HeadlessCanvas, StrokeEngine
+from shared_board import BoardSession, SharedBoard
+from viewport import Viewport
+
+
+# page.pubsub 대신 쓰는 메시지 허브: 보낸 묶음을 세션마다 쌓아 두었다가 테스트가 원하는 순서로 전달함
+class FakeHub:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handlers = {}
+        self.queues = {}
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    # 세션마다 쌓인 묶음 중 일부(또는 전부)를 뒤섞인 순서로 전달
+    def deliver(self, rng, fraction=1.0):
+        for pubsub, queue in list(self.queues.items()):
+            with self.lock:
+                rng.shuffle(queue)
+                count = len(queue) if fraction >= 1.0 else int(len(queue) * fraction)
+                messages, queue[:] = queue[:count], queue[count:]
+            for message in messages:
+                self.handlers[pubsub]("board", message)
+
+
+class FakePubSub:
+    def __init__(self, hub):
+        self.hub = hub
+
+    def subscribe_topic(self, topic, handler):
+        with self.hub.lock:
+            self.hub.handlers[self] = handler
+            self.hub.queues[self] = []
+
+    def unsubscribe_topic(self, topic):
+        with self.hub.lock:
+            self.hub.handlers.pop(self, None)
+            self.hub.queues.pop(self, None)
+
+    def send_all_on_topic(self, topic, message):
+        with self.hub.lock:
+            for queue in self.hub.queues.values():
+                queue.append(message)
+
+
+@pytest.fixture
+def board(monkeypatch):
+    monkeypatch.setattr(SharedBoard, "BROADCAST_RATE_HZ", 0) # 묶지 않고 변경마다 바로 보냄
+    board = SharedBoard("test")
+    yield board
+    board.close()
+
+
+def _join(board, hub):
+    lock = threading.RLock()
+    session = BoardSession(board, hub.pubsub(), lock)
+    engine = StrokeEngine(HeadlessCanvas(), Viewport(800, 600), board=session, post_workers=0)
+    session.join(engine)
+    return engine, lock
+
+
+# 획 목록의 비교용 요약 (세션마다 그려진 순서는 다를 수 있으므로 정렬)
+def _state(strokes):
+    return sorted((stroke.color, stroke.point_count, round(stroke.min_x, 3), round(stroke.min_y, 3),
+                   round(stroke.max_x, 3), round(stroke.max_y, 3)) for stroke in strokes)
+
+
+def _draw(engine, rng, color):
+    x, y = rng.uniform(50, 750), rng.uniform(50, 550)
+    engine.begin_stroke(x, y, color, 3.0)
+    for _ in range(rng.randint(3, 12)):
+        x += rng.uniform(-8, 8)
+        y += rng.uniform(-8, 8)
+        engine.extend_stroke(x, y)
+        engine.flush()
+    engine.end_stroke()
+    engine.flush()
+
+
+# 그리기, 지우기, 이동 중 하나 (이동끼리는 순서와 관계없이 같은 결과이므로 동시에 같은 획을 움직여도 수렴함)
+def _random_edit(engine, rng, color):
+    choice = rng.random()
+    if choice < 0.5 or not engine.strokes:
+        _draw(engine, rng, color)
+    elif choice < 0.75:
+        stroke = rng.choice(engine.strokes)
+        x, y = stroke.points[0].tolist()
+        engine.erase_at(x, y, single=True)
+        engine.checkpoint()
+    else:
+        strokes = rng.sample(engine.strokes, min(3, len(engine.strokes)))
+        engine.translate_strokes(strokes, rng.uniform(-20, 20), rng.uniform(-20, 20))
+    engine.flush()
+
+
+def _assert_converged(board, engines):
+    expected = _state(board.strokes.values())
+    for engine in engines:
+        assert _state(engine.strokes) == expected
+
+
+# 받은 묶음이 뒤섞여 도착해도 세션들은 순서 번호대로 적용하여 공유 문서와 같은 상태가 됨
+@pytest.mark.parametrize("seed", range(5))
+def test_sessions_converge_out_of_order(board, seed):
+    rng = random.Random(seed)
+    hub = FakeHub()
+    sessions = [_join(board, hub) for _ in range(3)]
+    colors = ["black", "red", "blue"]
+    for _ in range(40):
+        index = rng.randrange(len(sessions))
+        engine, lock = sessions[index]
+        with lock:
+            _random_edit(engine, rng, colors[index])
+        hub.deliver(rng, fraction=rng.random())
+    hub.deliver(rng)
+    _assert_converged(board, [engine for engine, lock in sessions])
+    assert board.strokes
+
+
+# 세션마다 다른 스레드에서 편집하고 묶음은 스레드 풀에서 순서 없이 전달됨 (Flet pubsub과 같은 방식)
+def test_sessions_converge_concurrently(board):
+    hub = FakeHub()
+    sessions = [_join(board, hub) for _ in range(4)]
+    stop = threading.Event()
+
+    def pump():
+        rng = random.Random(99)
+        with ThreadPoolExecutor(4) as pool:
+            while not stop.is_set():
+                pool.submit(hub.deliver, rng, 0.5).result()
+
+    def edit(index):
+        rng = random.Random(index)
+        engine, lock = sessions[index]
+        for _ in range(25):
+            with lock:
+                _random_edit(engine, rng, f"#0000{index:02x}")
+
+    pumper = threading.Thread(target=pump)
+    pumper.start()
+    editors = [threading.Thread(target=edit, args=(i,)) for i in range(len(sessions))]
+    for thread in editors:
+        thread.start()
+    for thread in editors:
+        thread.join()
+    stop.set()
+    pumper.join()
+    hub.deliver(random.Random(0))
+    _assert_converged(board, [engine for engine, lock in sessions])
+
+
+# 나중에 들어온 세션은 공유 문서의 현재 상태에서 시작함
+def test_late_join_gets_snapshot(board):
+    hub = FakeHub()
+    rng = random.Random(7)
+    first, lock = _join(board, hub)
+    for _ in range(5):
+        _draw(first, rng, "green")
+    late, _ = _join(board, hub)
+    _assert_converged(board, [first, late])
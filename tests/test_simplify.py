@@ -0,0 +1,63 @@
+import numpy as np
+
+from simplify import StrokeSimplifier, rdp_keep_mask, simplify_points
+from stroke import Stroke
+
+
+# 허용 오차 안에서 흔들리는 직선은 양 끝점만 남음
+def test_rdp_drops_points_within_tolerance():
+    xs = np.arange(50, dtype=float)
+    points = np.column_stack((xs, 0.2 * np.sin(xs)))
+    keep = rdp_keep_mask(points, 0.5)
+    assert keep[0] and keep[-1]
+    assert keep.sum() == 2
+
+
+# 허용 오차보다 멀리 벗어난 꼭짓점은 남고, 남은 점으로 만든 선은 원래 점에서 허용 오차 이내
+def test_rdp_keeps_corners_beyond_tolerance():
+    points = np.array([[0, 0], [5, 0.2], [10, 0], [10, 5], [10.1, 10], [20, 10]], dtype=float)
+    keep = rdp_keep_mask(points, 0.5)
+    assert keep.tolist() == [True, False, True, False, True, True]
+    kept = points[keep]
+    for point in points:
+        distances = [np.linalg.norm(point - a - np.clip((point - a) @ (b - a) / ((b - a) @ (b - a)), 0, 1) * (b - a))
+                     for a, b in zip(kept[:-1], kept[1:])]
+        assert min(distances) <= 0.5
+
+
+def test_simplify_points_keeps_widths_of_kept_points():
+    points = np.array([[0, 0], [1, 0.01], [2, 0], [2, 5]], dtype=float)
+    widths = np.array([1.0, 2.0, 3.0, 4.0])
+    simplified, kept_widths, removed = simplify_points(points, widths, 0.5)
+    assert removed == 1
+    assert kept_widths.tolist() == [1.0, 3.0, 4.0]
+    assert simplified.tolist() == [[0, 0], [2, 0], [2, 5]]
+
+
+# 거리 필터: 직전 저장 점과 min_distance 이내인 샘플은 버리지만, 펜을 뗀 마지막 샘플은 살림
+def test_radial_filter_drops_close_samples_and_keeps_endpoint():
+    simplifier = StrokeSimplifier(min_distance=2.0, tolerance=0.5)
+    stroke = Stroke("black", 3.0)
+    stroke.add_point(0, 0)
+    simplifier.begin(stroke, 0, 0)
+    for x in (0.5, 1.0, 2.5, 3.0, 3.5):
+        if simplifier.accept(x, 0):
+            stroke.add_point(x, 0)
+    assert stroke.points.tolist() == [[0, 0], [2.5, 0]]
+    assert simplifier.finish()
+    assert stroke.points.tolist() == [[0, 0], [2.5, 0], [3.5, 0]]
+
+    stats = simplifier.stats
+    assert (stats.strokes, stats.input_points, stats.removed_radial) == (1, 6, 3)
+    assert stats.kept == 3
+
+
+def test_finish_without_pending_sample_changes_nothing():
+    simplifier = StrokeSimplifier(min_distance=1.0)
+    stroke = Stroke("black", 3.0)
+    stroke.add_point(0, 0)
+    simplifier.begin(stroke, 0, 0)
+    assert simplifier.accept(5, 0)
+    stroke.add_point(5, 0)
+    assert not simplifier.finish()
+    assert stroke.point_count == 2
@@ -0,0 +1,89 @@
+import numpy as np
+
+from engine import HeadlessCanvas, StrokeEngine
+from spatial_index import StrokeIndex
+from stroke import Stroke
+from viewport import Viewport
+
+
+def _stroke(x0, y0, x1, y1, count=10, width=2.0):
+    points = np.column_stack((np.linspace(x0, x1, count), np.linspace(y0, y1, count)))
+    return Stroke.from_buffer("black", width, points)
+
+
+def _engine(strokes):
+    engine = StrokeEngine(HeadlessCanvas(), Viewport(800, 600), post_workers=0)
+    engine.load(strokes)
+    return engine
+
+
+def _brute_force(strokes, x0, y0, x1, y1):
+    hits = [s for s in strokes if s.min_x <= x1 and s.max_x >= x0 and s.min_y <= y1 and s.max_y >= y0]
+    return sorted(hits, key=lambda stroke: stroke.z_order, reverse=True)
+
+
+# 겹치는 획은 나중에 그린 획부터 반환되고, 실행 취소로 되살린 획은 원래 z-순서로 돌아감
+def test_query_returns_topmost_first():
+    bottom, middle, top = _stroke(0, 0, 100, 100), _stroke(0, 100, 100, 0), _stroke(0, 50, 100, 50)
+    engine = _engine([bottom, middle, top])
+    assert engine.index.query_point(50, 50) == [top, middle, bottom]
+    assert list(engine.hit_strokes(50, 50)) == [top, middle, bottom]
+
+    engine.remove_stroke(middle)
+    assert engine.index.query_point(50, 50) == [top, bottom]
+    engine.insert_stroke(middle, 1)
+    assert engine.index.query_point(50, 50) == [top, middle, bottom]
+
+
+# 이동한 획은 예전 셀에서 빠지고 새 셀에서 찾아짐
+def test_translate_updates_cells():
+    stroke, other = _stroke(0, 0, 40, 40), _stroke(500, 500, 540, 540)
+    engine = _engine([stroke, other])
+    engine.translate_strokes([stroke], 1000, -700)
+    assert engine.index.query_point(20, 20) == []
+    assert engine.index.query_point(1020, -680) == [stroke]
+    assert list(engine.hit_strokes(1020, -680)) == [stroke]
+    assert list(engine.hit_strokes(20, 20)) == []
+
+
+# 크기를 키운 획은 새로 덮는 셀에서도 찾아지고, 줄이면 벗어난 셀에서 빠짐
+def test_scale_updates_cells():
+    stroke = _stroke(0, 0, 100, 0)
+    engine = _engine([stroke])
+    engine.scale_strokes([stroke], 10.0, 0, 0)
+    assert engine.index.query_point(900, 0) == [stroke]
+    assert list(engine.hit_strokes(900, 0)) == [stroke]
+    engine.scale_strokes([stroke], 0.01, 0, 0)
+    assert engine.index.query_point(900, 0) == []
+    assert engine.index.query_point(5, 0) == [stroke]
+
+
+def test_remove_drops_stroke():
+    stroke, other = _stroke(0, 0, 40, 40), _stroke(10, 0, 10, 40)
+    engine = _engine([stroke, other])
+    engine.remove_stroke(stroke)
+    assert stroke not in engine.index and len(engine.index) == 1
+    assert engine.index.query_point(14, 20) == [other]
+    assert list(engine.hit_strokes(20, 20)) == []
+
+
+# 거대한 획(셀을 너무 많이 덮는 획)과 보통 획이 섞여 이동해도 질의 결과가 전수 검사와 같음
+def test_queries_match_brute_force_after_moves():
+    rng = np.random.default_rng(3)
+    index = StrokeIndex(cell_size=64.0, max_cells_per_stroke=16)
+    strokes = []
+    for _ in range(60):
+        x, y = rng.uniform(-1000, 1000, 2)
+        w, h = rng.uniform(0, 600, 2)
+        stroke = _stroke(x, y, x + w, y + h, count=5)
+        strokes.append(stroke)
+        index.insert(stroke)
+    for _ in range(200):
+        stroke = strokes[rng.integers(len(strokes))]
+        if rng.random() < 0.5:
+            stroke.translate(*rng.uniform(-400, 400, 2))
+        else:
+            stroke.scale(rng.uniform(0.3, 3.0), *rng.uniform(-500, 500, 2))
+        x0, y0 = rng.uniform(-1500, 1500, 2)
+        rect = (x0, y0, x0 + rng.uniform(0, 800), y0 + rng.uniform(0, 800))
+        assert index.query_rect(*rect) == _brute_force(strokes, *rect)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from engine import HeadlessCanvas, StrokeEngine
+from stroke import Stroke, distance_sq_to_polyline
+from viewport import Viewport
+
+
+def _diagonal():
+    return Stroke.from_buffer("black", 3.0, np.array([[0.0, 0.0], [1000.0, 1000.0]]))
+
+
+def test_distance_to_polyline_is_exact():
+    points = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0]])
+    assert distance_sq_to_polyline(points, 5.0, 3.0) == 9.0 # 첫 선분 가운데 위
+    assert distance_sq_to_polyline(points, 13.0, 5.0) == 9.0 # 둘째 선분 옆
+    assert distance_sq_to_polyline(points, -3.0, -4.0) == 25.0 # 시작점 바깥
+    assert distance_sq_to_polyline(np.array([[1.0, 1.0], [1.0, 1.0]]), 4.0, 5.0) == 25.0 # 길이 0인 선분
+    assert distance_sq_to_polyline(np.array([[1.0, 1.0]]), 1.0, 3.0) == 4.0
+
+
+# 샘플 점에서 멀리 떨어진 긴 대각선 선분 위에서도 걸림
+def test_hit_along_long_segment_away_from_samples():
+    stroke = _diagonal()
+    assert stroke.is_hit(500.0, 500.0)
+    assert stroke.is_hit(503.0, 497.0) # 선에서 약 4.2 (허용 오차 5 + 두께 절반 1.5 이내)
+    assert not stroke.is_hit(506.0, 494.0) # 선에서 약 8.5
+
+
+# 경계 상자 안이지만 선에서 먼 점은 걸리지 않음
+def test_miss_inside_bounding_box():
+    stroke = _diagonal()
+    assert not stroke.is_hit(1000.0, 0.0)
+    assert not stroke.is_hit(100.0, 900.0)
+    assert not stroke.is_hit(520.0, 480.0)
+
+
+def test_hit_respects_transform_and_selection_width():
+    stroke = _diagonal()
+    stroke.translate(100.0, 0.0)
+    stroke.scale(2.0, 100.0, 0.0)
+    assert stroke.is_hit(1100.0, 1000.0) # (100,0)-(2100,2000) 위의 점
+    assert not stroke.is_hit(500.0, 500.0)
+    assert not stroke.is_hit(1107.0, 993.0)
+    assert not stroke.is_hit(1100.0 + 5.0, 1000.0 - 5.0) # 선에서 약 7.1
+    stroke.is_selected = True # 선택되면 화면 두께가 커져 허용 범위도 넓어짐
+    assert stroke.is_hit(1100.0 + 5.0, 1000.0 - 5.0)
+
+
+# 엔진의 지우개 판정도 색인 후보를 정확한 선분 거리로 다시 거름
+def test_engine_hit_strokes_uses_segment_distance():
+    engine = StrokeEngine(HeadlessCanvas(), Viewport(800, 600), post_workers=0)
+    stroke = _diagonal()
+    engine.load([stroke])
+    assert list(engine.hit_strokes(500.0, 500.0)) == [stroke]
+    assert list(engine.hit_strokes(800.0, 200.0)) == []
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from update_scheduler import UpdateScheduler
+
+
+# 한 프레임(60Hz) 안에 들어온 요청들은 타이머 flush 한 번으로 합쳐짐
+def test_requests_within_one_frame_coalesce():
+    flushed = threading.Event()
+    calls = []
+
+    def flush():
+        calls.append(time.monotonic())
+        if len(calls) == 2:
+            flushed.set()
+
+    scheduler = UpdateScheduler(flush, 60)
+    scheduler.flush_now() # 직전 flush 시각을 지금으로 (합쳐진 이벤트가 없으므로 통계에는 들어가지 않음)
+    for _ in range(5):
+        scheduler.request()
+    assert flushed.wait(1.0)
+    time.sleep(0.05)
+    assert len(calls) == 2
+    assert scheduler.stats.flushes == 1
+    assert scheduler.stats.last_batch == 5
+    assert scheduler.stats.summary()["average_batch"] == 5
+    scheduler.close()
+
+
+# 주기가 0이면 요청마다 바로 flush
+def test_zero_rate_flushes_every_request():
+    calls = []
+    scheduler = UpdateScheduler(lambda: calls.append(1), 0)
+    for _ in range(3):
+        scheduler.request()
+    assert len(calls) == 3
+    assert scheduler.stats.flushes == 3 and scheduler.stats.max_batch == 1
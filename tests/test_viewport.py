@@ -0,0 +1,82 @@
+import numpy as np
+
+from engine import HeadlessCanvas, StrokeEngine
+from renderer import ViewLayer
+from stroke import Stroke
+from viewport import Viewport
+
+
+def _engine(layer=True):
+    return StrokeEngine(HeadlessCanvas(), Viewport(800, 600), post_workers=0, layer=ViewLayer() if layer else None)
+
+
+def _stroke(x, y):
+    points = np.column_stack((x + np.arange(20) * 2.0, y + np.arange(20) % 3))
+    return Stroke.from_buffer("black", 3.0, points)
+
+
+# 래퍼의 변환을 적용한 도형 좌표가 현재 보기 영역의 화면 좌표와 같아야 함
+def _assert_layer_matches(engine):
+    scale, dx, dy, width, height = engine.renderer.layer.transform
+    world = np.array([[10.0, 20.0], [-300.0, 450.0]])
+    shown = engine.render_view.to_screen(world) * scale + (dx, dy)
+    assert np.allclose(shown, engine.viewport.to_screen(world))
+    assert (width, height) == (engine.viewport.width, engine.viewport.height)
+
+
+# 이동 드래그 도중에는 래퍼의 변환만 보내고, 드래그가 끝나면 새로 보이는 획만 올림
+def test_pan_gesture_moves_layer_only():
+    engine = _engine()
+    near, far = _stroke(100, 100), _stroke(1300, 100)
+    engine.load([near, far])
+    engine.flush()
+    renderer = engine.renderer
+    assert near in renderer and far not in renderer
+    serialized = renderer.bytes_serialized
+    sent = engine.renderer.canvas.bytes_sent
+    for _ in range(10):
+        engine.pan_view(-50, 0)
+        engine.flush()
+        _assert_layer_matches(engine)
+    assert renderer.bytes_serialized == serialized
+    assert engine.renderer.canvas.bytes_sent - sent < 10 * 200
+    assert far not in renderer
+
+    engine.settle_view()
+    engine.flush()
+    _assert_layer_matches(engine)
+    assert far in renderer and near in renderer
+    assert engine.render_view.offset_x == 0 # 이동만 했으므로 도형은 그대로
+    assert renderer.bytes_serialized - serialized < 2 * serialized
+
+
+# 확대/축소 도중에는 도형을 다시 만들지 않고, 멈추면 새 배율로 다시 만든 뒤 변환을 없앰
+def test_zoom_rebuilds_once_settled():
+    engine = _engine()
+    engine.load([_stroke(100, 100)])
+    engine.flush()
+    renderer = engine.renderer
+    serialized = renderer.bytes_serialized
+    for _ in range(5):
+        engine.zoom_view(1.1, 400, 300)
+        engine.flush()
+        _assert_layer_matches(engine)
+    assert renderer.bytes_serialized == serialized
+
+    engine.settle_view()
+    engine.flush()
+    assert renderer.bytes_serialized > serialized
+    assert engine.render_view.zoom == engine.viewport.zoom
+    assert renderer.layer.transform[:3] == (1.0, 0.0, 0.0)
+
+
+# 변환을 받을 래퍼가 없으면 보기 영역이 바뀔 때마다 도형을 다시 만듦
+def test_without_layer_view_changes_rebuild():
+    engine = _engine(layer=False)
+    engine.load([_stroke(100, 100)])
+    engine.flush()
+    serialized = engine.renderer.bytes_serialized
+    engine.pan_view(-50, 0)
+    engine.flush()
+    assert engine.renderer.bytes_serialized > serialized
+    assert engine.render_view.offset_x == engine.viewport.offset_x
@@ -0,0 +1,101 @@
+import functools
+import threading
+import time
+
+
+# 한 번의 flush에 몇 개의 이벤트가 합쳐졌는지에 대한 통계
+class FlushStats:
+    def __init__(self):
+        self.flushes = 0 # flush 횟수
+        self.events = 0 # flush로 처리된 전체 이벤트 수
+        self.last_batch = 0 # 마지막 flush에 합쳐진 이벤트 수
+        self.max_batch = 0 # 한 번의 flush에 합쳐진 최대 이벤트 수
+
+    def record(self, events):
+        self.flushes += 1
+        self.events += events
+        self.last_batch = events
+        if events > self.max_batch:
+            self.max_batch = events
+
+    @property
+    def average_batch(self):
+        return self.events / self.flushes if self.flushes else 0.0
+
+    # 계측 스냅숏, 벤치마크/재생 결과 JSON용
+    def summary(self):
+        return {
+            "flushes": self.flushes,
+            "events": self.events,
+            "average_batch": round(self.average_batch, 2),
+            "max_batch": self.max_batch,
+            "last_batch": self.last_batch,
+        }
+
+    def __str__(self):
+        return (f"flush {self.flushes}회, 이벤트 {self.events}개 "
+                f"(flush당 평균 {self.average_batch:.1f}, 최대 {self.max_batch}, 마지막 {self.last_batch})")
+
+
+# 드래그 이벤트마다 canvas.update()를 보내지 않고, 쌓인 변경 사항을 정해진 주기(예: 60Hz)로 한 번에 보내는 스케줄러
+# 주기가 지났으면 바로 flush하고, 아니면 다음 프레임 시점에 타이머로 flush함
+# 이벤트 핸들러와 타이머 스레드가 같은 상태를 건드리므로 상태를 바꾸는 코드는 lock을 잡고 실행해야 함
+class UpdateScheduler:
+    def __init__(self, flush, rate_hz=60):
+        self.lock = threading.RLock()
+        self.stats = FlushStats()
+        self._flush = flush
+        self.interval = 1.0 / rate_hz if rate_hz else 0.0
+        self._pending_events = 0
+        self._last_flush = 0.0
+        self._timer = None
+
+    # 함수 실행 동안 lock을 잡도록 감싸기 (이벤트 핸들러 연결용)
+    def synchronized(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.lock:
+                return fn(*args, **kwargs)
+        return wrapper
+
+    # 변경 사항이 생긴 이벤트를 처리한 뒤 호출 (필요하면 다음 프레임으로 미룸)
+    def request(self):
+        with self.lock:
+            self._pending_events += 1
+            now = time.monotonic()
+            wait = self._last_flush + self.interval - now
+            if wait <= 0:
+                self._flush_locked(now)
+            elif self._timer is None:
+                self._timer = threading.Timer(wait, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    # 쌓인 변경 사항을 즉시 전송 (드래그 종료, 버튼 클릭 등)
+    def flush_now(self):
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flush_locked(time.monotonic())
+
+    def _on_timer(self):
+        with self.lock:
+            self._timer = None
+            if self._pending_events:
+                self._flush_locked(time.monotonic())
+
+    def _flush_locked(self, now):
+        events = self._pending_events
+        self._pending_events = 0
+        self._last_flush = now
+        self._flush()
+        if events:
+            self.stats.record(events)
+
+    # 예약된 타이머 취소 (세션 종료 시)
+    def close(self):
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
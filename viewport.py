@@ -0,0 +1,104 @@
+# 무한 캔버스의 보기 영역 (화면 좌표 = 월드 좌표 * zoom + (offset_x, offset_y))
+# 획의 점은 모두 월드 좌표로 저장되고, 렌더러가 Path 요소를 만들 때 화면 좌표로 변환함
+class Viewport:
+    MIN_ZOOM = 0.05
+    MAX_ZOOM = 20.0
+
+    def __init__(self, width=800.0, height=600.0):
+        self.width = width # 화면(캔버스) 크기
+        self.height = height
+        self.zoom = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+
+    # 화면 좌표 -> 월드 좌표
+    def to_world(self, x, y):
+        return (x - self.offset_x) / self.zoom, (y - self.offset_y) / self.zoom
+
+    # (N, 2) 월드 좌표 배열 -> 화면 좌표 배열 (변환이 없으면 그대로 반환)
+    def to_screen(self, points):
+        if self.zoom == 1.0 and self.offset_x == 0.0 and self.offset_y == 0.0:
+            return points
+        return points * self.zoom + (self.offset_x, self.offset_y)
+
+    # 화면을 margin(px)만큼 넓힌 영역의 월드 좌표 사각형 (x0, y0, x1, y1)
+    def world_rect(self, margin=0.0):
+        x0, y0 = self.to_world(-margin, -margin)
+        x1, y1 = self.to_world(self.width + margin, self.height + margin)
+        return x0, y0, x1, y1
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+
+    # 이 보기 영역 기준의 화면 좌표 p를 view 기준의 화면 좌표로 옮기는 변환 (scale, dx, dy), p * scale + (dx, dy)
+    def transform_to(self, view):
+        scale = view.zoom / self.zoom
+        return scale, view.offset_x - self.offset_x * scale, view.offset_y - self.offset_y * scale
+
+    # 화면 좌표 기준으로 보기 영역 이동
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+
+    # 화면 좌표 (x, y) 아래의 월드 좌표가 그대로 유지되도록 확대/축소
+    def zoom_at(self, factor, x, y):
+        zoom = min(self.MAX_ZOOM, max(self.MIN_ZOOM, self.zoom * factor))
+        wx, wy = self.to_world(x, y)
+        self.zoom = zoom
+        self.offset_x = x - wx * zoom
+        self.offset_y = y - wy * zoom
+
+
+# 보기 영역과 겹치는 획만 렌더러에 올리는 컬링 계층
+# 보기 영역을 margin(px)만큼 넓힌 범위에 들어온 획은 올리고, keep_margin(px) 범위를 벗어난 획만 내림
+# (두 범위 사이에서는 그대로 두어 조금씩 움직일 때 같은 획이 반복해서 올라갔다 내려가지 않도록 함)
+class ViewportCuller:
+    def __init__(self, index, renderer, viewport, margin=200.0, keep_margin=400.0):
+        self.index = index
+        self.renderer = renderer
+        self.viewport = viewport
+        self.margin = margin
+        self.keep_margin = max(margin, keep_margin)
+        self.visible = set() # 렌더러에 올라가 있는 획
+
+    @staticmethod
+    def _intersects(stroke, rect):
+        pad = stroke.width / 2
+        x0, y0, x1, y1 = rect
+        return (stroke.min_x - pad <= x1 and stroke.max_x + pad >= x0 and
+                stroke.min_y - pad <= y1 and stroke.max_y + pad >= y0)
+
+    # 보기 영역이 바뀐 뒤 호출: 새로 들어온 획은 올리고 멀리 벗어난 획은 내림
+    # 이미 올라가 있는 획은 건드리지 않음 (화면 좌표를 다시 만들어야 하면 렌더러의 invalidate_view를 따로 호출)
+    def refresh(self):
+        keep_rect = self.viewport.world_rect(self.keep_margin)
+        for stroke in [s for s in self.visible if not self._intersects(s, keep_rect)]:
+            self.visible.discard(stroke)
+            self.renderer.remove(stroke)
+        for stroke in self.index.query_rect(*self.viewport.world_rect(self.margin)):
+            if stroke not in self.visible:
+                self.visible.add(stroke)
+                self.renderer.add(stroke)
+
+    # 문서에 새로 추가된 획 (그리는 중인 획은 항상 올림)
+    def track(self, stroke, live=False):
+        if live or self._intersects(stroke, self.viewport.world_rect(self.margin)):
+            self.visible.add(stroke)
+            self.renderer.add(stroke, live=live)
+
+    # 문서에서 제거된 획
+    def untrack(self, stroke):
+        self.visible.discard(stroke)
+        self.renderer.remove(stroke)
+
+    # 획이 이동/크기 조정된 뒤 보기 영역 안팎 여부를 다시 판단
+    def update(self, stroke):
+        if stroke in self.visible:
+            if not self._intersects(stroke, self.viewport.world_rect(self.keep_margin)):
+                self.untrack(stroke)
+        else:
+            self.track(stroke)
+
+    def clear(self):
+        self.visible.clear()